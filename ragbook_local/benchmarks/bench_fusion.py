@@ -0,0 +1,111 @@
+"""Benchmark hybrid fusion: HybridFusion vs. the previous inline fusion of ChatEngine.ask.
+
+The previous implementation scanned ``hits`` for every fused id and ran
+``list(bm25_index.ids).index(cid)`` for every BM25-only hit, which is O(N) in the
+corpus size. The second table times each fusion strategy on wide candidate pools.
+Run from ``ragbook_local``:
+
+    python benchmarks/bench_fusion.py --sizes 10000 100000 1000000 --pools 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from ragbook.fusion import FUSION_STRATEGIES, HybridFusion, make_fusion
+from ragbook.retrieval import BM25Result
+
+
+def legacy_fuse(hits, bm25_hits, bm25_index, alpha):
+    vec_map = {}
+    for h in hits:
+        cid = h.payload.get("chunk_id") if h.payload else None
+        vec_map[cid] = float(h.score)
+    bm25_map = {r.chunk_id: float(r.score) for r in bm25_hits}
+    all_ids = list(dict.fromkeys(list(vec_map.keys()) + list(bm25_map.keys())))
+    vec_vals = [vec_map.get(i, 0.0) for i in all_ids]
+    bm_vals = [bm25_map.get(i, 0.0) for i in all_ids]
+
+    def normalize(vals):
+        if not vals:
+            return {}
+        mx, mn = max(vals), min(vals)
+        if mx == mn:
+            return {i: (1.0 if v > 0 else 0.0) for i, v in zip(all_ids, vals)}
+        return {i: ((v - mn) / (mx - mn)) for i, v in zip(all_ids, vals)}
+
+    vec_norm, bm_norm = normalize(vec_vals), normalize(bm_vals)
+    fused = []
+    for cid in all_ids:
+        fused_score = float(alpha * vec_norm.get(cid, 0.0) + (1 - alpha) * bm_norm.get(cid, 0.0))
+        payload = None
+        if cid in vec_map:
+            for h in hits:
+                if h.payload and h.payload.get("chunk_id") == cid:
+                    payload = h.payload
+                    break
+        if payload is None and cid in bm25_map:
+            payload = {"chunk_id": cid, "text": bm25_index.docs[list(bm25_index.ids).index(cid)]}
+        fused.append({"fused_score": fused_score, "payload": payload})
+    return sorted(fused, key=lambda x: x["fused_score"], reverse=True)
+
+
+def _case(n_chunks: int, n_vec: int, n_bm25: int, rng: random.Random):
+    ids = [f"doc{i // 300}::p{i % 300}::c{i}" for i in range(n_chunks)]
+    docs = [f"text of chunk {i}" for i in range(n_chunks)]
+    index = SimpleNamespace(ids=ids, docs=docs)
+    picked = rng.sample(range(n_chunks), n_vec + n_bm25)
+    hits = [
+        SimpleNamespace(score=rng.random(), payload={"chunk_id": ids[i], "text": docs[i]})
+        for i in picked[:n_vec]
+    ]
+    # half of the BM25 hits overlap with vector hits, half are BM25-only
+    bm_rows = picked[: n_bm25 // 2] + picked[n_vec : n_vec + n_bm25 - n_bm25 // 2]
+    bm25_hits = [BM25Result(chunk_id=ids[i], score=rng.random() * 20, text=docs[i]) for i in bm_rows]
+    return hits, bm25_hits, index
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--vector-hits", type=int, default=8)
+    ap.add_argument("--bm25-hits", type=int, default=8)
+    ap.add_argument("--pools", type=int, nargs="+", default=[100, 1_000, 5_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    fusion = HybridFusion(alpha=0.5)
+    print(f"{'chunks':>10} {'legacy ms':>12} {'HybridFusion ms':>16} {'speedup':>9}")
+    for n in args.sizes:
+        hits, bm25_hits, index = _case(n, args.vector_hits, args.bm25_hits, rng)
+        assert legacy_fuse(hits, bm25_hits, index, 0.5) == fusion.fuse(hits, bm25_hits)
+        t_old = _time(lambda: legacy_fuse(hits, bm25_hits, index, 0.5), args.repeat)
+        t_new = _time(lambda: fusion.fuse(hits, bm25_hits), args.repeat)
+        print(f"{n:>10} {t_old * 1e3:>12.3f} {t_new * 1e3:>16.3f} {t_old / t_new:>8.0f}x")
+
+    print()
+    print(f"{'pool':>10} " + " ".join(f"{name + ' ms':>12}" for name in FUSION_STRATEGIES))
+    for pool in args.pools:
+        hits, bm25_hits, _ = _case(max(max(args.sizes), 4 * pool), pool, pool, rng)
+        row = []
+        for name in FUSION_STRATEGIES:
+            f = HybridFusion(alpha=0.5, strategy=make_fusion(name))
+            row.append(_time(lambda: f.fuse(hits, bm25_hits), args.repeat))
+        print(f"{pool:>10} " + " ".join(f"{t * 1e3:>12.3f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark the Ollama client: a new ``httpx.Client`` per call vs. the pooled ``LLM`` client.
+
+Starts a local stub of Ollama's ``/api/generate`` that answers immediately, so
+the timings are pure client overhead (client setup, TCP connect, request). The
+previous ``LLM.generate`` opened a fresh client and connection for every call;
+``LLM`` now keeps one pool with keep-alive connections.
+Run from ``ragbook_local``:
+
+    python benchmarks/bench_llm_client.py --calls 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from ragbook.llm import LLM
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like Ollama
+    # headers and body go out as separate writes; without this, Nagle + delayed ACK
+    # add ~40 ms to every response on a reused connection
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"response": "stub answer", "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_call_client(url: str, payload: dict) -> str:
+    # the previous LLM.generate
+    with httpx.Client(timeout=120) as client:
+        r = client.post(f"{url}/api/generate", json=payload)
+        r.raise_for_status()
+        return r.json()["response"]
+
+
+def _time(fn, calls: int) -> list[float]:
+    fn()  # warm-up
+    out = []
+    for _ in range(calls):
+        t = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t) * 1000)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=300)
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    llm = LLM.from_config(
+        "ollama",
+        model_path="",
+        n_ctx=0,
+        temperature=0.1,
+        max_tokens=16,
+        ollama_url=url,
+        ollama_model="stub",
+    )
+    payload = llm._ollama_payload("What is a gear ratio?")
+    try:
+        rows = [
+            ("new client per call", _time(lambda: per_call_client(url, payload), args.calls)),
+            ("pooled LLM client", _time(lambda: llm.generate("What is a gear ratio?"), args.calls)),
+        ]
+    finally:
+        llm.close()
+        server.shutdown()
+
+    print(f"{args.calls} calls against a stub Ollama server")
+    print(f"{'client':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, ms in rows:
+        p95 = statistics.quantiles(ms, n=20)[-1]
+        print(f"{name:<22}{statistics.mean(ms):>10.3f}{statistics.median(ms):>10.3f}{p95:>10.3f}")
+    saved = statistics.mean(rows[0][1]) - statistics.mean(rows[1][1])
+    print(f"saved per call: {saved:.3f} ms (x2 per question with the claim-check)")
+
+
+if __name__ == "__main__":
+    main()
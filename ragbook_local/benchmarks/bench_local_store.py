@@ -0,0 +1,129 @@
+"""Benchmark the embedded ``LocalStore`` against ``QdrantStore``.
+
+Both backends get the same chunk-sized points through the ``VectorStore``
+interface (what ``index_pdfs`` and ``ChatEngine`` use). The table reports upsert
+throughput (including ``flush``, i.e. IVF training for the local store), size on
+disk for the local variants, p50/p95 search latency for ``top_k`` hits with
+ranking-field payloads, and recall@k against an exact scan. Vectors are drawn
+around ``--clusters`` centres, closer to real embeddings than uniform noise. The
+Qdrant rows need a running Qdrant (``docker compose up -d``); ``--no-qdrant``
+skips them. Run from ``ragbook_local``:
+
+    python benchmarks/bench_local_store.py --points 100000 --nprobe 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from ragbook.chat_engine import RANKING_FIELDS
+from ragbook.local_store import LocalStore
+from ragbook.store import QdrantStore
+
+
+def _vectors(args) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((args.clusters, args.dim))
+    vecs = centres[rng.integers(0, args.clusters, args.points)] + rng.normal(0, 0.8, (args.points, args.dim))
+    queries = vecs[rng.integers(0, args.points, args.queries)] + rng.normal(0, 0.3, (args.queries, args.dim))
+    return vecs.astype(np.float32), queries.astype(np.float32)
+
+
+def _points(vecs: np.ndarray, text_chars: int):
+    for i, v in enumerate(vecs):
+        cid = str(uuid.UUID(int=i))
+        yield PointStruct(
+            id=cid, vector=v.tolist(), payload={"chunk_id": cid, "doc_id": f"doc{i % 50}", "text": "t" * text_chars}
+        )
+
+
+def _search(store, queries: np.ndarray, k: int, **params) -> tuple[list[set], list[float]]:
+    ids, lat = [], []
+    for q in queries:
+        t = time.perf_counter()
+        hits = store.search(q.tolist(), limit=k, fields=RANKING_FIELDS, **params)
+        lat.append((time.perf_counter() - t) * 1000)
+        ids.append({str(h.id) for h in hits})
+    return ids, lat
+
+
+def _row(name, rate, size_mb, truth, found, lat) -> None:
+    recall = statistics.mean(len(f & t) / len(t) for f, t in zip(found, truth))
+    size = f"{size_mb:.0f}" if size_mb is not None else "-"
+    print(f"{name:<26}{rate:>10.0f}{size:>9}{recall:>9.3f}{statistics.median(lat):>9.2f}"
+          f"{statistics.quantiles(lat, n=20)[-1]:>9.2f}")
+
+
+def _load(store, vecs: np.ndarray, text_chars: int) -> float:
+    store.ensure_collection(vector_size=vecs.shape[1])
+    t = time.perf_counter()
+    store.upsert(_points(vecs, text_chars))
+    store.flush()
+    return len(vecs) / (time.perf_counter() - t)
+
+
+def _wait_indexed(store: QdrantStore, timeout: float = 600.0) -> None:
+    t = time.perf_counter()
+    while time.perf_counter() - t < timeout:
+        if str(store.client.get_collection(store.collection).status).lower().endswith("green"):
+            return
+        time.sleep(0.5)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:6333")
+    ap.add_argument("--no-qdrant", action="store_true", help="only benchmark the local store")
+    ap.add_argument("--points", type=int, default=50000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--clusters", type=int, default=500)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=8)
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--text-chars", type=int, default=2000)
+    args = ap.parse_args()
+
+    vecs, queries = _vectors(args)
+    print(f"{len(vecs)} vectors, dim {args.dim}, {args.queries} queries, recall@{args.k} vs. exact")
+    print(f"{'backend':<26}{'points/s':>10}{'disk MB':>9}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}")
+
+    with tempfile.TemporaryDirectory() as root:
+        truth = None
+        for dtype in ("float32", "float16"):
+            store = LocalStore.open(root, f"bench_{dtype}", dtype=dtype, ivf_min_points=0)
+            rate = _load(store, vecs, args.text_chars)
+            size_mb = sum(p.stat().st_size for p in Path(store.path).iterdir()) / 2**20
+            exact, lat = _search(store, queries, args.k, exact=True)
+            truth = truth or exact
+            _row(f"local {dtype} flat", rate, size_mb, truth, exact, lat)
+            for nprobe in args.nprobe:
+                store.nprobe = nprobe
+                found, lat = _search(store, queries, args.k)
+                _row(f"local {dtype} ivf/{nprobe}", rate, size_mb, truth, found, lat)
+            store.close()
+
+    if args.no_qdrant:
+        return
+    store = QdrantStore.connect(args.url, f"bench_{uuid.uuid4().hex[:8]}")
+    try:
+        rate = _load(store, vecs, args.text_chars)
+        _wait_indexed(store)
+        found, lat = _search(store, queries, args.k)
+        _row("qdrant hnsw", rate, None, truth, found, lat)
+        found, lat = _search(store, queries, args.k, exact=True)
+        _row("qdrant exact", rate, None, truth, found, lat)
+    finally:
+        store.client.delete_collection(store.collection)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
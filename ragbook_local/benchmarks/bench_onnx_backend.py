@@ -0,0 +1,101 @@
+"""Benchmark the inference backends on CPU: PyTorch vs. ONNX Runtime fp32 vs. int8.
+
+For the embedding model the table reports chunk throughput and the cosine
+agreement of each backend's vectors with PyTorch (min and mean over the
+benchmark texts). For the re-ranker it reports milliseconds for scoring
+``--candidates`` passages and how many of PyTorch's top 5 each backend keeps.
+The first run exports and quantizes the models into ``--onnx-dir``. Needs
+``pip install -e ".[onnx]"``. Run from ``ragbook_local``:
+
+    python benchmarks/bench_onnx_backend.py --texts 512 --quantization avx512_vnni --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ragbook.embeddings import Embedder
+from ragbook.onnx_backend import cosine_agreement
+from ragbook.rerank import CrossEncoderReranker
+
+WORDS = (
+    "gear shaft bearing torque load ratio speed friction lubrication housing seal clutch spring axle "
+    "pulley belt chain motor power efficiency wear surface tolerance fit steel Drehmoment Lager Welle"
+).split()
+
+
+def _texts(rng: random.Random, n: int, chars: int) -> list[str]:
+    out = []
+    for _ in range(n):
+        words = []
+        while sum(len(w) + 1 for w in words) < chars:
+            words.append(rng.choice(WORDS))
+        out.append(" ".join(words)[:chars])
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    ap.add_argument("--rerank-model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    ap.add_argument("--texts", type=int, default=256)
+    ap.add_argument("--text-chars", type=int, default=1200)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--candidates", type=int, default=30)
+    ap.add_argument("--questions", type=int, default=10)
+    ap.add_argument("--quantization", default="avx2")
+    ap.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = one per core)")
+    ap.add_argument("--onnx-dir", type=Path, default=Path("./data/onnx"))
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    texts = _texts(rng, args.texts, args.text_chars)
+    backends = [
+        ("torch", {"backend": "torch"}),
+        ("onnx fp32", {"backend": "onnx", "quantization": None}),
+        (f"onnx int8 ({args.quantization})", {"backend": "onnx", "quantization": args.quantization}),
+    ]
+    onnx_opts = {"onnx_dir": args.onnx_dir, "intra_op_threads": args.threads}
+
+    print(f"embedding: {args.model}, {args.texts} texts of {args.text_chars} chars")
+    print(f"{'backend':<24}{'chunks/s':>12}{'min cos':>10}{'mean cos':>10}")
+    reference = None
+    for name, opts in backends:
+        extra = onnx_opts if opts["backend"] == "onnx" else {}
+        emb = Embedder.from_model(args.model, cache_size=0, **opts, **extra)
+        emb.embed(texts[: args.batch_size], cache=False)  # warm-up
+        t = time.perf_counter()
+        vecs = emb.embed(texts, cache=False, batch_size=args.batch_size)
+        rate = len(texts) / (time.perf_counter() - t)
+        reference = vecs if reference is None else reference
+        cos = cosine_agreement(reference, vecs)
+        print(f"{name:<24}{rate:>12.1f}{cos.min():>10.4f}{cos.mean():>10.4f}")
+
+    print(f"\nre-ranking: {args.rerank_model}, {args.candidates} candidates, {args.questions} questions")
+    print(f"{'backend':<24}{'median ms':>12}{'top-5 kept':>12}")
+    passages = [(f"bench::c{i}", t) for i, t in enumerate(_texts(rng, args.candidates, 2500))]
+    questions = [" ".join(rng.sample(WORDS, 5)) + "?" for _ in range(args.questions)]
+    reference_top = None
+    for name, opts in backends:
+        extra = onnx_opts if opts["backend"] == "onnx" else {}
+        rr = CrossEncoderReranker(model_name=args.rerank_model, cache_size=0, device="cpu", **opts, **extra)
+        rr.warm_up()
+        lat, tops = [], []
+        for q in questions:
+            t = time.perf_counter()
+            scores = rr.score(q, passages)
+            lat.append((time.perf_counter() - t) * 1000)
+            tops.append(set(np.argsort(scores)[::-1][:5]))
+        reference_top = tops if reference_top is None else reference_top
+        kept = statistics.mean(len(a & b) / 5 for a, b in zip(reference_top, tops))
+        print(f"{name:<24}{statistics.median(lat):>12.1f}{kept:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark two-phase retrieval: full-payload search vs. ranking fields + bulk retrieve.
+
+The previous query path fetched every hit with its whole payload (chunk text,
+pre/post context, paths). Two-phase retrieval searches with ``RANKING_FIELDS``
+only and retrieves full payloads for the ``--passages`` that reach the prompt.
+The script fills a scratch collection with chunk-sized payloads and reports, per
+question, the payload bytes received (JSON-encoded, a proxy for the wire and
+deserialisation cost) and the median latency, for several ``--top-k``. Needs a
+running Qdrant (``docker compose up -d``). Run from ``ragbook_local``:
+
+    python benchmarks/bench_payload_projection.py --top-k 8 30 100 --passages 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from ragbook.chat_engine import RANKING_FIELDS
+from ragbook.store import QdrantStore
+
+
+def _payload(i: int, text_chars: int, context_chars: int) -> dict:
+    return {
+        "chunk_id": str(uuid.UUID(int=i)),
+        "doc_id": f"doc{i % 50}",
+        "doc_title": f"Service manual {i % 50}",
+        "source_path": f"/srv/books/service-manual-{i % 50}.pdf",
+        "file_link": f"file:///srv/books/service-manual-{i % 50}.pdf#page={i % 400}",
+        "page": i % 400,
+        "page_start": i % 400,
+        "page_end": i % 400,
+        "section": "4.2 Torque specifications",
+        "pre_context": "p" * context_chars,
+        "post_context": "q" * context_chars,
+        "text": "t" * text_chars,
+        "local_idx": i % 40,
+    }
+
+
+def _size(records) -> int:
+    return sum(len(json.dumps(r.payload)) for r in records)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:6333")
+    ap.add_argument("--points", type=int, default=20000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-k", type=int, nargs="+", default=[8, 30, 100])
+    ap.add_argument("--passages", type=int, default=5)
+    ap.add_argument("--text-chars", type=int, default=2500)
+    ap.add_argument("--context-chars", type=int, default=400)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    queries = vecs[rng.integers(0, len(vecs), args.queries)]
+
+    store = QdrantStore.connect(args.url, f"bench_{uuid.uuid4().hex[:8]}")
+    store.ensure_collection(vector_size=args.dim)
+    try:
+        store.upsert(
+            PointStruct(id=str(uuid.UUID(int=i)), vector=v.tolist(), payload=_payload(i, args.text_chars, args.context_chars))
+            for i, v in enumerate(vecs)
+        )
+        print(f"{args.points} chunks of {args.text_chars} chars, {args.passages} passages per answer")
+        print(f"{'top_k':>6}{'full KB':>10}{'2-phase KB':>12}{'full ms':>10}{'2-phase ms':>12}")
+        for k in args.top_k:
+            full_b, two_b, full_ms, two_ms = [], [], [], []
+            for q in queries:
+                t = time.perf_counter()
+                hits = store.search(q.tolist(), limit=k)
+                full_ms.append((time.perf_counter() - t) * 1000)
+                full_b.append(_size(hits))
+
+                t = time.perf_counter()
+                hits = store.search(q.tolist(), limit=k, fields=RANKING_FIELDS)
+                kept = store.retrieve([h.payload["chunk_id"] for h in hits[: args.passages]])
+                two_ms.append((time.perf_counter() - t) * 1000)
+                two_b.append(_size(hits) + _size(kept))
+            print(
+                f"{k:>6}{statistics.mean(full_b) / 1024:>10.1f}{statistics.mean(two_b) / 1024:>12.1f}"
+                f"{statistics.median(full_ms):>10.2f}{statistics.median(two_ms):>12.2f}"
+            )
+    finally:
+        store.client.delete_collection(store.collection)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
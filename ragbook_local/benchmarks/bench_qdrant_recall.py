@@ -0,0 +1,117 @@
+"""Benchmark recall@k vs. latency of Qdrant index settings through ``QdrantStore``.
+
+For each variant (float32, scalar int8, binary with and without rescoring, vectors
+on disk) the script creates a scratch collection with ``index_options``, upserts
+the same vectors and waits for indexing. It then searches with each ``--ef``
+value. Recall is measured against exact search (``exact=True``) on the float32
+collection. Vectors are random by default; ``--from-collection`` copies them
+from an ingested ragbook collection, which gives realistic numbers. Needs a
+running Qdrant (``docker compose up -d``). Run from ``ragbook_local``:
+
+    python benchmarks/bench_qdrant_recall.py --points 100000 --ef 32 64 128 256
+    python benchmarks/bench_qdrant_recall.py --from-collection ragbook --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from ragbook.store import QdrantStore
+
+VARIANTS = [
+    ("float32", {}, {}),
+    ("scalar int8", {"quantization": "scalar"}, {"rescore": True}),
+    ("binary", {"quantization": "binary"}, {"rescore": False}),
+    ("binary+rescore x2", {"quantization": "binary"}, {"rescore": True, "oversampling": 2.0}),
+    ("on-disk + scalar", {"quantization": "scalar", "on_disk_vectors": True}, {"rescore": True}),
+]
+
+
+def _load_vectors(args) -> np.ndarray:
+    if args.from_collection:
+        src = QdrantStore.connect(args.url, args.from_collection)
+        vecs, offset = [], None
+        while len(vecs) < args.points:
+            page, offset = src.client.scroll(
+                collection_name=args.from_collection, limit=1000, offset=offset, with_payload=False, with_vectors=True
+            )
+            vecs.extend(p.vector for p in page)
+            if offset is None:
+                break
+        return np.asarray(vecs[: args.points], dtype=np.float32)
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _wait_indexed(store: QdrantStore, timeout: float = 600.0) -> None:
+    t = time.perf_counter()
+    while time.perf_counter() - t < timeout:
+        info = store.client.get_collection(store.collection)
+        if str(info.status).lower().endswith("green"):
+            return
+        time.sleep(0.5)
+
+
+def _search_ids(store: QdrantStore, queries: np.ndarray, k: int, **params) -> tuple[list[set], list[float]]:
+    ids, lat = [], []
+    for q in queries:
+        t = time.perf_counter()
+        hits = store.search(q.tolist(), limit=k, **params)
+        lat.append((time.perf_counter() - t) * 1000)
+        ids.append({h.id for h in hits})
+    return ids, lat
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:6333")
+    ap.add_argument("--points", type=int, default=50000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=8)
+    ap.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    ap.add_argument("--hnsw-m", type=int, default=16)
+    ap.add_argument("--hnsw-ef-construct", type=int, default=100)
+    ap.add_argument("--from-collection", default=None, help="copy vectors from this collection")
+    args = ap.parse_args()
+
+    vecs = _load_vectors(args)
+    rng = np.random.default_rng(1)
+    # perturbed corpus vectors stand in for questions close to some chunks
+    queries = vecs[rng.integers(0, len(vecs), args.queries)] + rng.normal(0, 0.05, (args.queries, vecs.shape[1]))
+    print(f"{len(vecs)} vectors, dim {vecs.shape[1]}, {args.queries} queries, recall@{args.k}")
+    print(f"{'variant':<20}{'hnsw_ef':>8}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}")
+
+    truth = None
+    for name, index, search in VARIANTS:
+        index = {"hnsw_m": args.hnsw_m, "hnsw_ef_construct": args.hnsw_ef_construct, **index}
+        store = QdrantStore.connect(
+            args.url, f"bench_{uuid.uuid4().hex[:8]}", index_options=index, search_options=search
+        )
+        store.ensure_collection(vector_size=vecs.shape[1])
+        try:
+            store.upsert(PointStruct(id=i, vector=v.tolist()) for i, v in enumerate(vecs))
+            _wait_indexed(store)
+            if truth is None:
+                truth, lat = _search_ids(store, queries, args.k, exact=True)
+                print(f"{'exact':<20}{'-':>8}{1.0:>9.3f}{statistics.median(lat):>9.2f}"
+                      f"{statistics.quantiles(lat, n=20)[-1]:>9.2f}")
+            for ef in args.ef:
+                found, lat = _search_ids(store, queries, args.k, hnsw_ef=ef)
+                recall = statistics.mean(len(f & t) / len(t) for f, t in zip(found, truth) if t)
+                print(f"{name:<20}{ef:>8}{recall:>9.3f}{statistics.median(lat):>9.2f}"
+                      f"{statistics.quantiles(lat, n=20)[-1]:>9.2f}")
+        finally:
+            store.client.delete_collection(store.collection)
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
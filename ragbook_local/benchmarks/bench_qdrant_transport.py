@@ -0,0 +1,101 @@
+"""Benchmark Qdrant transports: REST (JSON) vs. gRPC (protobuf) through ``QdrantStore``.
+
+Needs a running Qdrant with both ports open (``docker compose up -d`` exposes
+6333 and 6334). For each transport the script creates a scratch collection,
+upserts random vectors with ``QdrantStore.upsert`` (batched, parallel), runs
+single-query searches, scrolls the whole collection, and drops the collection.
+Run from ``ragbook_local``:
+
+    python benchmarks/bench_qdrant_transport.py --points 50000 --dim 384 --queries 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from ragbook.store import QdrantStore
+
+
+def _points(vecs: np.ndarray, text_chars: int):
+    text = "x" * text_chars
+    for i, v in enumerate(vecs):
+        yield PointStruct(id=i, vector=v.tolist(), payload={"chunk_id": f"bench::c{i}", "text": text})
+
+
+def run(url: str, transport: dict, args, vecs: np.ndarray, queries: np.ndarray) -> dict:
+    collection = f"bench_{uuid.uuid4().hex[:8]}"
+    store = QdrantStore.connect(
+        url,
+        collection,
+        transport=transport,
+        upsert_batch_size=args.batch_size,
+        upsert_parallel=args.parallel,
+    )
+    store.ensure_collection(vector_size=vecs.shape[1])
+    try:
+        t = time.perf_counter()
+        store.upsert(_points(vecs, args.text_chars))
+        upsert_s = time.perf_counter() - t
+
+        lat = []
+        for q in queries:
+            t = time.perf_counter()
+            store.search(q.tolist(), limit=args.top_k)
+            lat.append((time.perf_counter() - t) * 1000)
+
+        t = time.perf_counter()
+        n = sum(1 for _ in store.fetch_all_chunks())
+        scroll_s = time.perf_counter() - t
+    finally:
+        store.client.delete_collection(collection)
+        store.close()
+    return {
+        "upsert pts/s": len(vecs) / upsert_s,
+        "search p50 ms": statistics.median(lat),
+        "search p95 ms": statistics.quantiles(lat, n=20)[-1],
+        "search qps": 1000 / statistics.mean(lat),
+        "scroll pts/s": n / scroll_s,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:6333")
+    ap.add_argument("--grpc-port", type=int, default=6334)
+    ap.add_argument("--points", type=int, default=20000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=300)
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--parallel", type=int, default=2)
+    ap.add_argument("--pool-size", type=int, default=4)
+    ap.add_argument("--text-chars", type=int, default=2000, help="payload text size, like a chunk")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    queries = vecs[rng.integers(0, len(vecs), args.queries)]
+
+    rows = []
+    for name, transport in [
+        ("REST", {"pool_size": args.pool_size}),
+        ("gRPC", {"prefer_grpc": True, "grpc_port": args.grpc_port, "pool_size": args.pool_size}),
+    ]:
+        rows.append((name, run(args.url, transport, args, vecs, queries)))
+
+    print(f"{args.points} points, dim {args.dim}, {args.queries} searches, {args.url}")
+    cols = list(rows[0][1])
+    print(f"{'transport':<10}" + "".join(f"{c:>16}" for c in cols))
+    for name, r in rows:
+        print(f"{name:<10}" + "".join(f"{r[c]:>16.1f}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
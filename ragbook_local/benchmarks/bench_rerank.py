@@ -0,0 +1,84 @@
+"""Benchmark re-ranking latency: CrossEncoderReranker vs. the previous inline re-rank.
+
+The previous ``ChatEngine._rerank`` loaded the model on the first question and
+scored ``f"{question} \\n\\n {text}"`` strings with full-length chunks. The table
+reports median milliseconds per question for 10/30/100 candidates of
+``--text-chars`` characters: the previous scoring, ``CrossEncoderReranker`` on new
+questions (batched pairs, truncated to ``--max-length`` tokens) and on repeated
+questions (score cache). Needs the model locally or a network connection to fetch
+it. Run from ``ragbook_local``:
+
+    python benchmarks/bench_rerank.py --candidates 10 30 100 --questions 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from sentence_transformers import CrossEncoder
+
+from ragbook.rerank import CrossEncoderReranker
+
+WORDS = (
+    "gear shaft bearing torque load ratio speed friction lubrication housing seal clutch "
+    "spring axle pulley belt chain motor power efficiency wear surface tolerance fit steel"
+).split()
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    out = []
+    while sum(len(w) + 1 for w in out) < chars:
+        out.append(rng.choice(WORDS))
+    return " ".join(out)[:chars]
+
+
+def _median_ms(fn, questions) -> float:
+    lat = []
+    for q in questions:
+        t = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t) * 1000)
+    return statistics.median(lat)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--candidates", type=int, nargs="+", default=[10, 30, 100])
+    ap.add_argument("--questions", type=int, default=20)
+    ap.add_argument("--text-chars", type=int, default=2500, help="passage size, like a chunk")
+    ap.add_argument("--batch-size", type=int, default=16)
+    ap.add_argument("--max-length", type=int, default=512)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    t = time.perf_counter()
+    rr = CrossEncoderReranker(model_name=args.model, batch_size=args.batch_size, max_length=args.max_length,
+                              device=args.device)
+    rr.warm_up()
+    print(f"model load + warm-up: {(time.perf_counter() - t) * 1000:.0f} ms (paid at startup, not by the first question)")
+    legacy = CrossEncoder(args.model, device=args.device)
+
+    print(f"{'candidates':>10}{'previous ms':>14}{'new q ms':>12}{'cached ms':>12}")
+    for n in args.candidates:
+        passages = [(f"bench::c{i}", _text(rng, args.text_chars)) for i in range(n)]
+        questions = [" ".join(rng.sample(WORDS, 5)) + "?" for _ in range(args.questions)]
+
+        def previous(q):
+            legacy.predict([f"{q} \n\n {text}" for _, text in passages])
+
+        try:
+            prev_ms = _median_ms(previous, questions)
+        except Exception:  # newer sentence-transformers reject plain strings
+            prev_ms = float("nan")
+        new_ms = _median_ms(lambda q: rr.score(q, passages), questions)
+        cached_ms = _median_ms(lambda q: rr.score(q, passages), questions)
+        print(f"{n:>10}{prev_ms:>14.1f}{new_ms:>12.1f}{cached_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Answer cache in front of the LLM stage of ``ChatEngine``.
+
+An entry is keyed on the normalised question plus the ordered ``chunk_id``s of
+the passages the answer was generated from, so a cached answer is only reused
+for the same evidence. Optionally, a differently worded question with the same
+evidence matches when its embedding is close enough to a cached one.
+
+Entries live in an in-process LRU (bounded by entry count and an approximate
+memory budget, with a TTL) and optionally in a SQLite file shared by processes.
+Re-ingesting invalidates everything: ``index_pdfs`` rewrites the ingest stamp
+file and the cache drops entries written under a different stamp.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+
+import numpy as np
+
+INGEST_STAMP = "ingest.stamp"
+
+_SPACE = re.compile(r"\s+")
+
+
+def bump_ingest_stamp(path: Path) -> str:
+    """Write a new random token to the ingest stamp file (atomically) and return it."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    token = uuid.uuid4().hex
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(token, encoding="utf-8")
+    os.replace(tmp, path)
+    return token
+
+
+def normalize_question(question: str) -> str:
+    q = unicodedata.normalize("NFKC", question).casefold()
+    return _SPACE.sub(" ", q).strip().rstrip("?!. ")
+
+
+@dataclass
+class _Entry:
+    key: str
+    evidence: str
+    vec: np.ndarray | None
+    value: dict
+    expires: float
+    size: int
+
+
+class AnswerCache:
+    """LRU + TTL answer cache with an optional SQLite tier.
+
+    ``similarity`` is the minimum cosine similarity of question embeddings for a
+    near-duplicate hit (``None`` disables near-duplicate matching). ``namespace``
+    separates settings that change answers (language, claim-check mode, ...).
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 24 * 3600,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        similarity: float | None = 0.97,
+        sqlite_path: Path | None = None,
+        stamp_path: Path | None = None,
+        namespace: str = "",
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.similarity = similarity
+        self.stamp_path = Path(stamp_path) if stamp_path is not None else None
+        self.namespace = namespace
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_evidence: dict[str, set[str]] = {}
+        self._bytes = 0
+        self._stamp_stat: tuple[int, int, int] | None = None
+        self._generation = ""
+        self._db: sqlite3.Connection | None = None
+        if sqlite_path is not None:
+            Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, evidence TEXT NOT NULL, "
+                "generation TEXT NOT NULL, vec BLOB, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_evidence ON answers (evidence)")
+        self._check_stamp()
+
+    # keys
+
+    def _digest(self, *parts: str) -> str:
+        return hashlib.sha256("\x1e".join((self.namespace, *parts)).encode("utf-8")).hexdigest()
+
+    def key(self, question: str, chunk_ids: Sequence[str]) -> str:
+        return self._digest(normalize_question(question), "\x1f".join(chunk_ids))
+
+    def evidence(self, chunk_ids: Sequence[str]) -> str:
+        return self._digest("\x1f".join(chunk_ids))
+
+    # invalidation
+
+    def _check_stamp(self) -> None:
+        # caller holds the lock (or is __init__); one stat() per lookup
+        if self.stamp_path is None:
+            return
+        try:
+            st = self.stamp_path.stat()
+        except FileNotFoundError:
+            return
+        # a bump replaces the file, so the inode changes even within one mtime tick
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat == self._stamp_stat:
+            return
+        self._stamp_stat = stat
+        token = self.stamp_path.read_text(encoding="utf-8").strip()
+        if token != self._generation:
+            self._generation = token
+            self._clear_memory()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers WHERE generation != ?", (token,))
+
+    def _clear_memory(self) -> None:
+        self._entries.clear()
+        self._by_evidence.clear()
+        self._bytes = 0
+
+    def invalidate(self) -> None:
+        """Drop every entry (memory and SQLite)."""
+        with self._lock:
+            self._clear_memory()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+
+    # lookup
+
+    def get(self, question: str, chunk_ids: Sequence[str], qvec=None) -> dict | None:
+        """Return the cached value for this question and evidence, or ``None``."""
+        key = self.key(question, chunk_ids)
+        evidence = self.evidence(chunk_ids)
+        vec = _unit(qvec)
+        now = time.time()
+        with self._lock:
+            self._check_stamp()
+            entry = self._get_memory(key, evidence, vec, now)
+            if entry is None:
+                entry = self._get_sqlite(key, evidence, vec, now)
+                if entry is not None:
+                    self._store_memory(entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.key == key:
+                self.hits += 1
+            else:
+                self.near_hits += 1
+            return dict(entry.value)
+
+    def _get_memory(self, key: str, evidence: str, vec, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None and vec is not None and self.similarity is not None:
+            best = self.similarity
+            for k in self._by_evidence.get(evidence, ()):
+                cand = self._entries[k]
+                if cand.vec is not None and cand.expires > now:
+                    sim = float(cand.vec @ vec)
+                    if sim >= best:
+                        entry, best = cand, sim
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            self._drop(entry.key)
+            return None
+        self._entries.move_to_end(entry.key)
+        return entry
+
+    def _get_sqlite(self, key: str, evidence: str, vec, now: float) -> _Entry | None:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT key, vec, value, expires FROM answers WHERE key = ? AND generation = ? AND expires > ?",
+            (key, self._generation, now),
+        ).fetchone()
+        if row is None and vec is not None and self.similarity is not None:
+            best = self.similarity
+            for cand in self._db.execute(
+                "SELECT key, vec, value, expires FROM answers WHERE evidence = ? AND generation = ? AND expires > ?",
+                (evidence, self._generation, now),
+            ):
+                if cand[1] is None:
+                    continue
+                sim = float(np.frombuffer(cand[1], dtype=np.float32) @ vec)
+                if sim >= best:
+                    row, best = cand, sim
+        if row is None:
+            return None
+        k, blob, value, expires = row
+        cached_vec = np.frombuffer(blob, dtype=np.float32).copy() if blob is not None else None
+        return self._entry(k, evidence, cached_vec, json.loads(value), expires)
+
+    # insertion
+
+    def put(self, question: str, chunk_ids: Sequence[str], value: dict, qvec=None) -> None:
+        """Cache ``value`` (a JSON-serialisable dict) for this question and evidence."""
+        key = self.key(question, chunk_ids)
+        evidence = self.evidence(chunk_ids)
+        vec = _unit(qvec)
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._check_stamp()
+            self._store_memory(self._entry(key, evidence, vec, dict(value), expires))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        evidence,
+                        self._generation,
+                        vec.tobytes() if vec is not None else None,
+                        json.dumps(value, ensure_ascii=False),
+                        expires,
+                    ),
+                )
+                self._db.execute("DELETE FROM answers WHERE expires <= ?", (time.time(),))
+
+    def _entry(self, key: str, evidence: str, vec, value: dict, expires: float) -> _Entry:
+        # rough footprint: JSON text + vector + bookkeeping
+        size = len(json.dumps(value, ensure_ascii=False)) + (vec.nbytes if vec is not None else 0) + 256
+        return _Entry(key, evidence, vec, value, expires, size)
+
+    def _store_memory(self, entry: _Entry) -> None:
+        if entry.key in self._entries:
+            self._drop(entry.key)
+        self._entries[entry.key] = entry
+        self._by_evidence.setdefault(entry.evidence, set()).add(entry.key)
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        keys = self._by_evidence.get(entry.evidence)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_evidence[entry.evidence]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _unit(v) -> np.ndarray | None:
+    if v is None:
+        return None
+    v = np.asarray(v, dtype=np.float32).ravel()
+    n = float(np.linalg.norm(v))
+    return v / n if n > 0 else None
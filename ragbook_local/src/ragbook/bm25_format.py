@@ -0,0 +1,203 @@
+"""Versioned binary file format for the persisted BM25 index.
+
+Layout (all integers little-endian)::
+
+    magic        8 bytes   b"RBBM25\\0\\0"
+    version      uint32
+    reserved     uint32
+    header_len   uint64
+    header       JSON (language, BM25 parameters, section table)
+    sections     raw arrays, each aligned to 64 bytes
+
+Sections hold the vocabulary (sorted, UTF-8 blob + offsets), CSR postings
+(term offsets, doc ids, term frequencies), doc lengths, IDF, the chunk id table
+with its sort order and the chunk texts. Reading maps the file once with ``mmap`` and exposes every
+section as a zero-copy NumPy view, so loading does no tokenization and worker
+processes opening the same file share its pages.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .inverted_index import InvertedIndex, StringTable
+
+MAGIC = b"RBBM25\0\0"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sIIQ")
+_ALIGN = 64
+
+
+@dataclass
+class BM25File:
+    index: InvertedIndex | None
+    ids: StringTable
+    docs: StringTable
+    language: str
+
+
+def is_bm25_file(path: Path) -> bool:
+    with Path(path).open("rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def write_bm25_file(
+    path: Path,
+    *,
+    index: InvertedIndex | None,
+    ids: list[str] | StringTable,
+    docs: list[str] | StringTable,
+    language: str,
+) -> None:
+    """Write the index atomically (temp file + rename), so processes that still
+    have the previous file mapped keep reading a consistent copy."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    ids_t = ids if isinstance(ids, StringTable) else StringTable.from_strings(ids)
+    docs_t = docs if isinstance(docs, StringTable) else StringTable.from_strings(docs)
+    # rows in chunk id order, so the id -> row lookup is a binary search on the mapped file
+    id_order = sorted(range(len(ids_t)), key=(ids if isinstance(ids, list) else ids_t).__getitem__)
+    arrays: dict[str, np.ndarray] = {
+        "ids_blob": ids_t.blob,
+        "ids_offsets": ids_t.offsets,
+        "id_order": np.asarray(id_order, dtype=np.int64),
+        "docs_blob": docs_t.blob,
+        "docs_offsets": docs_t.offsets,
+    }
+    header: dict = {"language": language, "n_docs": len(ids_t), "index": None}
+    if index is not None:
+        index = index.sorted_by_term()
+        arrays.update(
+            vocab_blob=index.vocab.blob,
+            vocab_offsets=index.vocab.offsets,
+            term_offsets=index.offsets,
+            doc_ids=index.doc_ids,
+            tfs=index.tfs,
+            doc_len=index.doc_len,
+            idf=index.idf,
+        )
+        header["index"] = {"k1": index.k1, "b": index.b, "epsilon": index.epsilon, "avgdl": index.avgdl}
+
+    sections = {}
+    pos = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+        arrays[name] = arr
+        sections[name] = {"dtype": arr.dtype.str, "offset": pos, "count": int(arr.shape[0])}
+        pos = _aligned(pos + arr.nbytes)
+    header["sections"] = sections
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        fh.write(header_bytes)
+        for name, arr in arrays.items():
+            fh.seek(data_start + sections[name]["offset"])
+            fh.write(arr.tobytes())
+        fh.truncate(data_start + pos)
+    os.replace(tmp, path)
+
+
+def read_bm25_file(path: Path) -> BM25File:
+    """Memory-map a file written by ``write_bm25_file``."""
+    with Path(path).open("rb") as fh:
+        prefix = fh.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is not a BM25 index file")
+        magic, version, _, header_len = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a BM25 index file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index format version {version} in {path}")
+        header = json.loads(fh.read(header_len).decode("utf-8"))
+        buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data_start = _aligned(_PREFIX.size + header_len)
+
+    def section(name: str) -> np.ndarray:
+        s = header["sections"][name]
+        return np.frombuffer(buf, dtype=np.dtype(s["dtype"]), count=s["count"], offset=data_start + s["offset"])
+
+    index = None
+    meta = header.get("index")
+    if meta is not None:
+        index = InvertedIndex(
+            vocab=StringTable(section("vocab_blob"), section("vocab_offsets"), is_sorted=True),
+            offsets=section("term_offsets"),
+            doc_ids=section("doc_ids"),
+            tfs=section("tfs"),
+            doc_len=section("doc_len"),
+            idf=section("idf"),
+            avgdl=float(meta["avgdl"]),
+            k1=float(meta["k1"]),
+            b=float(meta["b"]),
+            epsilon=float(meta.get("epsilon", 0.25)),
+        )
+    return BM25File(
+        index=index,
+        ids=StringTable(
+            section("ids_blob"),
+            section("ids_offsets"),
+            order=section("id_order") if "id_order" in header["sections"] else None,
+        ),
+        docs=StringTable(section("docs_blob"), section("docs_offsets")),
+        language=header.get("language") or "auto",
+    )
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def delta_path(path: Path) -> Path:
+    """Path of the append-only change log that accompanies the index file at ``path``."""
+    path = Path(path)
+    return path.with_name(path.name + ".delta")
+
+
+def append_delta(path: Path, records: list[dict]) -> None:
+    """Append change records (``{"op": "add", "chunk_id", "text"}`` / ``{"op": "del", "chunk_id"}``)."""
+    if not records:
+        return
+    with delta_path(path).open("a", encoding="utf-8") as fh:
+        for r in records:
+            fh.write(json.dumps(r, ensure_ascii=False) + "\n")
+        fh.flush()
+
+
+def read_delta(path: Path) -> list[dict]:
+    """Read the change log; a torn last line (e.g. from a concurrent writer) is ignored."""
+    p = delta_path(path)
+    if not p.exists():
+        return []
+    records = []
+    for line in p.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def write_delta(path: Path, records: list[dict]) -> None:
+    """Replace the change log atomically (removing it when there are no records)."""
+    p = delta_path(path)
+    if not records:
+        p.unlink(missing_ok=True)
+        return
+    tmp = p.with_name(p.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        for r in records:
+            fh.write(json.dumps(r, ensure_ascii=False) + "\n")
+    os.replace(tmp, p)
@@ -1,188 +1,236 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, AsyncIterator, Iterator, Optional
 from pathlib import Path
+import asyncio
+import time
+import warnings
 
 from .embeddings import Embedder
-from .store import QdrantStore
+from .store import AsyncQdrantStore, VectorStore
 from .guardrails import decide_or_ask
-from .prompting import (
-    build_grounded_prompt,
-    build_claim_check_prompt,
-    parse_claim_check_response,
-    strip_unsubstantiated,
-)
+from .prompting import build_grounded_prompt, strip_unsubstantiated
+from .answer_cache import AnswerCache
+from .claim_check import CLAIM_VERIFIERS, IncrementalClaimCheck, LLMClaimVerifier, NLIClaimVerifier
 from .llm import LLM
 from .retrieval import BM25Index
+from .fusion import HybridFusion, make_fusion
+from .rerank import CrossEncoderReranker
+
+
+class StageTimer:
+    """Wall-clock milliseconds per pipeline stage."""
+
+    def __init__(self):
+        self.ms: dict[str, float] = {}
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms[name] = (time.perf_counter() - t) * 1000
+
+    def mark(self, name: str) -> None:
+        """Record the time since the timer started (e.g. time to first token)."""
+        self.ms[name] = (time.perf_counter() - self._t0) * 1000
+
+    def done(self) -> dict[str, float]:
+        self.ms["total"] = (time.perf_counter() - self._t0) * 1000
+        return {k: round(v, 3) for k, v in self.ms.items()}
+
+
+# payload keys the ranking stages read (fusion, guardrails); with ``two_phase`` the
+# vector search returns only these and the passages are completed afterwards
+RANKING_FIELDS = ("chunk_id", "doc_id", "doc_title")
+
+
+def _as_list(qv: Any) -> list:
+    # support numpy arrays or python lists
+    if hasattr(qv, "tolist"):
+        return qv.tolist()
+    if isinstance(qv, (list, tuple)):
+        return list(qv)
+    return [qv]
 
 
 @dataclass
 class ChatEngine:
-    store: QdrantStore
+    store: VectorStore
     embedder: Embedder
     llm: LLM
     top_k: int
     min_score: float
     max_passages: int
     alpha: float = 0.5
+    fusion: str = "minmax"
+    rrf_k: int = 60
+    fusion_weights: dict[str, float] | None = None
+    # built once from the fields above on first use; stateless, shared by all queries
+    _fusion: HybridFusion | None = None
     bm25_index: Optional[BM25Index] = None
     bm25_path: Optional[Path] = None
     rerank_enabled: bool = False
     rerank_model: str | None = None
     rerank_candidates: int = 30
-    _reranker: object | None = None
+    # built from ``rerank_model`` on first use when not given
+    reranker: CrossEncoderReranker | None = None
     claim_check_mode: str = "refuse"
+    # verify sentences while the answer streams instead of after it (one check in flight)
+    claim_check_incremental: bool = False
+    # 'llm' (second LLM call) or 'nli' (local cross-encoder, no LLM call)
+    claim_check_verifier: str = "llm"
+    claim_check_model: str | None = None
+    _nli_verifier: NLIClaimVerifier | None = None
     # language hint for prompts and BM25 tokenization (e.g., 'de' for German)
     language: str = "en"
+    # background threads: BM25 lookups next to embedding + vector search, incremental claim-checks
+    retrieval_workers: int = 4
+    _executor: ThreadPoolExecutor | None = None
+    # async query path (``aask``); without it vector search runs ``store.search`` in a thread
+    astore: AsyncQdrantStore | None = None
+    # reuse answers for the same question and evidence (see ragbook.answer_cache)
+    answer_cache: AnswerCache | None = None
+    # two-phase retrieval: rank on RANKING_FIELDS, then fetch full payloads of the
+    # passages that are kept in one ``store.retrieve`` call (texts for the guardrails
+    # and the re-ranker come from the BM25 index when it has them)
+    two_phase: bool = False
 
-    def ask(self, question: str) -> dict:
+    def _retrieval_pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.retrieval_workers, thread_name_prefix="ragbook-retrieval"
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Release the retrieval pool, the LLM's HTTP connections and the caches."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for owner in (self.llm, self.embedder):
+            close = getattr(owner, "close", None)
+            if close is not None:
+                close()
+        if self.answer_cache is not None:
+            self.answer_cache.close()
+
+    async def aclose(self) -> None:
+        """Close the async clients used by ``aask`` (and the retrieval pool)."""
+        self.close()
+        if self.astore is not None:
+            await self.astore.close()
+        aclose = getattr(self.llm, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def _bm25_search(self, question: str) -> tuple[list, float]:
+        t = time.perf_counter()
+        hits = self.bm25_index.search(question, top_k=self.top_k)
+        return hits, (time.perf_counter() - t) * 1000
+
+    def _ensure_bm25(self) -> None:
         # ensure BM25 index exists (lazy build). Prefer persisted index if available.
+        if self.bm25_index is not None:
+            return
+        # try loading persisted index
+        if self.bm25_path is not None:
+            try:
+                if Path(self.bm25_path).exists():
+                    self.bm25_index = BM25Index.load(self.bm25_path)
+            except Exception:
+                # loading failed; will fall back to building from store
+                self.bm25_index = None
+
         if self.bm25_index is None:
-            # try loading persisted index
-            if self.bm25_path is not None:
-                try:
-                    if Path(self.bm25_path).exists():
-                        self.bm25_index = BM25Index.load(self.bm25_path)
-                except Exception:
-                    # loading failed; will fall back to building from store
-                    self.bm25_index = None
-
-            if self.bm25_index is None:
-                try:
-                    # build from store and pass language hint
-                    self.bm25_index = BM25Index.from_store(self.store, language=self.language)
-                except Exception:
-                    # if BM25 cannot be built, continue with vector-only behavior
-                    self.bm25_index = None
-
-        qv = self.embedder.embed([question])[0]
-        # support numpy arrays or python lists
-        if hasattr(qv, "tolist"):
-            qv_list = qv.tolist()
-        elif isinstance(qv, (list, tuple)):
-            qv_list = list(qv)
-        else:
-            qv_list = [qv]
-        hits = self.store.search(query_vector=qv_list, limit=max(self.top_k, self.max_passages))
+            try:
+                # build from store and pass language hint
+                self.bm25_index = BM25Index.from_store(self.store, language=self.language)
+            except Exception:
+                # if BM25 cannot be built, continue with vector-only behavior
+                self.bm25_index = None
 
-        # vector scores map: chunk_id -> score
-        vec_map = {}
-        for h in hits:
-            cid = h.payload.get("chunk_id") if h.payload else None
-            vec_map[cid] = float(h.score)
+    def _fuse(self, hits, bm25_hits) -> list[dict]:
+        if self._fusion is None:
+            self._fusion = HybridFusion(
+                alpha=self.alpha,
+                strategy=make_fusion(self.fusion, rrf_k=self.rrf_k),
+                weights=self.fusion_weights,
+            )
+        return self._fusion.fuse(hits, bm25_hits)
 
-        # bm25 scores map: chunk_id -> score
-        bm25_map = {}
-        if self.bm25_index is not None:
-            bm25_hits = self.bm25_index.search(question, top_k=self.top_k)
-            for r in bm25_hits:
-                bm25_map[r.chunk_id] = float(r.score)
-
-        # union of chunk ids (preserve order deterministically)
-        all_ids = list(dict.fromkeys(list(vec_map.keys()) + list(bm25_map.keys())))
-
-        # prepare lists for normalization (order consistent via all_ids list)
-        vec_vals = [vec_map.get(i, 0.0) for i in all_ids]
-        bm_vals = [bm25_map.get(i, 0.0) for i in all_ids]
-
-        def normalize(vals):
-            if not vals:
-                return {}
-            mx = max(vals)
-            mn = min(vals)
-            if mx == mn:
-                # if all equal and non-zero, map non-zero to 1.0, zeros to 0.0
-                return {i: (1.0 if v > 0 else 0.0) for i, v in zip(all_ids, vals)}
-            return {i: ((v - mn) / (mx - mn)) for i, v in zip(all_ids, vals)}
-
-        vec_norm = normalize(vec_vals)
-        bm_norm = normalize(bm_vals)
-
-        fused = []
-        for cid in all_ids:
-            v = vec_norm.get(cid, 0.0)
-            b = bm_norm.get(cid, 0.0)
-            fused_score = float(self.alpha * v + (1 - self.alpha) * b)
-            # choose payload from whichever is available (vector hits preferred)
-            payload = None
-            if cid in vec_map:
-                # find hit payload
-                for h in hits:
-                    if h.payload and h.payload.get("chunk_id") == cid:
-                        payload = h.payload
-                        break
-            if payload is None and cid in bm25_map:
-                # no vector payload, try to recover basic payload from bm25 text
-                payload = {"chunk_id": cid, "text": self.bm25_index.docs[list(self.bm25_index.ids).index(cid)]}
-
-            fused.append({"fused_score": fused_score, "payload": payload})
-
-        fused_sorted = sorted(fused, key=lambda x: x["fused_score"], reverse=True)
+    def _refusal_text(self) -> str:
+        # localized refusal message
+        if (self.language or "").lower().startswith("de"):
+            return "Nicht genug Information in den Büchern."
+        return "Not enough information in the books."
 
-        # decision uses fused_score
-        decision = decide_or_ask(question, fused_sorted, min_score=self.min_score)
-        if not decision.should_answer:
-            # localized refusal message
-            if (self.language or "").lower().startswith("de"):
-                refusal = "Nicht genug Information in den Büchern."
-            else:
-                refusal = "Not enough information in the books."
-
-            return {
-                "answer": refusal,
-                "reason": decision.reason,
-                "passages": fused_sorted[: self.max_passages],
-                "probing_questions": decision.probing_questions,
-                "claim_check": {"mode": self.claim_check_mode, "unsupported": []},
-                "reranked": False,
-            }
-
-        # Optional re-ranking step (top-N)
-        rerank_active = False
-        if self.rerank_enabled:
-            # build reranker lazily
-            if self._reranker is None:
-                try:
-                    from sentence_transformers import CrossEncoder
-
-                    self._reranker = CrossEncoder(self.rerank_model)
-                except Exception:
-                    # Log warning but continue without reranking
-                    import warnings
-
-                    warnings.warn("Reranker model not available; continuing without reranking.")
-                    self._reranker = None
-
-            if self._reranker is not None:
-                candidates = fused_sorted[: self.rerank_candidates]
-                texts = [f"{question} \n\n {c['payload'].get('text','') or ''}" for c in candidates]
-                try:
-                    scores = self._reranker.predict(texts)
-                    for c, s in zip(candidates, scores):
-                        c["fused_score"] = float(s)
-                    # re-sort by new scores
-                    fused_sorted = sorted(candidates + fused_sorted[self.rerank_candidates :], key=lambda x: x["fused_score"], reverse=True)
-                    rerank_active = True
-                except Exception:
-                    import warnings
-
-                    warnings.warn("Reranker prediction failed; proceeding without reranking.")
+    def _refuse(self, decision, fused_sorted: list[dict], timer: StageTimer) -> dict:
+        return {
+            "answer": self._refusal_text(),
+            "reason": decision.reason,
+            "passages": fused_sorted[: self.max_passages],
+            "probing_questions": decision.probing_questions,
+            "claim_check": {"mode": self.claim_check_mode, "unsupported": []},
+            "reranked": False,
+            "cached": False,
+            "timings": timer.done(),
+        }
 
-        passages = fused_sorted[: self.max_passages]
-        prompt = build_grounded_prompt(question, passages, language=self.language)
-        answer = self.llm.generate(prompt)
+    def warm_up(self) -> None:
+        """Load the re-ranking model now rather than on the first question."""
+        if not self.rerank_enabled:
+            return
+        try:
+            self._get_reranker().warm_up()
+        except Exception:
+            warnings.warn("Reranker model not available; continuing without reranking.")
+
+    def _get_reranker(self) -> CrossEncoderReranker:
+        if self.reranker is None:
+            self.reranker = CrossEncoderReranker(**({"model_name": self.rerank_model} if self.rerank_model else {}))
+        return self.reranker
 
-        # Claim-check step: ask LLM to mark unsupported sentences
-        claim_check_prompt = build_claim_check_prompt(answer, passages, language=self.language)
-        unsupported = []
+    def _rerank(self, question: str, fused_sorted: list[dict]) -> tuple[list[dict], bool]:
+        """Optional re-ranking step (top-N); returns the (re-)sorted list and whether it applied."""
+        reranker = self._get_reranker()
         try:
-            resp = self.llm.generate(claim_check_prompt)
-            unsupported = parse_claim_check_response(resp)
+            reranker.load()
         except Exception:
-            # if claim-check fails, treat as no unsupported sentences (fail-open)
-            unsupported = []
+            # Log warning but continue without reranking
+            warnings.warn("Reranker model not available; continuing without reranking.")
+            return fused_sorted, False
+
+        candidates = fused_sorted[: self.rerank_candidates]
+        passages = []
+        for c in candidates:
+            payload = c["payload"] or {}
+            passages.append((payload.get("chunk_id") or "", payload.get("text") or ""))
+        try:
+            scores = reranker.score(question, passages)
+        except Exception:
+            warnings.warn("Reranker prediction failed; proceeding without reranking.")
+            return fused_sorted, False
+        for c, s in zip(candidates, scores):
+            c["fused_score"] = s
+        # re-sort by new scores
+        fused_sorted = sorted(candidates + fused_sorted[self.rerank_candidates :], key=lambda x: x["fused_score"], reverse=True)
+        return fused_sorted, True
 
+    def _answer(
+        self,
+        decision,
+        answer: str,
+        unsupported: list[str],
+        passages: list[dict],
+        rerank_active: bool,
+        timer: StageTimer,
+    ) -> dict:
         final_answer = answer
         claim_check_applied = False
         if unsupported:
@@ -193,10 +241,7 @@ class ChatEngine:
                     final_answer = "Not enough information in the books."
             else:
                 # default/refuse behavior (localized)
-                if (self.language or "").lower().startswith("de"):
-                    final_answer = "Nicht genug Information in den Büchern."
-                else:
-                    final_answer = "Not enough information in the books."
+                final_answer = self._refusal_text()
 
         reason_suffix = decision.reason
         if rerank_active:
@@ -211,4 +256,352 @@ class ChatEngine:
             "probing_questions": [],
             "claim_check": {"mode": self.claim_check_mode, "unsupported": unsupported},
             "reranked": rerank_active,
+            "cached": False,
+            "timings": timer.done(),
+        }
+
+    @staticmethod
+    def _chunk_ids(passages: list[dict]) -> list[str]:
+        return [str((p.get("payload") or {}).get("chunk_id")) for p in passages]
+
+    def _cached(self, question: str, passages: list[dict], qv, timer: StageTimer) -> dict | None:
+        """Answer from ``answer_cache`` (same question and evidence) without the LLM stage."""
+        if self.answer_cache is None:
+            return None
+        with timer.stage("cache"):
+            hit = self.answer_cache.get(question, self._chunk_ids(passages), qv)
+        if hit is None:
+            return None
+        return {
+            **hit,
+            "passages": passages,
+            "probing_questions": [],
+            "cached": True,
+            "timings": timer.done(),
+        }
+
+    def _remember(self, question: str, passages: list[dict], qv, result: dict) -> None:
+        if self.answer_cache is None:
+            return
+        value = {k: result[k] for k in ("answer", "reason", "claim_check", "reranked")}
+        self.answer_cache.put(question, self._chunk_ids(passages), value, qv)
+
+    def _retrieve(self, question: str, timer: StageTimer) -> tuple[list[dict], Any]:
+        """Return the fused candidates and the query embedding."""
+        self._ensure_bm25()
+        with timer.stage("retrieval"):
+            # BM25 needs no query embedding: run it alongside embedding + vector search
+            bm25_future = None
+            if self.bm25_index is not None:
+                bm25_future = self._retrieval_pool().submit(self._bm25_search, question)
+
+            with timer.stage("embed"):
+                qv = self.embedder.embed([question])[0]
+            with timer.stage("vector_search"):
+                hits = self.store.search(
+                    query_vector=_as_list(qv), limit=max(self.top_k, self.max_passages), **self._projection()
+                )
+
+            bm25_hits = []
+            if bm25_future is not None:
+                bm25_hits, timer.ms["bm25"] = bm25_future.result()
+
+        with timer.stage("fusion"):
+            return self._fuse(hits, bm25_hits), qv
+
+    async def _aretrieve(self, question: str, timer: StageTimer) -> tuple[list[dict], Any]:
+        if self.bm25_index is None:
+            await asyncio.to_thread(self._ensure_bm25)
+        with timer.stage("retrieval"):
+            bm25_task = None
+            if self.bm25_index is not None:
+                bm25_task = asyncio.ensure_future(asyncio.to_thread(self._bm25_search, question))
+            try:
+                with timer.stage("embed"):
+                    qv = (await asyncio.to_thread(self.embedder.embed, [question]))[0]
+                limit = max(self.top_k, self.max_passages)
+                with timer.stage("vector_search"):
+                    if self.astore is not None:
+                        hits = await self.astore.search(query_vector=_as_list(qv), limit=limit, **self._projection())
+                    else:
+                        hits = await asyncio.to_thread(
+                            self.store.search, query_vector=_as_list(qv), limit=limit, **self._projection()
+                        )
+            except BaseException:
+                if bm25_task is not None:
+                    bm25_task.cancel()
+                raise
+
+            bm25_hits = []
+            if bm25_task is not None:
+                bm25_hits, timer.ms["bm25"] = await bm25_task
+
+        with timer.stage("fusion"):
+            return self._fuse(hits, bm25_hits), qv
+
+    def _select(self, question: str, fused_sorted: list[dict], timer: StageTimer):
+        """Guardrail decision plus optional re-ranking.
+
+        Returns ``(decision, fused_sorted, passages, reranked)``."""
+        if self.two_phase:
+            # the guardrails read the top text, the re-ranker the texts of its candidates;
+            # without re-ranking the final passages are known now and fetched in one go
+            with timer.stage("hydrate"):
+                if self.rerank_enabled:
+                    self._fill_texts(fused_sorted[: max(1, self.rerank_candidates)])
+                else:
+                    self._hydrate(fused_sorted[: self.max_passages])
+        # decision uses fused_score
+        decision = decide_or_ask(question, fused_sorted, min_score=self.min_score)
+        rerank_active = False
+        if decision.should_answer and self.rerank_enabled:
+            with timer.stage("rerank"):
+                fused_sorted, rerank_active = self._rerank(question, fused_sorted)
+        passages = fused_sorted[: self.max_passages]
+        if self.two_phase:
+            with timer.stage("hydrate"):
+                self._hydrate(passages)
+        return decision, fused_sorted, passages, rerank_active
+
+    def _projection(self) -> dict:
+        return {"fields": RANKING_FIELDS} if self.two_phase else {}
+
+    def _fill_texts(self, candidates: list[dict]) -> None:
+        """Add ``text`` to candidates without it: from the BM25 index, else from the store."""
+        missing = []
+        for c in candidates:
+            payload = c["payload"] = c["payload"] or {}
+            if payload.get("text") is None:
+                text = self.bm25_index.text_of(payload.get("chunk_id")) if self.bm25_index is not None else None
+                if text is None:
+                    missing.append(c)
+                else:
+                    payload["text"] = text
+        self._hydrate(missing)
+
+    def _hydrate(self, passages: list[dict]) -> None:
+        """Complete the payloads of ``passages`` with one bulk ``store.retrieve``."""
+        # indexed chunks always carry source_path; projected or BM25-only payloads don't
+        todo = {}
+        for c in passages:
+            payload = c["payload"] = c["payload"] or {}
+            if "source_path" not in payload and payload.get("chunk_id"):
+                todo[payload["chunk_id"]] = c
+        if not todo:
+            return
+        for rec in self.store.retrieve(list(todo)):
+            c = todo.get((rec.payload or {}).get("chunk_id"))
+            if c is not None:
+                c["payload"].update(rec.payload)
+
+    def _verifier(self) -> LLMClaimVerifier | NLIClaimVerifier:
+        kind = (self.claim_check_verifier or "llm").lower()
+        if kind == "nli":
+            # built once: it holds the cross-encoder
+            if self._nli_verifier is None:
+                self._nli_verifier = NLIClaimVerifier(
+                    **({"model_name": self.claim_check_model} if self.claim_check_model else {})
+                )
+            return self._nli_verifier
+        if kind != "llm":
+            raise ValueError(f"Unknown claim-check verifier: {kind} (expected one of {', '.join(CLAIM_VERIFIERS)})")
+        return LLMClaimVerifier(self.llm, language=self.language)
+
+    def _claim_check(self, answer: str, passages: list[dict], timer: StageTimer) -> list[str]:
+        # Claim-check step: mark unsupported sentences
+        verifier = self._verifier()
+        try:
+            with timer.stage("claim_check"):
+                return verifier.verify([answer], passages)
+        except Exception:
+            # if claim-check fails, treat as no unsupported sentences (fail-open)
+            return []
+
+    async def _aclaim_check(self, answer: str, passages: list[dict], timer: StageTimer) -> list[str]:
+        verifier = self._verifier()
+        try:
+            with timer.stage("claim_check"):
+                return await verifier.averify([answer], passages)
+        except Exception:
+            return []
+
+    def ask(self, question: str) -> dict:
+        if self.claim_check_incremental:
+            # the claim-check can only overlap with generation when the answer streams
+            for ev in self.ask_stream(question):
+                if ev["event"] == "done":
+                    return ev["result"]
+        timer = StageTimer()
+        fused_sorted, qv = self._retrieve(question, timer)
+        decision, fused_sorted, passages, rerank_active = self._select(question, fused_sorted, timer)
+        if not decision.should_answer:
+            return self._refuse(decision, fused_sorted, timer)
+        cached = self._cached(question, passages, qv, timer)
+        if cached is not None:
+            return cached
+
+        prompt = build_grounded_prompt(question, passages, language=self.language)
+        with timer.stage("generate"):
+            answer = self.llm.generate(prompt)
+        unsupported = self._claim_check(answer, passages, timer)
+        result = self._answer(decision, answer, unsupported, passages, rerank_active, timer)
+        self._remember(question, passages, qv, result)
+        return result
+
+    async def _agenerate(self, prompt: str) -> str:
+        agenerate = getattr(self.llm, "agenerate", None)
+        if agenerate is not None:
+            return await agenerate(prompt)
+        return await asyncio.to_thread(self.llm.generate, prompt)
+
+    async def aask(self, question: str) -> dict:
+        """Async ``ask``: same pipeline and result, but network calls are awaited
+        (``astore``, ``LLM.agenerate``) and CPU-bound stages (embedding, BM25,
+        re-ranking) run in worker threads, so one event loop can serve many
+        questions at once."""
+        if self.claim_check_incremental:
+            async for ev in self.aask_stream(question):
+                if ev["event"] == "done":
+                    return ev["result"]
+        timer = StageTimer()
+        fused_sorted, qv = await self._aretrieve(question, timer)
+        decision, fused_sorted, passages, rerank_active = await asyncio.to_thread(
+            self._select, question, fused_sorted, timer
+        )
+        if not decision.should_answer:
+            return self._refuse(decision, fused_sorted, timer)
+        cached = self._cached(question, passages, qv, timer)
+        if cached is not None:
+            return cached
+
+        prompt = build_grounded_prompt(question, passages, language=self.language)
+        with timer.stage("generate"):
+            answer = await self._agenerate(prompt)
+        unsupported = await self._aclaim_check(answer, passages, timer)
+        result = self._answer(decision, answer, unsupported, passages, rerank_active, timer)
+        self._remember(question, passages, qv, result)
+        return result
+
+    def _retrieval_event(self, decision, passages: list[dict], rerank_active: bool) -> dict:
+        return {
+            "event": "retrieval",
+            "passages": passages,
+            "reason": decision.reason,
+            "should_answer": decision.should_answer,
+            "reranked": rerank_active,
         }
+
+    @staticmethod
+    def _cached_events(result: dict) -> list[dict]:
+        # a cached answer arrives as one token, already claim-checked
+        return [
+            {"event": "token", "text": result["answer"]},
+            {"event": "claim_check", "claim_check": result["claim_check"], "answer": result["answer"]},
+            {"event": "done", "result": result},
+        ]
+
+    def _stream_tokens(self, prompt: str) -> Iterator[str]:
+        stream = getattr(self.llm, "stream", None)
+        if stream is None:
+            yield self.llm.generate(prompt)
+            return
+        yield from stream(prompt)
+
+    async def _astream_tokens(self, prompt: str) -> AsyncIterator[str]:
+        astream = getattr(self.llm, "astream", None)
+        if astream is not None:
+            async for tok in astream(prompt):
+                yield tok
+            return
+        yield await self._agenerate(prompt)
+
+    def ask_stream(self, question: str) -> Iterator[dict]:
+        """Streaming ``ask``. Yields events in order:
+
+        - ``{"event": "retrieval", "passages", "reason", "should_answer", "reranked"}``
+        - ``{"event": "token", "text"}`` for each piece of the answer
+        - ``{"event": "claim_check", "claim_check", "answer"}`` with the final answer
+        - ``{"event": "done", "result"}`` where ``result`` is what ``ask`` returns
+
+        Refusals skip the token and claim-check events.
+        """
+        timer = StageTimer()
+        fused_sorted, qv = self._retrieve(question, timer)
+        decision, fused_sorted, passages, rerank_active = self._select(question, fused_sorted, timer)
+        yield self._retrieval_event(decision, passages, rerank_active)
+        if not decision.should_answer:
+            yield {"event": "done", "result": self._refuse(decision, fused_sorted, timer)}
+            return
+        cached = self._cached(question, passages, qv, timer)
+        if cached is not None:
+            yield from self._cached_events(cached)
+            return
+
+        prompt = build_grounded_prompt(question, passages, language=self.language)
+        checker = None
+        if self.claim_check_incremental:
+            verifier = self._verifier()
+            pool = self._retrieval_pool()
+            checker = IncrementalClaimCheck(lambda batch: pool.submit(verifier.verify, batch, passages))
+        parts: list[str] = []
+        with timer.stage("generate"):
+            for tok in self._stream_tokens(prompt):
+                if not parts:
+                    timer.mark("first_token")
+                parts.append(tok)
+                if checker is not None:
+                    checker.feed(tok)
+                yield {"event": "token", "text": tok}
+        answer = "".join(parts).strip()
+        if checker is not None:
+            # only the checks still running after the last token add latency
+            with timer.stage("claim_check"):
+                unsupported = checker.finish()
+        else:
+            unsupported = self._claim_check(answer, passages, timer)
+        result = self._answer(decision, answer, unsupported, passages, rerank_active, timer)
+        self._remember(question, passages, qv, result)
+        yield {"event": "claim_check", "claim_check": result["claim_check"], "answer": result["answer"]}
+        yield {"event": "done", "result": result}
+
+    async def aask_stream(self, question: str) -> AsyncIterator[dict]:
+        """Async ``ask_stream`` (same events), used by the UI."""
+        timer = StageTimer()
+        fused_sorted, qv = await self._aretrieve(question, timer)
+        decision, fused_sorted, passages, rerank_active = await asyncio.to_thread(
+            self._select, question, fused_sorted, timer
+        )
+        yield self._retrieval_event(decision, passages, rerank_active)
+        if not decision.should_answer:
+            yield {"event": "done", "result": self._refuse(decision, fused_sorted, timer)}
+            return
+        cached = self._cached(question, passages, qv, timer)
+        if cached is not None:
+            for ev in self._cached_events(cached):
+                yield ev
+            return
+
+        prompt = build_grounded_prompt(question, passages, language=self.language)
+        checker = None
+        if self.claim_check_incremental:
+            verifier = self._verifier()
+            checker = IncrementalClaimCheck(lambda batch: asyncio.ensure_future(verifier.averify(batch, passages)))
+        parts: list[str] = []
+        with timer.stage("generate"):
+            async for tok in self._astream_tokens(prompt):
+                if not parts:
+                    timer.mark("first_token")
+                parts.append(tok)
+                if checker is not None:
+                    checker.feed(tok)
+                yield {"event": "token", "text": tok}
+        answer = "".join(parts).strip()
+        if checker is not None:
+            with timer.stage("claim_check"):
+                unsupported = await checker.afinish()
+        else:
+            unsupported = await self._aclaim_check(answer, passages, timer)
+        result = self._answer(decision, answer, unsupported, passages, rerank_active, timer)
+        self._remember(question, passages, qv, result)
+        yield {"event": "claim_check", "claim_check": result["claim_check"], "answer": result["answer"]}
+        yield {"event": "done", "result": result}
@@ -0,0 +1,121 @@
+"""Content-addressed store of chunk embeddings, so re-ingesting reuses vectors.
+
+One directory per embedding model (and storage dtype) holds::
+
+    meta.json     model id, dimension, dtype, format version
+    vectors.bin   row-major float16/float32 rows, appended, read via np.memmap
+    keys.bin      one 32-byte sha256 digest of the chunk text per row
+
+A chunk's vector is looked up by the sha256 of its text, so unchanged chunks
+skip the model no matter which file or position they come from. Both files are
+append-only: vectors are written before their keys, and on open only rows
+present in both files count, so an interrupted ingest leaves a usable store.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Sequence
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_DIGEST = 32
+_DTYPES = ("float32", "float16")
+
+
+class ChunkEmbeddingCache:
+    def __init__(self, root: Path, model_id: str, dim: int, dtype: str = "float32"):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unknown embedding cache dtype {dtype!r} (expected one of {_DTYPES})")
+        self.model_id = model_id
+        self.dim = int(dim)
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        slug = hashlib.sha1(model_id.encode("utf-8")).hexdigest()[:12]
+        self.path = Path(root) / f"{slug}-{dtype}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        meta = {"version": FORMAT_VERSION, "model": model_id, "dim": self.dim, "dtype": dtype}
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            found = json.loads(meta_path.read_text(encoding="utf-8"))
+            if found != meta:
+                raise ValueError(f"Embedding cache {self.path} was written for {found}, not {meta}")
+        else:
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+        self._vectors_path = self.path / "vectors.bin"
+        self._keys_path = self.path / "keys.bin"
+        row_bytes = self.dim * self.dtype.itemsize
+        n_vec = self._vectors_path.stat().st_size // row_bytes if self._vectors_path.exists() else 0
+        keys = self._keys_path.read_bytes() if self._keys_path.exists() else b""
+        self._rows = min(n_vec, len(keys) // _DIGEST)
+        self._index = {keys[i * _DIGEST : (i + 1) * _DIGEST]: i for i in range(self._rows)}
+        # drop a torn tail so appends stay aligned
+        for p, size in ((self._vectors_path, self._rows * row_bytes), (self._keys_path, self._rows * _DIGEST)):
+            if p.exists() and p.stat().st_size != size:
+                with p.open("r+b") as fh:
+                    fh.truncate(size)
+        self._mapped: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _vectors(self) -> np.ndarray:
+        # caller holds the lock; remap after appends
+        if self._mapped is None or self._mapped.shape[0] != self._rows:
+            self._mapped = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self.dim))
+        return self._mapped
+
+    def embed(self, texts: Sequence[str], encode: Callable[[list[str]], np.ndarray]) -> np.ndarray:
+        """Return float32 vectors for ``texts``; only texts not stored yet go to ``encode``."""
+        digests = [hashlib.sha256(t.encode("utf-8")).digest() for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        with self._lock:
+            rows = [self._index.get(d) for d in digests]
+            hit = [i for i, r in enumerate(rows) if r is not None]
+            if hit:
+                out[hit] = self._vectors()[[rows[i] for i in hit]]
+        # new text, deduplicated within the batch
+        todo: dict[bytes, str] = {}
+        for i, r in enumerate(rows):
+            if r is None:
+                todo.setdefault(digests[i], texts[i])
+        if todo:
+            vecs = np.asarray(encode(list(todo.values())), dtype=np.float32)
+            if vecs.shape != (len(todo), self.dim):
+                raise ValueError(f"encode returned shape {vecs.shape}, expected {(len(todo), self.dim)}")
+            new = dict(zip(todo, vecs))
+            for i, r in enumerate(rows):
+                if r is None:
+                    out[i] = new[digests[i]]
+            self._append(new)
+        with self._lock:
+            self.hits += len(hit)
+            self.misses += len(texts) - len(hit)
+        return out
+
+    def _append(self, new: dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            new = {d: v for d, v in new.items() if d not in self._index}
+            if not new:
+                return
+            block = np.ascontiguousarray(np.stack(list(new.values())), dtype=self.dtype)
+            with self._vectors_path.open("ab") as fh:
+                fh.write(block.tobytes())
+            with self._keys_path.open("ab") as fh:
+                fh.write(b"".join(new))
+            for d in new:
+                self._index[d] = self._rows
+                self._rows += 1
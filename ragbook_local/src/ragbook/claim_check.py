@@ -0,0 +1,225 @@
+"""Claim-check verifiers and incremental verification of a streaming answer."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+import asyncio
+import concurrent.futures
+import re
+import threading
+import warnings
+
+import numpy as np
+
+from .prompting import build_claim_check_prompt, parse_claim_check_response
+
+# same sentence boundary as strip_unsubstantiated
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+CLAIM_VERIFIERS = ("llm", "nli")
+
+
+class ClaimVerifier(Protocol):
+    def verify(self, sentences: list[str], passages: list[dict]) -> list[str]:
+        """Return the sentences (or exact substrings of them) the passages do not support."""
+        ...
+
+
+@dataclass
+class LLMClaimVerifier:
+    """Ask the LLM to list unsupported sentences (``build_claim_check_prompt``)."""
+
+    llm: Any
+    language: str = "en"
+
+    def _prompt(self, sentences: list[str], passages: list[dict]) -> str:
+        return build_claim_check_prompt(" ".join(sentences), passages, language=self.language)
+
+    def verify(self, sentences: list[str], passages: list[dict]) -> list[str]:
+        if not sentences:
+            return []
+        return parse_claim_check_response(self.llm.generate(self._prompt(sentences, passages)))
+
+    async def averify(self, sentences: list[str], passages: list[dict]) -> list[str]:
+        if not sentences:
+            return []
+        agenerate = getattr(self.llm, "agenerate", None)
+        prompt = self._prompt(sentences, passages)
+        if agenerate is not None:
+            resp = await agenerate(prompt)
+        else:
+            resp = await asyncio.to_thread(self.llm.generate, prompt)
+        return parse_claim_check_response(resp)
+
+
+def _content_tokens(text: str) -> list[str]:
+    # words of 3+ characters carry the claim; short function words and numbering don't
+    return [t for t in _WORD.findall(text.lower()) if len(t) >= 3]
+
+
+@dataclass
+class NLIClaimVerifier:
+    """Local claim verifier: no LLM call, runs on CPU.
+
+    A sentence whose content words almost all occur in one passage
+    (``overlap_threshold``) is supported without further checks; this covers
+    answers that quote or closely paraphrase the books. The remaining sentences are
+    scored against every passage in one batched call to an NLI cross-encoder
+    (premise = passage, hypothesis = sentence) and count as unsupported when no
+    passage entails them with probability ``entailment_threshold``. Sentences with
+    fewer than ``min_tokens`` content words (headings, list markers) are skipped.
+    """
+
+    model_name: str = "cross-encoder/nli-deberta-v3-xsmall"
+    overlap_threshold: float = 0.9
+    entailment_threshold: float = 0.5
+    min_tokens: int = 3
+    batch_size: int = 32
+    device: str | None = None
+    _model: Any = None
+    _entail_idx: int = 1
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _load(self) -> Any:
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> Any:
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(self.model_name, device=self.device)
+            config = getattr(self._model, "config", None)
+            labels = getattr(config, "id2label", None) or {}
+            for idx, label in labels.items():
+                if str(label).lower().startswith("entail"):
+                    self._entail_idx = int(idx)
+        return self._model
+
+    def verify(self, sentences: list[str], passages: list[dict]) -> list[str]:
+        texts = [(p.get("payload") or {}).get("text") or "" for p in passages]
+        vocab = [set(_content_tokens(t)) for t in texts]
+
+        todo = []
+        for s in (x for chunk in sentences for x in _SENTENCE_END.split(chunk.strip())):
+            toks = set(_content_tokens(s))
+            if len(toks) < self.min_tokens:
+                continue
+            overlap = max((len(toks & v) / len(toks) for v in vocab), default=0.0)
+            if overlap < self.overlap_threshold:
+                todo.append(s.strip())
+        if not todo:
+            return []
+        if not texts:
+            return todo
+
+        try:
+            model = self._load()
+            pairs = [(t, s) for s in todo for t in texts]
+            logits = np.asarray(model.predict(pairs, batch_size=self.batch_size), dtype=np.float64)
+        except Exception:
+            # fail open like the LLM claim-check
+            warnings.warn("NLI claim verifier not available; treating sentences as supported.")
+            return []
+        if logits.ndim == 1:  # single-logit models score entailment directly
+            probs = 1.0 / (1.0 + np.exp(-logits))
+        else:
+            e = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs = (e / e.sum(axis=1, keepdims=True))[:, self._entail_idx]
+        best = probs.reshape(len(todo), len(texts)).max(axis=1)
+        return [s for s, p in zip(todo, best) if p < self.entailment_threshold]
+
+    async def averify(self, sentences: list[str], passages: list[dict]) -> list[str]:
+        return await asyncio.to_thread(self.verify, sentences, passages)
+
+
+class SentenceBuffer:
+    """Collect streamed text and hand out sentences once they are complete."""
+
+    def __init__(self):
+        self._buf = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._buf += text
+        parts = _SENTENCE_END.split(self._buf)
+        # the last part may still grow
+        self._buf = parts[-1]
+        return [p.strip() for p in parts[:-1] if p.strip()]
+
+    def flush(self) -> list[str]:
+        rest, self._buf = self._buf.strip(), ""
+        return [rest] if rest else []
+
+
+class IncrementalClaimCheck:
+    """Verify answer sentences while the answer is still being generated.
+
+    ``submit`` starts a check of a batch of sentences and returns a future
+    (``concurrent.futures.Future`` for ``finish``, an awaitable ``asyncio`` future
+    for ``afinish``). At most one check runs at a time; sentences completed in the
+    meantime form the next batch, so once the last token arrives only the tail of
+    the answer is left to verify. Failed checks count as "all supported", like the
+    one-shot claim-check.
+    """
+
+    def __init__(self, submit: Callable[[list[str]], Any]):
+        self._submit = submit
+        self._sentences = SentenceBuffer()
+        self._pending: list[str] = []
+        self._inflight: Any = None
+        self._lock = threading.RLock()  # a finished future runs its callback inline
+        self.unsupported: list[str] = []
+        self.checks = 0
+
+    def feed(self, text: str) -> None:
+        sentences = self._sentences.feed(text)
+        if not sentences:
+            return
+        with self._lock:
+            self._pending.extend(sentences)
+            if self._inflight is None:
+                self._start()
+
+    def _start(self) -> None:
+        # caller holds the lock
+        batch, self._pending = self._pending, []
+        fut = self._inflight = self._submit(batch)
+        self.checks += 1
+        fut.add_done_callback(self._settle)
+
+    def _settle(self, fut) -> None:
+        # runs when a check completes (and again from finish; only the first call counts)
+        with self._lock:
+            if self._inflight is not fut:
+                return
+            self._inflight = None
+            try:
+                self.unsupported.extend(fut.result())
+            except Exception:
+                pass
+            # sentences completed meanwhile are checked right away, not at the next token
+            if self._pending:
+                self._start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            self._pending.extend(self._sentences.flush())
+            if self._inflight is None and self._pending:
+                self._start()
+
+    def finish(self) -> list[str]:
+        """Verify what is left after the last token and return all unsupported sentences."""
+        self._flush()
+        while (fut := self._inflight) is not None:
+            concurrent.futures.wait([fut])
+            self._settle(fut)
+        return self.unsupported
+
+    async def afinish(self) -> list[str]:
+        self._flush()
+        while (fut := self._inflight) is not None:
+            await asyncio.wait([fut])
+            self._settle(fut)
+        return self.unsupported
@@ -4,23 +4,90 @@ from pathlib import Path
 import typer
 
 from .config import load_config
-from .store import QdrantStore
+from .store import AsyncQdrantStore, QdrantStore, VectorStore
+from .local_store import LocalStore
 from .embeddings import Embedder
 from .indexer import index_pdfs
 from .llm import LLM
 from .chat_engine import ChatEngine
+from .rerank import CrossEncoderReranker
 from .retrieval import BM25Index
+from .answer_cache import INGEST_STAMP, AnswerCache
+from .chunk_embeddings import ChunkEmbeddingCache
+from .manifest import MANIFEST, IngestManifest
 from .ui import launch_ui
 from .ingest.ocr import batch_ocr
 
 app = typer.Typer(add_completion=False, help="ragbook_local CLI")
 
 
+def _transport(cfg) -> dict:
+    q = cfg.qdrant
+    return {
+        "prefer_grpc": q.prefer_grpc,
+        "grpc_port": q.grpc_port,
+        "timeout": q.timeout,
+        "pool_size": q.pool_size,
+        "grpc_compression": q.grpc_compression,
+    }
+
+
+def _index(cfg) -> dict:
+    q = cfg.qdrant
+    return {
+        "quantization": q.quantization,
+        "quantization_always_ram": q.quantization_always_ram,
+        "on_disk_vectors": q.on_disk_vectors,
+        "on_disk_payload": q.on_disk_payload,
+        "hnsw_m": q.hnsw_m,
+        "hnsw_ef_construct": q.hnsw_ef_construct,
+    }
+
+
+def _search(cfg) -> dict:
+    q = cfg.qdrant
+    return {"hnsw_ef": q.hnsw_ef, "exact": q.exact, "rescore": q.rescore, "oversampling": q.oversampling}
+
+
+def _store(cfg, **options) -> VectorStore:
+    """The configured vector store; ``options`` are ``QdrantStore`` fields.
+
+    ``qdrant.backend: local`` opens the embedded store under ``data_dir/vectors``
+    instead, configured by ``qdrant.local``.
+    """
+    q = cfg.qdrant
+    if q.backend == "local":
+        return LocalStore.open(
+            cfg.paths.data_dir / "vectors",
+            q.collection,
+            dtype=q.local_dtype,
+            index=q.local_index,
+            nprobe=q.local_nprobe,
+            ivf_lists=q.local_ivf_lists,
+            ivf_min_points=q.local_ivf_min_points,
+        )
+    if q.backend != "qdrant":
+        raise ValueError(f"Unknown vector store backend: {q.backend} (expected qdrant or local)")
+    return QdrantStore.connect(q.url, q.collection, transport=_transport(cfg), **options)
+
+
+def _inference(cfg, section) -> dict:
+    """Backend options of ``cfg.embedding`` or ``cfg.rerank``; ONNX exports live under ``data_dir/onnx``."""
+    return {
+        "backend": section.backend,
+        "onnx_dir": cfg.paths.data_dir / "onnx",
+        "quantization": section.quantization,
+        "intra_op_threads": section.intra_op_threads,
+        "inter_op_threads": section.inter_op_threads,
+    }
+
+
 @app.command()
 def ingest(
     input_path: Path = typer.Argument(..., exists=True, help="Folder with PDFs or a single PDF"),
     config: Path = typer.Option(Path("./config.yaml"), help="Path to config.yaml"),
     ocr: bool = typer.Option(True, help="Apply OCR if a PDF has no text layer"),
+    full: bool = typer.Option(False, help="Re-index every PDF, ignoring the ingest manifest"),
 ):
     cfg = load_config(config)
 
@@ -32,8 +99,25 @@ def ingest(
     if not pdfs:
         raise typer.BadParameter("No PDFs found.")
 
-    store = QdrantStore.connect(cfg.qdrant.url, cfg.qdrant.collection)
-    embedder = Embedder.from_model(cfg.embedding.model_name_or_path, device=cfg.embedding.device)
+    store = _store(
+        cfg,
+        upsert_batch_size=cfg.qdrant.upsert_batch_size,
+        upsert_parallel=cfg.qdrant.upsert_parallel,
+        upsert_retries=cfg.qdrant.upsert_retries,
+        upsert_backoff=cfg.qdrant.upsert_backoff,
+        index_options=_index(cfg),
+    )
+    embedder = Embedder.from_model(
+        cfg.embedding.model_name_or_path, device=cfg.embedding.device, **_inference(cfg, cfg.embedding)
+    )
+    embedding_cache = None
+    if cfg.cache.chunks_enabled:
+        embedding_cache = ChunkEmbeddingCache(
+            Path(cfg.cache.chunks_path) if cfg.cache.chunks_path else cfg.paths.data_dir / "chunk_embeddings",
+            model_id=embedder.model_name,
+            dim=embedder.dimension,
+            dtype=cfg.cache.chunks_dtype,
+        )
 
     res = index_pdfs(
         pdfs,
@@ -42,9 +126,34 @@ def ingest(
         max_chars=cfg.chunking.max_chars,
         overlap_chars=cfg.chunking.overlap_chars,
         ocr_out_dir=cfg.paths.ocr_out_dir if ocr else None,
+        bm25_path=Path(cfg.retrieval.bm25_path) if cfg.retrieval.bm25_path else None,
+        language=cfg.retrieval.language,
+        stamp_path=cfg.paths.data_dir / INGEST_STAMP,
+        embedding_cache=embedding_cache,
+        manifest=IngestManifest.load(cfg.paths.data_dir / MANIFEST),
+        prune_root=input_path,
+        force=full,
+        workers=cfg.ingest.workers,
+        embed_window=cfg.ingest.embed_window,
+        embed_batch_size=cfg.ingest.embed_batch_size,
+        embed_max_tokens=cfg.ingest.embed_max_tokens,
+        queue_size=cfg.ingest.queue_size,
     )
+    store.close()
 
-    typer.echo(f"Indexing complete: docs={res.docs_indexed} chunks={res.chunks_indexed}")
+    typer.echo(
+        f"Indexing complete: docs={res.docs_indexed} chunks={res.chunks_indexed} "
+        f"unchanged={res.docs_skipped} removed={res.docs_removed} stale_chunks={res.chunks_removed}"
+    )
+    embed_line = f"Embeddings: computed={res.embeddings_computed} ({res.chunks_per_second:.1f} chunks/s)"
+    if embedding_cache is not None:
+        embed_line += f" reused={res.embeddings_reused} (hit rate {res.embedding_hit_rate:.0%})"
+    typer.echo(embed_line)
+    up = store.stats
+    typer.echo(
+        f"Upserts: points={up.points} batches={up.batches} retries={up.retries} "
+        f"({up.points_per_second:.0f} points/s)"
+    )
 
 
 @app.command()
@@ -68,14 +177,14 @@ def ocr(
 @app.command()
 def bm25_rebuild(
     config: Path = typer.Option(Path("./config.yaml"), help="Path to config.yaml"),
-    output: Path | None = typer.Option(None, help="Output path for BM25 pickle"),
+    output: Path | None = typer.Option(None, help="Output path for the BM25 index file"),
     force: bool = typer.Option(False, help="Overwrite existing file if present"),
 ):
-    """Build BM25 index from the Qdrant store and persist it to disk."""
+    """Build BM25 index from the vector store and persist it to disk."""
     cfg = load_config(config)
     out = output or Path(cfg.retrieval.bm25_path)
 
-    store = QdrantStore.connect(cfg.qdrant.url, cfg.qdrant.collection)
+    store = _store(cfg)
     idx = BM25Index.from_store(store, language=cfg.retrieval.language)
 
     if out.exists() and not force:
@@ -86,14 +195,37 @@ def bm25_rebuild(
     typer.echo(f"BM25 index saved to: {out}")
 
 
+@app.command()
+def tune_collection(
+    config: Path = typer.Option(Path("./config.yaml"), help="Path to config.yaml"),
+):
+    """Apply qdrant.index (quantization, on-disk vectors, HNSW) to the existing collection.
+
+    With the local backend: compact the vectors file and retrain the IVF lists."""
+    cfg = load_config(config)
+    store = _store(cfg, index_options=_index(cfg))
+    store.tune_collection()
+    store.close()
+    if cfg.qdrant.backend == "local":
+        typer.echo(f"Compacted and re-indexed {cfg.qdrant.collection}.")
+    else:
+        typer.echo(f"Updated {cfg.qdrant.collection}; Qdrant re-indexes it in the background.")
+
+
 @app.command()
 def ui(
     config: Path = typer.Option(Path("./config.yaml"), help="Pfad zur config.yaml"),
 ):
     cfg = load_config(config)
 
-    store = QdrantStore.connect(cfg.qdrant.url, cfg.qdrant.collection)
-    embedder = Embedder.from_model(cfg.embedding.model_name_or_path, device=cfg.embedding.device)
+    store = _store(cfg, search_options=_search(cfg))
+    embedder = Embedder.from_model(
+        cfg.embedding.model_name_or_path,
+        device=cfg.embedding.device,
+        cache_size=cfg.cache.embeddings_max_entries,
+        cache_path=Path(cfg.cache.embeddings_sqlite_path) if cfg.cache.embeddings_sqlite_path else None,
+        **_inference(cfg, cfg.embedding),
+    )
 
     llm = LLM.from_config(
         cfg.llm.backend,
@@ -103,8 +235,37 @@ def ui(
         max_tokens=cfg.llm.max_tokens,
         ollama_url=cfg.llm.url,
         ollama_model=cfg.llm.model,
+        connect_timeout=cfg.llm.connect_timeout,
+        read_timeout=cfg.llm.read_timeout,
+        max_connections=cfg.llm.max_connections,
+        keepalive_connections=cfg.llm.keepalive_connections,
+        keepalive_expiry=cfg.llm.keepalive_expiry,
+        http2=cfg.llm.http2,
+        retries=cfg.llm.retries,
+        retry_backoff=cfg.llm.retry_backoff,
     )
 
+    answer_cache = None
+    if cfg.cache.answers_enabled:
+        answer_cache = AnswerCache(
+            ttl=cfg.cache.answers_ttl,
+            max_entries=cfg.cache.answers_max_entries,
+            max_bytes=int(cfg.cache.answers_max_mb * 1024 * 1024),
+            similarity=cfg.cache.answers_similarity,
+            sqlite_path=Path(cfg.cache.answers_sqlite_path) if cfg.cache.answers_sqlite_path else None,
+            stamp_path=cfg.paths.data_dir / INGEST_STAMP,
+            # settings that change the answer for the same question and passages
+            namespace="|".join(
+                [
+                    cfg.llm.backend,
+                    cfg.llm.model if cfg.llm.backend == "ollama" else cfg.llm.model_path,
+                    cfg.retrieval.language,
+                    cfg.retrieval.claim_check_mode,
+                    cfg.retrieval.claim_check_verifier,
+                ]
+            ),
+        )
+
     engine = ChatEngine(
         store=store,
         embedder=embedder,
@@ -113,14 +274,43 @@ def ui(
         min_score=cfg.retrieval.min_score,
         max_passages=cfg.retrieval.max_passages,
         alpha=cfg.retrieval.alpha,
+        fusion=cfg.retrieval.fusion,
+        rrf_k=cfg.retrieval.rrf_k,
+        fusion_weights=cfg.retrieval.fusion_weights,
         bm25_path=Path(cfg.retrieval.bm25_path) if cfg.retrieval.bm25_path else None,
         rerank_enabled=cfg.rerank.enabled,
         rerank_model=cfg.rerank.model,
         rerank_candidates=cfg.rerank.candidates,
+        reranker=CrossEncoderReranker(
+            model_name=cfg.rerank.model,
+            batch_size=cfg.rerank.batch_size,
+            max_length=cfg.rerank.max_length,
+            cache_size=cfg.rerank.cache_size,
+            device=cfg.embedding.device,
+            **_inference(cfg, cfg.rerank),
+        )
+        if cfg.rerank.enabled
+        else None,
         claim_check_mode=cfg.retrieval.claim_check_mode,
+        claim_check_incremental=cfg.retrieval.claim_check_incremental,
+        claim_check_verifier=cfg.retrieval.claim_check_verifier,
+        claim_check_model=cfg.retrieval.claim_check_model,
+        two_phase=cfg.retrieval.two_phase,
         language=cfg.retrieval.language,
+        # the local store has no async client; aask runs its searches in a thread
+        astore=AsyncQdrantStore.connect(
+            cfg.qdrant.url, cfg.qdrant.collection, transport=_transport(cfg), search_options=_search(cfg)
+        )
+        if cfg.qdrant.backend == "qdrant"
+        else None,
+        answer_cache=answer_cache,
     )
-    launch_ui(engine, host=cfg.ui.host, port=cfg.ui.port)
+    if cfg.rerank.warm_up:
+        engine.warm_up()
+    try:
+        launch_ui(engine, host=cfg.ui.host, port=cfg.ui.port)
+    finally:
+        engine.close()
 
 
 if __name__ == "__main__":
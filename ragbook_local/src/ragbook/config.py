@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import yaml
 
@@ -16,12 +16,51 @@ class PathsConfig:
 class QdrantConfig:
     url: str
     collection: str
+    # "qdrant" (server at url) or "local" (embedded store under data_dir/vectors, qdrant.local)
+    backend: str = "qdrant"
+    # transport: gRPC (port grpc_port) instead of REST, request timeout in seconds,
+    # connections kept open (gRPC channels / REST keep-alive pool)
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    timeout: int | None = None
+    pool_size: int | None = 4
+    grpc_compression: str | None = None
+    # bulk upserts during ingest (qdrant.upsert)
+    upsert_batch_size: int = 256
+    upsert_parallel: int = 2
+    upsert_retries: int = 3
+    upsert_backoff: float = 0.5
+    # collection storage and index (qdrant.index): quantization scalar | binary | None,
+    # vectors / payloads on disk, HNSW graph degree and build-time candidate list
+    quantization: str | None = None
+    quantization_always_ram: bool = True
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    hnsw_m: int | None = None
+    hnsw_ef_construct: int | None = None
+    # query-time search (qdrant.search): HNSW candidate list, exact search, rescoring
+    hnsw_ef: int | None = None
+    exact: bool = False
+    rescore: bool | None = None
+    oversampling: float | None = None
+    # embedded store (qdrant.local): vector dtype, "ivf" or "flat" (exact) search,
+    # IVF lists probed per query, number of lists (None = 2 x sqrt(n)), size to start IVF at
+    local_dtype: str = "float32"
+    local_index: str = "ivf"
+    local_nprobe: int = 16
+    local_ivf_lists: int | None = None
+    local_ivf_min_points: int = 20000
 
 
 @dataclass
 class EmbeddingConfig:
     model_name_or_path: str
     device: str = "cpu"
+    # "onnx" runs the model on ONNX Runtime with int8 weights (``quantization: null`` for fp32)
+    backend: str = "torch"
+    quantization: str | None = "avx2"
+    intra_op_threads: int = 0
+    inter_op_threads: int = 1
 
 
 @dataclass
@@ -30,12 +69,24 @@ class RetrievalConfig:
     min_score: float = 0.2
     max_passages: int = 5
     alpha: float = 0.5
+    # rank fusion strategy: 'minmax' (alpha-weighted min-max), 'rrf', 'zscore' or 'weighted'
+    fusion: str = "minmax"
+    rrf_k: int = 60
+    # optional per-retriever weights (e.g. {'vector': 0.7, 'bm25': 0.3}); defaults derive from alpha
+    fusion_weights: dict[str, float] | None = None
     # claim check mode: 'strip' to remove unsupported sentences, 'refuse' to return refusal message
     claim_check_mode: str = "refuse"
-    # path to persisted BM25 index (optional). If not set, defaults to data_dir / 'bm25.pkl'
+    # verify answer sentences while the answer streams (retrieval.claim_check.incremental)
+    claim_check_incremental: bool = False
+    # 'llm' (second LLM call) or 'nli' (local NLI cross-encoder) (retrieval.claim_check.verifier)
+    claim_check_verifier: str = "llm"
+    claim_check_model: str | None = None
+    # path to persisted BM25 index (optional). If not set, defaults to data_dir / 'bm25.idx'
     bm25_path: str | None = None
     # language hint for retrieval / claim-check (e.g., 'de' for German, 'en' for English, 'auto')
     language: str = "auto"
+    # rank on chunk ids and scores, fetch full payloads only for the final passages
+    two_phase: bool = False
 
 
 @dataclass
@@ -54,6 +105,15 @@ class LLMConfig:
     # ollama
     url: str = "http://localhost:11434"
     model: str = "llama3.1:8b"
+    # HTTP connection pool for ollama (llm.http in config.yaml)
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    max_connections: int = 10
+    keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    retries: int = 2
+    retry_backoff: float = 0.5
 
 
 @dataclass
@@ -61,6 +121,16 @@ class RerankConfig:
     enabled: bool = False
     model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     candidates: int = 30
+    # pairs per forward pass, tokens per (question, passage) pair, cached (question, chunk) scores
+    batch_size: int = 16
+    max_length: int = 512
+    cache_size: int = 4096
+    # load the model when the UI starts instead of on the first question
+    warm_up: bool = True
+    backend: str = "torch"
+    quantization: str | None = "avx2"
+    intra_op_threads: int = 0
+    inter_op_threads: int = 1
 
 
 @dataclass
@@ -68,12 +138,46 @@ class OCRConfig:
     workers: int = 1
 
 
+@dataclass
+class IngestConfig:
+    # processes for OCR check, extraction and chunking; 0 runs them in the ingest process
+    workers: int = 0
+    # chunks (from several PDFs) collected before embedding them
+    embed_window: int = 1024
+    # per model call: chunks, and padded tokens (batch size x longest chunk)
+    embed_batch_size: int = 64
+    embed_max_tokens: int = 32768
+    # documents waiting between pipeline stages
+    queue_size: int = 8
+
+
 @dataclass
 class UIConfig:
     host: str = "127.0.0.1"
     port: int = 7860
 
 
+@dataclass
+class CacheConfig:
+    # answer cache in front of the LLM stage (cache.answers)
+    answers_enabled: bool = False
+    answers_ttl: float = 24 * 3600
+    answers_max_entries: int = 1024
+    answers_max_mb: float = 64.0
+    # min. cosine similarity of question embeddings for a near-duplicate hit; None disables
+    answers_similarity: float | None = 0.97
+    # optional SQLite tier shared by processes (e.g. data_dir/answer_cache.sqlite)
+    answers_sqlite_path: str | None = None
+    # query-embedding cache in Embedder (cache.embeddings); 0 disables the LRU
+    embeddings_max_entries: int = 1024
+    embeddings_sqlite_path: str | None = None
+    # content-addressed chunk embeddings reused by ingest (cache.chunks);
+    # path defaults to data_dir/chunk_embeddings
+    chunks_enabled: bool = True
+    chunks_path: str | None = None
+    chunks_dtype: str = "float32"
+
+
 @dataclass
 class AppConfig:
     paths: PathsConfig
@@ -85,6 +189,8 @@ class AppConfig:
     rerank: RerankConfig
     ui: UIConfig
     ocr: OCRConfig
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    ingest: IngestConfig = field(default_factory=IngestConfig)
 
 
 def load_config(path: str | Path) -> AppConfig:
@@ -98,6 +204,23 @@ def load_config(path: str | Path) -> AppConfig:
     ch = data["chunking"]
     llm = data["llm"]
     ui = data.get("ui", {})
+    fus = (ret.get("fusion") or {}) if isinstance(ret, dict) else {}
+    # shorthand: "fusion: rrf" for "fusion: {method: rrf}"
+    if isinstance(fus, str):
+        fus = {"method": fus}
+    elif not isinstance(fus, dict):
+        raise ValueError(f"retrieval.fusion must be a method name or a mapping, not {fus!r}")
+    rerank = (ret.get("rerank") or {}) if isinstance(ret, dict) else {}
+    http = llm.get("http") or {}
+    answers = (data.get("cache") or {}).get("answers") or {}
+    answers_sim = answers.get("similarity", 0.97)
+    emb_cache = (data.get("cache") or {}).get("embeddings") or {}
+    chunk_cache = (data.get("cache") or {}).get("chunks") or {}
+    ing = data.get("ingest") or {}
+    ups = qd.get("upsert") or {}
+    qidx = qd.get("index") or {}
+    qsearch = qd.get("search") or {}
+    qlocal = qd.get("local") or {}
 
     cfg = AppConfig(
         paths=PathsConfig(
@@ -105,17 +228,57 @@ def load_config(path: str | Path) -> AppConfig:
             data_dir=Path(paths["data_dir"]).expanduser(),
             ocr_out_dir=Path(paths["ocr_out_dir"]).expanduser(),
         ),
-        qdrant=QdrantConfig(url=qd["url"], collection=qd["collection"]),
+        qdrant=QdrantConfig(
+            url=qd["url"],
+            collection=qd["collection"],
+            backend=str(qd.get("backend", "qdrant")),
+            prefer_grpc=bool(qd.get("prefer_grpc", False)),
+            grpc_port=int(qd.get("grpc_port", 6334)),
+            timeout=int(qd["timeout"]) if qd.get("timeout") is not None else None,
+            pool_size=int(qd.get("pool_size", 4)) if qd.get("pool_size", 4) is not None else None,
+            grpc_compression=qd.get("grpc_compression"),
+            upsert_batch_size=int(ups.get("batch_size", 256)),
+            upsert_parallel=int(ups.get("parallel", 2)),
+            upsert_retries=int(ups.get("retries", 3)),
+            upsert_backoff=float(ups.get("retry_backoff", 0.5)),
+            quantization=qidx.get("quantization"),
+            quantization_always_ram=bool(qidx.get("quantization_always_ram", True)),
+            on_disk_vectors=bool(qidx.get("on_disk_vectors", False)),
+            on_disk_payload=bool(qidx.get("on_disk_payload", False)),
+            hnsw_m=int(qidx["hnsw_m"]) if qidx.get("hnsw_m") is not None else None,
+            hnsw_ef_construct=int(qidx["hnsw_ef_construct"]) if qidx.get("hnsw_ef_construct") is not None else None,
+            hnsw_ef=int(qsearch["hnsw_ef"]) if qsearch.get("hnsw_ef") is not None else None,
+            exact=bool(qsearch.get("exact", False)),
+            rescore=bool(qsearch["rescore"]) if qsearch.get("rescore") is not None else None,
+            oversampling=float(qsearch["oversampling"]) if qsearch.get("oversampling") is not None else None,
+            local_dtype=str(qlocal.get("dtype", "float32")),
+            local_index=str(qlocal.get("index", "ivf")),
+            local_nprobe=int(qlocal.get("nprobe", 16)),
+            local_ivf_lists=int(qlocal["ivf_lists"]) if qlocal.get("ivf_lists") is not None else None,
+            local_ivf_min_points=int(qlocal.get("ivf_min_points", 20000)),
+        ),
         embedding=EmbeddingConfig(
-            model_name_or_path=emb["model_name_or_path"], device=emb.get("device", "cpu")
+            model_name_or_path=emb["model_name_or_path"],
+            device=emb.get("device", "cpu"),
+            backend=str(emb.get("backend", "torch")),
+            quantization=emb.get("quantization", "avx2"),
+            intra_op_threads=int(emb.get("intra_op_threads", 0)),
+            inter_op_threads=int(emb.get("inter_op_threads", 1)),
         ),
         retrieval=RetrievalConfig(
             top_k=int(ret.get("top_k", 8)),
             min_score=float(ret.get("min_score", 0.2)),
             max_passages=int(ret.get("max_passages", 5)),
             alpha=float(ret.get("alpha", 0.5)),
+            fusion=str(fus.get("method", "minmax")),
+            rrf_k=int(fus.get("rrf_k", 60)),
+            fusion_weights={str(k): float(v) for k, v in fus["weights"].items()} if fus.get("weights") else None,
             claim_check_mode=ret.get("claim_check", {}).get("mode", "refuse") if isinstance(ret.get("claim_check", {}), dict) else "refuse",
+            claim_check_incremental=bool(ret.get("claim_check", {}).get("incremental", False)) if isinstance(ret.get("claim_check", {}), dict) else False,
+            claim_check_verifier=str(ret.get("claim_check", {}).get("verifier", "llm")) if isinstance(ret.get("claim_check", {}), dict) else "llm",
+            claim_check_model=ret.get("claim_check", {}).get("model") if isinstance(ret.get("claim_check", {}), dict) else None,
             language=(ret.get("language") if isinstance(ret, dict) else "auto") or "auto",
+            two_phase=bool(ret.get("two_phase", False)),
         ),
         chunking=ChunkingConfig(
             max_chars=int(ch.get("max_chars", 2500)),
@@ -129,20 +292,55 @@ def load_config(path: str | Path) -> AppConfig:
             max_tokens=int(llm.get("max_tokens", 512)),
             url=llm.get("url", "http://localhost:11434"),
             model=llm.get("model", "llama3.1:8b"),
+            connect_timeout=float(http.get("connect_timeout", 5.0)),
+            read_timeout=float(http.get("read_timeout", 120.0)),
+            max_connections=int(http.get("max_connections", 10)),
+            keepalive_connections=int(http.get("keepalive_connections", 10)),
+            keepalive_expiry=float(http.get("keepalive_expiry", 60.0)),
+            http2=bool(http.get("http2", True)),
+            retries=int(http.get("retries", 2)),
+            retry_backoff=float(http.get("retry_backoff", 0.5)),
         ),
         rerank=RerankConfig(
-            enabled=bool(ret.get("rerank", {}).get("enabled", False)) if isinstance(ret, dict) else False,
-            model=(ret.get("rerank", {}).get("model") if isinstance(ret, dict) else None)
-            or "cross-encoder/ms-marco-MiniLM-L-6-v2",
-            candidates=int((ret.get("rerank", {}).get("candidates", 30) if isinstance(ret, dict) else 30)),
+            enabled=bool(rerank.get("enabled", False)),
+            model=rerank.get("model") or "cross-encoder/ms-marco-MiniLM-L-6-v2",
+            candidates=int(rerank.get("candidates", 30)),
+            batch_size=int(rerank.get("batch_size", 16)),
+            max_length=int(rerank.get("max_length", 512)),
+            cache_size=int(rerank.get("cache_size", 4096)),
+            warm_up=bool(rerank.get("warm_up", True)),
+            backend=str(rerank.get("backend", "torch")),
+            quantization=rerank.get("quantization", "avx2"),
+            intra_op_threads=int(rerank.get("intra_op_threads", 0)),
+            inter_op_threads=int(rerank.get("inter_op_threads", 1)),
         ),
         ui=UIConfig(host=ui.get("host", "127.0.0.1"), port=int(ui.get("port", 7860))),
         ocr=OCRConfig(workers=int(data.get("ocr", {}).get("workers", 1))),
+        cache=CacheConfig(
+            answers_enabled=bool(answers.get("enabled", False)),
+            answers_ttl=float(answers.get("ttl_seconds", 24 * 3600)),
+            answers_max_entries=int(answers.get("max_entries", 1024)),
+            answers_max_mb=float(answers.get("max_mb", 64.0)),
+            answers_similarity=float(answers_sim) if answers_sim is not None else None,
+            answers_sqlite_path=answers.get("sqlite_path"),
+            embeddings_max_entries=int(emb_cache.get("max_entries", 1024)),
+            embeddings_sqlite_path=emb_cache.get("sqlite_path"),
+            chunks_enabled=bool(chunk_cache.get("enabled", True)),
+            chunks_path=chunk_cache.get("path"),
+            chunks_dtype=str(chunk_cache.get("dtype", "float32")),
+        ),
+        ingest=IngestConfig(
+            workers=int(ing.get("workers", 0)),
+            embed_window=int(ing.get("embed_window", 1024)),
+            embed_batch_size=int(ing.get("embed_batch_size", 64)),
+            embed_max_tokens=int(ing.get("embed_max_tokens", 32768)),
+            queue_size=int(ing.get("queue_size", 8)),
+        ),
     )
 
     # set bm25_path default if not provided in config
     bm25_cfg_path = ret.get("bm25_path") if isinstance(ret, dict) else None
-    cfg.retrieval.bm25_path = bm25_cfg_path if bm25_cfg_path is not None else str(cfg.paths.data_dir / "bm25.pkl")
+    cfg.retrieval.bm25_path = bm25_cfg_path if bm25_cfg_path is not None else str(cfg.paths.data_dir / "bm25.idx")
 
     cfg.paths.data_dir.mkdir(parents=True, exist_ok=True)
     cfg.paths.ocr_out_dir.mkdir(parents=True, exist_ok=True)
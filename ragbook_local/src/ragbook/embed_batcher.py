@@ -0,0 +1,74 @@
+"""Length-bucketed batching of chunk texts for the embedding model.
+
+A transformer pads every text in a batch to the longest one, so mixing a
+heading with a full 2,500-character chunk wastes most of the batch. The batcher
+sorts texts by estimated token length and cuts the sorted run into batches of at
+most ``max_batch_size`` texts and ``max_batch_tokens`` padded tokens (batch size
+times the longest text, which is what the forward pass allocates). Vectors come
+back in input order.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+import math
+import threading
+import time
+
+import numpy as np
+
+
+@dataclass
+class EmbeddingBatcher:
+    encode: Callable[..., np.ndarray]
+    max_batch_size: int = 64
+    max_batch_tokens: int = 32768
+    # texts are truncated to this many tokens by the model
+    max_seq_length: int = 512
+    chars_per_token: float = 4.0
+    texts: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.texts / self.seconds if self.seconds else 0.0
+
+    def token_estimate(self, text: str) -> int:
+        # + [CLS]/[SEP]
+        return min(self.max_seq_length, math.ceil(len(text) / self.chars_per_token) + 2)
+
+    def plan(self, texts: Sequence[str]) -> list[list[int]]:
+        """Group text positions into batches, longest texts first."""
+        lengths = [self.token_estimate(t) for t in texts]
+        order = sorted(range(len(texts)), key=lambda i: -lengths[i])
+        out: list[list[int]] = []
+        group: list[int] = []
+        for i in order:
+            # sorted descending, so the group's first text is its longest
+            longest = lengths[group[0]] if group else lengths[i]
+            if group and (len(group) >= self.max_batch_size or (len(group) + 1) * longest > self.max_batch_tokens):
+                out.append(group)
+                group = []
+            group.append(i)
+        if group:
+            out.append(group)
+        return out
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        out: np.ndarray | None = None
+        for group in self.plan(texts):
+            t = time.perf_counter()
+            vecs = np.asarray(self.encode([texts[i] for i in group], batch_size=len(group)), dtype=np.float32)
+            elapsed = time.perf_counter() - t
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[group] = vecs
+            with self._lock:
+                self.texts += len(group)
+                self.batches += 1
+                self.seconds += elapsed
+        return out if out is not None else np.empty((0, 0), dtype=np.float32)
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Iterable
+import hashlib
+import sqlite3
+import threading
+
 import numpy as np
 
 from sentence_transformers import SentenceTransformer
@@ -9,13 +15,141 @@ from sentence_transformers import SentenceTransformer
 
 @dataclass
 class Embedder:
+    """SentenceTransformer wrapper with a query-embedding cache.
+
+    ``embed`` keeps the vectors of recent texts in an in-process LRU
+    (``cache_size`` entries) keyed on the model name and a hash of the text, so a
+    repeated question skips the forward pass. With ``cache_path`` the vectors are
+    also stored in a SQLite file that several processes can share. Bulk callers
+    (indexing) pass ``cache=False`` so chunks don't evict the queries.
+    """
+
     model: SentenceTransformer
+    model_name: str = ""
+    cache_size: int = 1024
+    cache_path: Path | None = None
+    hits: int = 0
+    misses: int = 0
+    _cache: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _db: sqlite3.Connection | None = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if not self.model_name:
+            self.model_name = str(getattr(self.model, "name_or_path", "") or type(self.model).__name__)
+        if self.cache_path is not None:
+            path = Path(self.cache_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
 
     @classmethod
-    def from_model(cls, model_name_or_path: str, device: str = "cpu") -> "Embedder":
-        model = SentenceTransformer(model_name_or_path, device=device)
-        return cls(model=model)
+    def from_model(
+        cls,
+        model_name_or_path: str,
+        device: str = "cpu",
+        *,
+        cache_size: int = 1024,
+        cache_path: Path | None = None,
+        backend: str = "torch",
+        onnx_dir: Path | None = None,
+        quantization: str | None = "avx2",
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1,
+    ) -> "Embedder":
+        """Load a model on PyTorch or, with ``backend="onnx"``, on ONNX Runtime (see
+        ``ragbook.onnx_backend``; ``onnx_dir`` keeps the exported model)."""
+        model_name = model_name_or_path
+        if backend == "onnx":
+            from .onnx_backend import load_model
+
+            model = load_model(
+                SentenceTransformer,
+                model_name_or_path,
+                export_dir=onnx_dir,
+                quantization=quantization,
+                intra_op_threads=intra_op_threads,
+                inter_op_threads=inter_op_threads,
+                device=device,
+            )
+            # int8 vectors differ slightly from PyTorch's; keep their caches apart
+            model_name = f"{model_name_or_path}#onnx-{quantization or 'fp32'}"
+        elif backend == "torch":
+            model = SentenceTransformer(model_name_or_path, device=device)
+        else:
+            raise ValueError(f"Unknown embedding backend: {backend} (expected torch or onnx)")
+        return cls(model=model, model_name=model_name, cache_size=cache_size, cache_path=cache_path)
+
+    @property
+    def dimension(self) -> int:
+        """Vector size, from the model metadata (no forward pass)."""
+        dim = self.model.get_sentence_embedding_dimension()
+        if dim is None:  # models without a pooling layer don't report it
+            dim = self._encode(["test"]).shape[1]
+        return int(dim)
+
+    @property
+    def max_seq_length(self) -> int:
+        """Token limit the model truncates texts to."""
+        return int(getattr(self.model, "max_seq_length", None) or 512)
 
-    def embed(self, texts: Iterable[str]) -> np.ndarray:
-        vecs = self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+    def _encode(self, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        vecs = self.model.encode(texts, normalize_embeddings=True, show_progress_bar=False, **kwargs)
         return np.asarray(vecs, dtype=np.float32)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x1f{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts: Iterable[str], *, cache: bool = True, batch_size: int | None = None) -> np.ndarray:
+        texts = list(texts)
+        if not cache or (self.cache_size <= 0 and self._db is None) or not texts:
+            return self._encode(texts, batch_size)
+
+        keys = [self._key(t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for k in keys:
+                v = self._cache.get(k)
+                if v is not None:
+                    self._cache.move_to_end(k)
+                    found[k] = v
+            rest = [k for k in dict.fromkeys(keys) if k not in found]
+            if rest and self._db is not None:
+                marks = ",".join("?" * len(rest))
+                for k, blob in self._db.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", rest):
+                    found[k] = np.frombuffer(blob, dtype=np.float32).copy()
+                    self._remember(k, found[k])
+            self.hits += sum(k in found for k in keys)
+
+        todo = {k: t for k, t in zip(keys, texts) if k not in found}
+        if todo:
+            vecs = self._encode(list(todo.values()), batch_size)
+            new = dict(zip(todo, vecs))
+            found.update(new)
+            with self._lock:
+                self.misses += sum(k in new for k in keys)
+                for k, v in new.items():
+                    self._remember(k, v)
+                if self._db is not None:
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO embeddings VALUES (?, ?)",
+                        [(k, v.tobytes()) for k, v in new.items()],
+                    )
+        return np.stack([found[k] for k in keys])
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        # caller holds the lock
+        if self.cache_size <= 0:
+            return
+        vec.setflags(write=False)  # shared between callers
+        self._cache[key] = vec
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Protocol, Sequence
+
+import numpy as np
+
+from .retrieval import BM25Result
+
+# (chunk_id, score, payload) as produced by one retriever, best first
+Candidate = tuple[Any, float, "dict | None"]
+
+
+class FusionStrategy(Protocol):
+    def combine(
+        self, scores: np.ndarray, ranks: np.ndarray, present: np.ndarray, weights: np.ndarray
+    ) -> np.ndarray:
+        """Fuse per-retriever scores into one score per candidate.
+
+        All matrices are ``(n_retrievers, n_candidates)``: ``scores`` holds raw scores
+        (0 where a retriever did not return the candidate), ``ranks`` 0-based positions
+        in each retriever's result list and ``present`` marks returned candidates.
+        """
+        ...
+
+
+def _weighted_sum(weights: np.ndarray, parts: np.ndarray) -> np.ndarray:
+    return (weights[:, None] * parts).sum(axis=0)
+
+
+class MinMaxFusion:
+    """Weighted sum of min-max normalised scores, normalised over all candidates
+    (missing scores count as 0). With weights ``(alpha, 1 - alpha)`` this is the
+    original vector/BM25 fusion."""
+
+    def combine(self, scores, ranks, present, weights):
+        mn = scores.min(axis=1, keepdims=True)
+        mx = scores.max(axis=1, keepdims=True)
+        span = mx - mn
+        flat = span == 0
+        # if all equal, map non-zero to 1.0 and zeros to 0.0
+        normed = np.where(flat, (scores > 0).astype(np.float64), (scores - mn) / np.where(flat, 1.0, span))
+        return _weighted_sum(weights, normed)
+
+
+class ZScoreFusion:
+    """Weighted sum of z-scores computed over each retriever's own results; missing
+    candidates get that retriever's lowest z-score."""
+
+    def combine(self, scores, ranks, present, weights):
+        n = present.sum(axis=1, keepdims=True)
+        safe_n = np.maximum(n, 1)
+        mean = np.where(present, scores, 0.0).sum(axis=1, keepdims=True) / safe_n
+        var = np.where(present, (scores - mean) ** 2, 0.0).sum(axis=1, keepdims=True) / safe_n
+        std = np.sqrt(var)
+        z = np.where(std > 0, (scores - mean) / np.where(std > 0, std, 1.0), 0.0)
+        floor = np.where(present, z, np.inf).min(axis=1, keepdims=True)
+        floor = np.where(np.isfinite(floor), floor, 0.0)
+        return _weighted_sum(weights, np.where(present, z, floor))
+
+
+@dataclass
+class RRFFusion:
+    """Reciprocal rank fusion: ``sum_r w_r / (k + rank_r)`` with 1-based ranks; scores
+    are ignored, so retrievers on different scales need no normalisation. The result
+    is divided by its maximum (rank 1 everywhere), so it lies in [0, 1] like min-max
+    fusion and ``min_score`` keeps a comparable meaning."""
+
+    k: int = 60
+
+    def combine(self, scores, ranks, present, weights):
+        fused = _weighted_sum(weights, np.where(present, 1.0 / (self.k + ranks + 1), 0.0))
+        best = weights.sum() / (self.k + 1)
+        return fused / best if best > 0 else fused
+
+
+class WeightedSumFusion:
+    """Weighted sum of raw scores, for retrievers whose scores share one scale
+    (e.g. several cosine-similarity retrievers)."""
+
+    def combine(self, scores, ranks, present, weights):
+        return _weighted_sum(weights, scores)
+
+
+FUSION_STRATEGIES = ("minmax", "rrf", "zscore", "weighted")
+
+
+def make_fusion(name: str, *, rrf_k: int = 60) -> FusionStrategy:
+    name = (name or "minmax").lower().strip()
+    if name == "minmax":
+        return MinMaxFusion()
+    if name == "rrf":
+        return RRFFusion(k=rrf_k)
+    if name == "zscore":
+        return ZScoreFusion()
+    if name == "weighted":
+        return WeightedSumFusion()
+    raise ValueError(f"Unknown fusion strategy: {name} (expected one of {', '.join(FUSION_STRATEGIES)})")
+
+
+@dataclass
+class HybridFusion:
+    """Fuse ranked results of several retrievers into one candidate list.
+
+    Candidates are collected in a single pass into an id -> column map (first
+    retriever first), scores go into NumPy matrices and ``strategy`` combines them.
+    The first payload seen for an id is kept; BM25-only candidates get a minimal
+    payload from the BM25 result itself, so no lookup into the BM25 id table is needed.
+
+    Retriever weights come from ``weights`` by retriever name; without an entry,
+    ``vector`` gets ``alpha``, ``bm25`` gets ``1 - alpha`` and any other retriever 1.0.
+    """
+
+    alpha: float = 0.5
+    strategy: FusionStrategy = field(default_factory=MinMaxFusion)
+    weights: Mapping[str, float] | None = None
+
+    def fuse(self, vector_hits: Sequence[Any], bm25_hits: Sequence[BM25Result]) -> list[dict]:
+        """Fuse Qdrant ``ScoredPoint``-likes with BM25 results."""
+        return self.fuse_many(
+            {
+                "vector": [
+                    (h.payload.get("chunk_id") if h.payload else None, float(h.score), h.payload or None)
+                    for h in vector_hits
+                ],
+                "bm25": [(r.chunk_id, float(r.score), {"chunk_id": r.chunk_id, "text": r.text}) for r in bm25_hits],
+            }
+        )
+
+    def weight_of(self, name: str) -> float:
+        if self.weights and name in self.weights:
+            return float(self.weights[name])
+        if name == "vector":
+            return float(self.alpha)
+        if name == "bm25":
+            return float(1 - self.alpha)
+        return 1.0
+
+    def fuse_many(self, results: Mapping[str, Sequence[Candidate]]) -> list[dict]:
+        """Return ``[{"fused_score", "payload"}]`` sorted by fused score (stable, descending)."""
+        names = list(results)
+        pos: dict[Any, int] = {}
+        payloads: list[dict | None] = []
+        cols: list[list[int]] = []
+        for name in names:
+            c = []
+            for cid, _, payload in results[name]:
+                i = pos.get(cid)
+                if i is None:
+                    i = pos[cid] = len(payloads)
+                    payloads.append(payload)
+                elif payloads[i] is None and payload:
+                    payloads[i] = payload
+                c.append(i)
+            cols.append(c)
+
+        n = len(payloads)
+        if n == 0:
+            return []
+        scores = np.zeros((len(names), n), dtype=np.float64)
+        ranks = np.zeros((len(names), n), dtype=np.float64)
+        present = np.zeros((len(names), n), dtype=bool)
+        for r, (name, c) in enumerate(zip(names, cols)):
+            idx = np.asarray(c, dtype=np.int64)
+            vals = np.fromiter((s for _, s, _ in results[name]), dtype=np.float64, count=len(c))
+            # a duplicate id within one retriever keeps its last score and first rank
+            scores[r, idx] = vals
+            ranks[r, idx[::-1]] = np.arange(len(c), dtype=np.float64)[::-1]
+            present[r, idx] = True
+
+        weights = np.asarray([self.weight_of(name) for name in names], dtype=np.float64)
+        fused = self.strategy.combine(scores, ranks, present, weights)
+        order = np.argsort(-fused, kind="stable")
+        return [{"fused_score": float(fused[i]), "payload": payloads[i]} for i in order]
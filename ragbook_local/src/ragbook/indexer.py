@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 import hashlib
+import itertools
+import queue
+import threading
 
 from qdrant_client.http.models import PointStruct
 
 from .ingest import extract_pages_text, chunk_pages
+from .ingest.chunking import Chunk
 from .embeddings import Embedder
-from .store import QdrantStore
+from .chunk_embeddings import ChunkEmbeddingCache
+from .embed_batcher import EmbeddingBatcher
+from .store import VectorStore
+from .retrieval import BM25Index
+from .answer_cache import bump_ingest_stamp
+from .manifest import IngestManifest
 from .ingest.ocr import ocr_pdf_if_needed
 
 
@@ -22,58 +33,304 @@ def _doc_id_from_path(p: Path) -> str:
 class IndexResult:
     docs_indexed: int
     chunks_indexed: int
+    # chunk vectors taken from the embedding cache vs. computed by the model
+    embeddings_reused: int = 0
+    embeddings_computed: int = 0
+    # with a manifest: unchanged PDFs skipped, removed PDFs purged, stale chunks deleted
+    docs_skipped: int = 0
+    docs_removed: int = 0
+    chunks_removed: int = 0
+    # time spent in the embedding model
+    embed_seconds: float = 0.0
+
+    @property
+    def embedding_hit_rate(self) -> float:
+        total = self.embeddings_reused + self.embeddings_computed
+        return self.embeddings_reused / total if total else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.embeddings_computed / self.embed_seconds if self.embed_seconds else 0.0
+
+
+@dataclass
+class _Doc:
+    pdf: Path
+    doc_id: str
+    chunks: list[Chunk]
+    points: list[PointStruct] | None = None
+
+
+def _prepare(pdf: Path, ocr_out_dir: Path | None, max_chars: int, overlap_chars: int) -> _Doc:
+    # OCR check, extraction and chunking; runs in a worker process when workers > 0
+    pdf_use = pdf
+    if ocr_out_dir is not None:
+        pdf_use = ocr_pdf_if_needed(pdf, out_dir=ocr_out_dir)
+    pages = extract_pages_text(pdf_use)
+    doc_id = _doc_id_from_path(pdf)
+    return _Doc(pdf, doc_id, chunk_pages(pages, max_chars=max_chars, overlap_chars=overlap_chars, doc_id=doc_id))
+
+
+def _prepared(pdfs: Iterable[Path], workers: int, queue_size: int, *args) -> Iterator[_Doc]:
+    """Prepared documents in input order; with ``workers`` > 0 from a process pool
+    that keeps at most ``queue_size`` documents in flight."""
+    if workers <= 0:
+        for pdf in pdfs:
+            yield _prepare(pdf, *args)
+        return
+    it = iter(pdfs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        first = itertools.islice(it, max(queue_size, workers))
+        pending = deque(pool.submit(_prepare, pdf, *args) for pdf in first)
+        while pending:
+            doc = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(pool.submit(_prepare, nxt, *args))
+            yield doc
+
+
+def _points(doc: _Doc, vecs) -> list[PointStruct]:
+    points = []
+    for local_idx, (c, v) in enumerate(zip(doc.chunks, vecs), start=0):
+        payload = {
+            "chunk_id": c.chunk_id,
+            "doc_id": doc.doc_id,
+            "doc_title": doc.pdf.stem,
+            "source_path": str(doc.pdf.resolve()),
+            "file_link": f"file://{str(doc.pdf.resolve())}#page={int(c.page_start)}",
+            "page": int(c.page_start),
+            "page_start": int(c.page_start),
+            "page_end": int(c.page_end),
+            "section": c.section,
+            "pre_context": c.pre_context or "",
+            "post_context": c.post_context or "",
+            "text": c.text,
+            "local_idx": int(local_idx),
+        }
+        points.append(PointStruct(id=c.chunk_id, vector=v.tolist(), payload=payload))
+    return points
+
+
+class _Writer:
+    """Upsert stage: runs ``write`` for each document, inline or on a thread fed
+    through a bounded queue (so embedding blocks when Qdrant falls behind)."""
+
+    _DONE = object()
+
+    def __init__(self, write: Callable[[_Doc], None], queue_size: int, threaded: bool):
+        self._write = write
+        self._error: BaseException | None = None
+        self._thread = None
+        if threaded:
+            self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+            self._thread = threading.Thread(target=self._run, name="ragbook-upsert", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while (doc := self._queue.get()) is not self._DONE:
+            if self._error is None:
+                try:
+                    self._write(doc)
+                except BaseException as e:  # re-raised in the ingest thread
+                    self._error = e
+
+    def put(self, doc: _Doc) -> None:
+        if self._thread is None:
+            self._write(doc)
+            return
+        if self._error is not None:
+            raise self._error
+        self._queue.put(doc)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(self._DONE)
+            self._thread.join()
+            if self._error is not None:
+                raise self._error
 
 
 def index_pdfs(
     pdf_paths: Iterable[Path],
     *,
-    store: QdrantStore,
+    store: VectorStore,
     embedder: Embedder,
     max_chars: int,
     overlap_chars: int,
     ocr_out_dir: Path | None,
+    bm25_path: Path | None = None,
+    language: str | None = None,
+    stamp_path: Path | None = None,
+    embedding_cache: ChunkEmbeddingCache | None = None,
+    manifest: IngestManifest | None = None,
+    prune_root: Path | None = None,
+    force: bool = False,
+    workers: int = 0,
+    embed_window: int = 1024,
+    embed_batch_size: int = 64,
+    embed_max_tokens: int = 32768,
+    queue_size: int = 8,
 ) -> IndexResult:
+    """Index PDFs into the vector store (Qdrant or ``LocalStore``).
+
+    If ``bm25_path`` is given, the persisted BM25 index there is updated in place as
+    chunks are upserted (new postings plus tombstones for replaced chunk ids) and
+    compacted in a background thread once enough changes have accumulated.
+    If ``stamp_path`` is given, it is rewritten after indexing so answer caches
+    built on the previous content invalidate themselves.
+    With ``embedding_cache``, chunks whose text was embedded before reuse the
+    stored vector and only new or edited text goes through the model.
+
+    With ``manifest``, PDFs indexed before with the same content, embedding model
+    and chunking parameters are skipped. A changed PDF is re-indexed and its chunks
+    that no longer exist are deleted from the store and BM25. With ``prune_root`` as
+    well, PDFs recorded below it that are not among ``pdf_paths`` are purged.
+    ``force`` re-indexes unchanged PDFs too (stale chunks are still deleted).
+
+    Indexing runs as a pipeline: OCR check, extraction and chunking (in
+    ``workers`` processes; 0 runs them in this process), embedding, and the upserts
+    (on a separate thread when ``workers`` > 0). ``queue_size`` bounds the
+    documents waiting between stages. Chunks of consecutive documents are
+    collected until about ``embed_window`` are pending and then embedded in
+    length-sorted batches of at most ``embed_batch_size`` chunks and
+    ``embed_max_tokens`` padded tokens (``EmbeddingBatcher``). Documents are
+    written in input order, so the result is the same for any number of workers.
+    """
     docs = 0
     chunks_total = 0
+    reused = computed = 0
+    skipped = removed_docs = removed_chunks = 0
+    pdf_paths = list(pdf_paths)
+    model = str(getattr(embedder, "model_name", ""))
+    chunking = {"max_chars": max_chars, "overlap_chars": overlap_chars}
+
+    store.ensure_collection(vector_size=embedder.dimension)
+
+    bm25 = None
+    compaction = None
+    if bm25_path is not None:
+        if not BM25Index.exists(bm25_path):
+            # one-time bootstrap so chunks indexed before this index existed are covered
+            BM25Index.from_store(store, language=language).save(bm25_path)
+        bm25 = BM25Index.open(bm25_path, language=language)
+
+    def drop(chunk_ids: list[str]) -> None:
+        nonlocal removed_chunks
+        if not chunk_ids:
+            return
+        store.delete(chunk_ids)
+        if bm25 is not None:
+            bm25.remove(chunk_ids)
+        removed_chunks += len(chunk_ids)
+
+    if manifest is not None and prune_root is not None:
+        present = {IngestManifest.key(p) for p in pdf_paths}
+        for entry in manifest.missing_under(prune_root, present):
+            drop(entry.chunk_ids)
+            del manifest.entries[entry.path]
+            removed_docs += 1
+        if removed_docs:
+            manifest.save()
+
+    def todo() -> Iterator[Path]:
+        nonlocal skipped
+        for pdf in pdf_paths:
+            if not force and manifest is not None and manifest.unchanged(pdf, model=model, chunking=chunking):
+                skipped += 1
+                continue
+            yield pdf
+
+    def write(doc: _Doc) -> None:
+        nonlocal docs, chunks_total, compaction
+        chunk_ids = [c.chunk_id for c in doc.chunks]
+        previous = manifest.entries.get(IngestManifest.key(doc.pdf)) if manifest is not None else None
+        if previous is not None:
+            kept = set(chunk_ids)
+            drop([cid for cid in previous.chunk_ids if cid not in kept])
+        if doc.chunks:
+            # pipelined with the following documents; confirmed by flush()
+            store.upsert(doc.points, wait=False)
+            docs += 1
+            chunks_total += len(doc.points)
+            if bm25 is not None:
+                bm25.add(chunk_ids, [c.text for c in doc.chunks])
+                if bm25.needs_compaction() and (compaction is None or not compaction.is_alive()):
+                    compaction = bm25.compact_in_background()
+        unconfirmed.append(doc)
+        if len(unconfirmed) >= max(1, queue_size):
+            confirm(barrier=False)
+
+    unconfirmed: list[_Doc] = []
+
+    def confirm(barrier: bool) -> None:
+        # record PDFs only once their upserts succeeded, so an interrupted or failed
+        # run re-indexes them next time; PDFs without chunks are recorded too, so
+        # they aren't re-read every run
+        store.flush(barrier=barrier)
+        if manifest is not None and unconfirmed:
+            for doc in unconfirmed:
+                chunk_ids = [c.chunk_id for c in doc.chunks]
+                manifest.record(doc.pdf, doc_id=doc.doc_id, chunk_ids=chunk_ids, model=model, chunking=chunking)
+            manifest.save()
+        unconfirmed.clear()
+
+    batcher = EmbeddingBatcher(
+        lambda texts, batch_size: embedder.embed(texts, cache=False, batch_size=batch_size),
+        max_batch_size=embed_batch_size,
+        max_batch_tokens=embed_max_tokens,
+        max_seq_length=int(getattr(embedder, "max_seq_length", 512)),
+    )
+
+    def embed(batch: list[_Doc]) -> None:
+        nonlocal reused, computed
+        texts = [c.text for doc in batch for c in doc.chunks]
+        if embedding_cache is not None:
+            before = embedding_cache.hits
+            vecs = embedding_cache.embed(texts, batcher.embed)
+            reused += embedding_cache.hits - before
+            computed += len(texts) - (embedding_cache.hits - before)
+        else:
+            vecs = batcher.embed(texts) if texts else []
+            computed += len(texts)
+        pos = 0
+        for doc in batch:
+            doc.points = _points(doc, vecs[pos : pos + len(doc.chunks)])
+            pos += len(doc.chunks)
+            writer.put(doc)
+
+    prepared = _prepared(todo(), workers, queue_size, ocr_out_dir, max_chars, overlap_chars)
+    writer = _Writer(write, queue_size, threaded=workers > 0)
+    try:
+        batch: list[_Doc] = []
+        pending = 0
+        for doc in prepared:
+            batch.append(doc)
+            pending += len(doc.chunks)
+            if pending >= embed_window:
+                embed(batch)
+                batch, pending = [], 0
+        if batch:
+            embed(batch)
+    finally:
+        prepared.close()
+        writer.close()
+    confirm(barrier=True)
+
+    if compaction is not None:
+        compaction.join()
+    if manifest is not None and skipped:
+        manifest.save()  # keeps mtimes refreshed by content-hash checks
+    if stamp_path is not None and (docs or removed_chunks):
+        bump_ingest_stamp(stamp_path)
 
-    dummy = embedder.embed(["test"])
-    store.ensure_collection(vector_size=int(dummy.shape[1]))
-
-    for pdf in pdf_paths:
-        pdf_use = pdf
-        if ocr_out_dir is not None:
-            pdf_use = ocr_pdf_if_needed(pdf, out_dir=ocr_out_dir)
-
-        pages = extract_pages_text(pdf_use)
-        doc_id = _doc_id_from_path(pdf)
-        doc_title = pdf.stem
-
-        chunks = chunk_pages(pages, max_chars=max_chars, overlap_chars=overlap_chars, doc_id=doc_id)
-        if not chunks:
-            continue
-
-        vecs = embedder.embed([c.text for c in chunks])
-        points = []
-        for local_idx, (c, v) in enumerate(zip(chunks, vecs), start=0):
-            payload = {
-                "chunk_id": c.chunk_id,
-                "doc_id": doc_id,
-                "doc_title": doc_title,
-                "source_path": str(pdf.resolve()),
-                "file_link": f"file://{str(pdf.resolve())}#page={int(c.page_start)}",
-                "page": int(c.page_start),
-                "page_start": int(c.page_start),
-                "page_end": int(c.page_end),
-                "section": c.section,
-                "pre_context": c.pre_context or "",
-                "post_context": c.post_context or "",
-                "text": c.text,
-                "local_idx": int(local_idx),
-            }
-            points.append(PointStruct(id=c.chunk_id, vector=v.tolist(), payload=payload))
-
-        store.upsert(points)
-        docs += 1
-        chunks_total += len(points)
-
-    return IndexResult(docs_indexed=docs, chunks_indexed=chunks_total)
+    return IndexResult(
+        docs_indexed=docs,
+        chunks_indexed=chunks_total,
+        embeddings_reused=reused,
+        embeddings_computed=computed,
+        docs_skipped=skipped,
+        docs_removed=removed_docs,
+        chunks_removed=removed_chunks,
+        embed_seconds=batcher.seconds,
+    )
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Callable, Iterable, Sequence, overload
+import bisect
+import math
+
+import numpy as np
+
+
+class StringTable(Sequence[str]):
+    """Read-only sequence of strings stored as one UTF-8 blob plus an offsets array.
+
+    Both arrays may be views into a memory-mapped file, so strings are only decoded
+    when accessed. ``get`` finds a string by binary search, either because the table
+    itself is sorted or through ``order``, a permutation listing rows in sorted order.
+    """
+
+    def __init__(
+        self,
+        blob: np.ndarray,
+        offsets: np.ndarray,
+        *,
+        is_sorted: bool = False,
+        order: np.ndarray | None = None,
+    ):
+        self.blob = blob
+        self.offsets = offsets
+        self.is_sorted = is_sorted
+        self.order = order
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str], *, is_sorted: bool = False) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets, is_sorted=is_sorted)
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0]) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("StringTable index out of range")
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def get(self, s: str, default: int | None = None) -> int | None:
+        """Row of ``s`` (``default`` if absent); needs a sorted table or an ``order``."""
+        if self.is_sorted:
+            view: Sequence[str] = self
+        elif self.order is not None:
+            view = _Permuted(self, self.order)
+        else:
+            raise TypeError("StringTable.get requires a sorted table or a sort order")
+        i = bisect.bisect_left(view, s)
+        if i < len(view) and view[i] == s:
+            return i if self.is_sorted else int(self.order[i])
+        return default
+
+
+class _Permuted(Sequence[str]):
+    def __init__(self, table: StringTable, order: np.ndarray):
+        self._table = table
+        self._order = order
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, i):
+        return self._table[int(self._order[i])]
+
+
+@dataclass
+class InvertedIndex:
+    """Okapi BM25 over an inverted index (term -> postings of doc ids and term frequencies).
+
+    Postings are stored CSR-style: the postings of term ``t`` are
+    ``doc_ids[offsets[t]:offsets[t + 1]]`` / ``tfs[offsets[t]:offsets[t + 1]]``.
+    Only documents that contain a query term are scored. IDF and scoring follow
+    ``rank_bm25.BM25Okapi`` operation by operation, so scores are identical to
+    ``BM25Okapi.get_scores``.
+    """
+
+    # term -> term id; a dict after build, a sorted StringTable once loaded from disk
+    vocab: dict[str, int] | StringTable
+    offsets: np.ndarray
+    doc_ids: np.ndarray
+    tfs: np.ndarray
+    doc_len: np.ndarray
+    idf: np.ndarray
+    avgdl: float
+    k1: float = 1.5
+    b: float = 0.75
+    epsilon: float = 0.25
+    _norm: np.ndarray | None = field(default=None, repr=False)
+
+    @property
+    def corpus_size(self) -> int:
+        return int(self.doc_len.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        corpus: Iterable[Sequence[str]],
+        *,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "InvertedIndex":
+        """Build the index from tokenized documents (same defaults as ``BM25Okapi``).
+
+        ``corpus`` is consumed once, so it may be a generator that tokenizes lazily.
+        """
+        vocab: dict[str, int] = {}
+        term_docs: list[list[int]] = []
+        term_tfs: list[list[int]] = []
+        lengths: list[int] = []
+        total = 0
+
+        for d, doc in enumerate(corpus):
+            lengths.append(len(doc))
+            total += len(doc)
+            freqs: dict[str, int] = {}
+            for tok in doc:
+                freqs[tok] = freqs.get(tok, 0) + 1
+            # term ids are assigned in first-seen order, which is the order BM25Okapi
+            # accumulates its IDF sum in (needed for an identical epsilon floor)
+            for tok, tf in freqs.items():
+                tid = vocab.get(tok)
+                if tid is None:
+                    tid = vocab[tok] = len(vocab)
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[tid].append(d)
+                term_tfs[tid].append(tf)
+
+        n_docs = len(lengths)
+        idf = np.empty(len(vocab), dtype=np.float64)
+        idf_sum = 0.0
+        negative = []
+        for tid, docs in enumerate(term_docs):
+            df = len(docs)
+            v = math.log(n_docs - df + 0.5) - math.log(df + 0.5)
+            idf[tid] = v
+            idf_sum += v
+            if v < 0:
+                negative.append(tid)
+        if negative:
+            idf[negative] = epsilon * (idf_sum / len(vocab))
+
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in term_docs], out=offsets[1:])
+        n_postings = int(offsets[-1])
+        return cls(
+            vocab=vocab,
+            offsets=offsets,
+            doc_ids=np.fromiter(chain.from_iterable(term_docs), dtype=np.int32, count=n_postings),
+            tfs=np.fromiter(chain.from_iterable(term_tfs), dtype=np.int32, count=n_postings),
+            doc_len=np.array(lengths, dtype=np.int32),
+            idf=idf,
+            avgdl=total / n_docs if n_docs else 0.0,
+            k1=k1,
+            b=b,
+            epsilon=epsilon,
+        )
+
+    def sorted_by_term(self) -> "InvertedIndex":
+        """Return an equivalent index whose term ids follow lexicographic term order.
+
+        The vocabulary becomes a sorted ``StringTable`` that needs no dict to look up
+        terms, which is the layout used on disk.
+        """
+        if isinstance(self.vocab, StringTable):
+            return self
+        terms = sorted(self.vocab)
+        order = np.fromiter((self.vocab[t] for t in terms), dtype=np.int64, count=len(terms))
+        lengths = np.diff(self.offsets)[order]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # gather each term's postings slice into its new position
+        gather = np.repeat(self.offsets[order] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return InvertedIndex(
+            vocab=StringTable.from_strings(terms, is_sorted=True),
+            offsets=offsets,
+            doc_ids=self.doc_ids[gather],
+            tfs=self.tfs[gather],
+            doc_len=self.doc_len,
+            idf=self.idf[order],
+            avgdl=self.avgdl,
+            k1=self.k1,
+            b=self.b,
+            epsilon=self.epsilon,
+        )
+
+    def postings(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return ``(doc_ids, tfs)`` of ``term`` or ``None`` if it is not in the vocabulary."""
+        tid = self.vocab.get(term)
+        if tid is None:
+            return None
+        lo, hi = self.offsets[tid], self.offsets[tid + 1]
+        return self.doc_ids[lo:hi], self.tfs[lo:hi]
+
+    def _doc_norms(self) -> np.ndarray:
+        # k1 * (1 - b + b * |d| / avgdl), precomputed once per index
+        if self._norm is None:
+            self._norm = self.k1 * (1 - self.b + self.b * self.doc_len.astype(np.float64) / self.avgdl)
+        return self._norm
+
+    def score(self, query: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(doc_ids, scores)`` for the documents containing at least one query term.
+
+        Repeated query terms count repeatedly, as in ``BM25Okapi.get_scores``.
+        """
+        norm = self._doc_norms()
+        doc_parts = []
+        score_parts = []
+        for tok in query:
+            tid = self.vocab.get(tok)
+            if tid is None:
+                continue
+            lo, hi = self.offsets[tid], self.offsets[tid + 1]
+            docs = self.doc_ids[lo:hi]
+            tf = self.tfs[lo:hi].astype(np.float64)
+            doc_parts.append(docs)
+            score_parts.append(self.idf[tid] * (tf * (self.k1 + 1) / (tf + norm[docs])))
+
+        return accumulate(doc_parts, score_parts)
+
+    def top_k(self, query: Sequence[str], k: int) -> list[tuple[int, float]]:
+        """Return the ``k`` best ``(doc_id, score)`` pairs.
+
+        The ranking equals a stable descending sort over the full ``BM25Okapi`` score
+        vector: ties go to the lower doc id, and documents scoring 0 (including those
+        without any query term) fill up the result before negatively scored ones.
+        """
+        if k <= 0 or self.corpus_size == 0:
+            return []
+        cand, scores = self.score(query)
+        return rank(cand, scores, k, self.corpus_size)
+
+
+class MemorySegment:
+    """Growable in-memory postings for documents added after an index was built."""
+
+    def __init__(self):
+        self.postings: dict[str, tuple[list[int], list[int]]] = {}
+        self.doc_len: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, tokens: Sequence[str]) -> int:
+        """Add one tokenized document and return its row within the segment."""
+        row = len(self.doc_len)
+        self.doc_len.append(len(tokens))
+        freqs: dict[str, int] = {}
+        for tok in tokens:
+            freqs[tok] = freqs.get(tok, 0) + 1
+        for tok, tf in freqs.items():
+            docs, tfs = self.postings.setdefault(tok, ([], []))
+            docs.append(row)
+            tfs.append(tf)
+        return row
+
+    def get(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        p = self.postings.get(term)
+        if p is None:
+            return None
+        return np.asarray(p[0], dtype=np.int64), np.asarray(p[1], dtype=np.int32)
+
+
+def accumulate(doc_parts: list[np.ndarray], score_parts: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Sum per-term score contributions per document."""
+    if not doc_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    # np.add.at accumulates in query-term order, matching BM25Okapi's summation order
+    cand, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+    scores = np.zeros(cand.shape[0], dtype=np.float64)
+    np.add.at(scores, inverse, np.concatenate(score_parts))
+    return cand, scores
+
+
+def rank(
+    cand: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    n_docs: int,
+    is_dead: Callable[[int], bool] | None = None,
+) -> list[tuple[int, float]]:
+    """Top-k over ``n_docs`` documents given the scores of the matching ones.
+
+    Orders like a stable descending sort over a full score vector in which all
+    other documents score 0. ``is_dead`` excludes tombstoned documents from the
+    zero-score padding (``cand`` must already exclude them).
+    """
+    out = _select(cand[scores > 0], scores[scores > 0], k)
+    if len(out) < k:
+        nonzero = set(cand[scores != 0].tolist())
+        for d in range(n_docs):
+            if len(out) >= k:
+                break
+            if d not in nonzero and not (is_dead is not None and is_dead(d)):
+                out.append((d, 0.0))
+    if len(out) < k:
+        out.extend(_select(cand[scores < 0], scores[scores < 0], k - len(out)))
+    return out
+
+
+def _select(doc_ids: np.ndarray, scores: np.ndarray, k: int) -> list[tuple[int, float]]:
+    """Top-k by (score desc, doc id asc) using a partial partition instead of a full sort."""
+    if doc_ids.shape[0] > k:
+        kth = np.partition(scores, -k)[-k]
+        keep = scores >= kth
+        doc_ids, scores = doc_ids[keep], scores[keep]
+    order = np.lexsort((doc_ids, -scores))[:k]
+    return [(int(doc_ids[i]), float(scores[i])) for i in order]
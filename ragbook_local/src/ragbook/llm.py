@@ -1,9 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, Optional
+import asyncio
+import importlib.util
+import json
+import threading
+import time
+
 import httpx
 
+# responses worth retrying: the server is (re)starting or a proxy in front of it is
+_RETRY_STATUS = {502, 503, 504}
+# failures before any response was produced; a stale keep-alive connection that the
+# server already closed surfaces as RemoteProtocolError / ReadError on reuse
+_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+
 
 @dataclass
 class LLM:
@@ -11,6 +23,19 @@ class LLM:
     llama: Optional[object] = None
     ollama_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.1:8b"
+    # HTTP connection pool for the Ollama backend
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    max_connections: int = 10
+    keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    retries: int = 2
+    retry_backoff: float = 0.5
+    # llama.cpp contexts are not reentrant; serialises calls from worker threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _client: httpx.Client | None = field(default=None, repr=False)
+    _aclient: httpx.AsyncClient | None = field(default=None, repr=False)
 
     @classmethod
     def from_config(
@@ -23,9 +48,13 @@ class LLM:
         max_tokens: int,
         ollama_url: str,
         ollama_model: str,
+        **http_options,
     ) -> "LLM":
+        """``http_options`` are the connection pool fields (``connect_timeout``,
+        ``read_timeout``, ``max_connections``, ``keepalive_connections``,
+        ``keepalive_expiry``, ``http2``, ``retries``, ``retry_backoff``)."""
         backend = backend.lower().strip()
-        inst = cls(backend=backend, ollama_url=ollama_url, ollama_model=ollama_model)
+        inst = cls(backend=backend, ollama_url=ollama_url, ollama_model=ollama_model, **http_options)
         inst._max_tokens = int(max_tokens)
         inst._temperature = float(temperature)
 
@@ -44,29 +73,195 @@ class LLM:
 
         raise ValueError(f"Unbekanntes LLM backend: {backend}")
 
+    def _client_options(self) -> dict:
+        # HTTP/2 needs the optional 'h2' package (pip install httpx[http2]) and is only
+        # negotiated over TLS, e.g. with Ollama behind a reverse proxy
+        http2 = self.http2 and importlib.util.find_spec("h2") is not None
+        return {
+            "timeout": httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "http2": http2,
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared client; its pool keeps connections alive between calls."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(**self._client_options())
+        return self._aclient
+
+    def _backoff(self, attempt: int) -> float:
+        return self.retry_backoff * (2**attempt)
+
+    def _post(self, url: str, payload: dict, *, stream: bool = False) -> httpx.Response:
+        """POST with retries; with ``stream=True`` the caller must close the response."""
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                r = self.client.send(self.client.build_request("POST", url, json=payload), stream=stream)
+            except _RETRY_ERRORS:
+                if last:
+                    raise
+            else:
+                if r.status_code not in _RETRY_STATUS or last:
+                    if r.is_error:
+                        r.close()
+                        r.raise_for_status()
+                    return r
+                r.close()
+            time.sleep(self._backoff(attempt))
+        raise AssertionError("unreachable")
+
+    async def _apost(self, url: str, payload: dict, *, stream: bool = False) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                r = await self.aclient.send(self.aclient.build_request("POST", url, json=payload), stream=stream)
+            except _RETRY_ERRORS:
+                if last:
+                    raise
+            else:
+                if r.status_code not in _RETRY_STATUS or last:
+                    if r.is_error:
+                        await r.aclose()
+                        r.raise_for_status()
+                    return r
+                await r.aclose()
+            await asyncio.sleep(self._backoff(attempt))
+        raise AssertionError("unreachable")
+
+    def _ollama_payload(self, prompt: str, stream: bool = False) -> dict:
+        return {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": self._temperature,
+                "num_predict": self._max_tokens,
+            },
+        }
+
+    def _llama_call(self, prompt: str, stream: bool = False):
+        return self.llama(
+            prompt,
+            max_tokens=self._max_tokens,
+            temperature=self._temperature,
+            stop=["</s>"],
+            stream=stream,
+        )
+
     def generate(self, prompt: str) -> str:
         if self.backend == "llama_cpp":
-            out = self.llama(
-                prompt,
-                max_tokens=self._max_tokens,
-                temperature=self._temperature,
-                stop=["</s>"],
-            )
+            with self._lock:
+                out = self._llama_call(prompt)
             return out["choices"][0]["text"].strip()
 
         if self.backend == "ollama":
-            payload = {
-                "model": self.ollama_model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": self._temperature,
-                    "num_predict": self._max_tokens,
-                },
-            }
-            with httpx.Client(timeout=120) as client:
-                r = client.post(f"{self.ollama_url}/api/generate", json=payload)
-                r.raise_for_status()
-                return (r.json().get("response") or "").strip()
+            r = self._post(f"{self.ollama_url}/api/generate", self._ollama_payload(prompt))
+            return (r.json().get("response") or "").strip()
+
+        raise RuntimeError("Backend nicht initialisiert.")
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the answer in pieces as the model produces them.
+
+        Pieces are raw tokens (leading whitespace included); ``"".join(...).strip()``
+        equals what ``generate`` returns.
+        """
+        if self.backend == "llama_cpp":
+            with self._lock:
+                for chunk in self._llama_call(prompt, stream=True):
+                    text = chunk["choices"][0].get("text") or ""
+                    if text:
+                        yield text
+            return
+
+        if self.backend == "ollama":
+            r = self._post(f"{self.ollama_url}/api/generate", self._ollama_payload(prompt, stream=True), stream=True)
+            try:
+                for line in r.iter_lines():
+                    text, done = _ollama_chunk(line)
+                    if text:
+                        yield text
+                    if done:
+                        break
+            finally:
+                r.close()
+            return
+
+        raise RuntimeError("Backend nicht initialisiert.")
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async ``stream``; llama.cpp tokens are pulled from a worker thread."""
+        if self.backend == "llama_cpp":
+            it = self.stream(prompt)
+            try:
+                while True:
+                    text = await asyncio.to_thread(next, it, None)
+                    if text is None:
+                        return
+                    yield text
+            finally:
+                # releases the llama lock if the consumer stops early
+                await asyncio.to_thread(it.close)
+
+        if self.backend == "ollama":
+            r = await self._apost(f"{self.ollama_url}/api/generate", self._ollama_payload(prompt, stream=True), stream=True)
+            try:
+                async for line in r.aiter_lines():
+                    text, done = _ollama_chunk(line)
+                    if text:
+                        yield text
+                    if done:
+                        break
+            finally:
+                await r.aclose()
+            return
 
         raise RuntimeError("Backend nicht initialisiert.")
+
+    async def agenerate(self, prompt: str) -> str:
+        """Async ``generate``: Ollama requests go through the pooled ``httpx.AsyncClient``,
+        llama.cpp runs in a worker thread so the event loop stays free."""
+        if self.backend == "llama_cpp":
+            return await asyncio.to_thread(self.generate, prompt)
+
+        if self.backend == "ollama":
+            r = await self._apost(f"{self.ollama_url}/api/generate", self._ollama_payload(prompt))
+            return (r.json().get("response") or "").strip()
+
+        raise RuntimeError("Backend nicht initialisiert.")
+
+    def close(self) -> None:
+        """Close the pooled connections (safe to call repeatedly)."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+
+def _ollama_chunk(line: str) -> tuple[str, bool]:
+    """Parse one NDJSON line of Ollama's streaming ``/api/generate`` response."""
+    if not line.strip():
+        return "", False
+    obj = json.loads(line)
+    if obj.get("error"):
+        raise RuntimeError(f"Ollama error: {obj['error']}")
+    return obj.get("response") or "", bool(obj.get("done"))
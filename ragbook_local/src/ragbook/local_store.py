@@ -0,0 +1,517 @@
+"""Embedded vector store: ``VectorStore`` without a Qdrant server.
+
+For offline laptops and CI. One directory per collection holds::
+
+    meta.json       dimension, dtype, distance, format version
+    vectors-N.bin   row-major float32/float16 rows (unit length), appended, read via np.memmap
+    points.sqlite   id -> row and JSON payload, plus the name of the current vectors file
+    ivf.npz         IVF centroids and the list of every row (rebuilt when missing)
+
+Vectors are written before the SQLite transaction that references them, so rows
+past the committed row count are a torn tail and are cut on open. Replaced and
+deleted points leave dead rows behind; ``flush`` rewrites the vectors file into a
+new generation once they pass ``compact_ratio``, and the SQLite commit switches
+to it. Search is a blocked exact scan, or with ``index="ivf"`` and at least
+``ivf_min_points`` vectors an inverted-file index: k-means centroids, and only
+the rows of the ``nprobe`` nearest lists are scored. The lists are trained in
+``flush`` (so after an ingest) and retrained once the collection doubles.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.http.models import PointStruct, Record, ScoredPoint
+
+from .store import UpsertStats
+
+FORMAT_VERSION = 1
+_DTYPES = ("float32", "float16")
+INDEXES = ("flat", "ivf")
+
+# rows scored per matrix product in the exact scan
+_BLOCK = 65536
+# SQLite host parameters per IN (...) query
+_IN_CHUNK = 500
+
+
+def _point_id(pid: Any) -> Any:
+    # Qdrant accepts UUID objects and returns them as strings
+    return str(pid) if isinstance(pid, uuid.UUID) else pid
+
+
+def _project(payload: dict, fields: Sequence[str] | None) -> dict:
+    if fields is None:
+        return payload
+    return {k: payload[k] for k in fields if k in payload}
+
+
+def _top(scores: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[keep], rows[keep]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+
+def _normalize(vecs: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs / np.maximum(norms, 1e-12)
+
+
+def train_ivf(vecs: np.ndarray, lists: int, *, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: ``lists`` unit-length centroids for unit-length ``vecs``."""
+    rng = np.random.default_rng(seed)
+    vecs = np.asarray(vecs, dtype=np.float32)
+    lists = max(1, min(lists, len(vecs)))
+    centroids = vecs[rng.choice(len(vecs), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vecs @ centroids.T, axis=1)
+        counts = np.bincount(assign, minlength=lists)
+        # per-list sums of the points, sorted by list
+        order = np.argsort(assign, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        empty = counts == 0
+        sums = np.zeros_like(centroids)
+        sums[~empty] = np.add.reduceat(vecs[order], starts[~empty], axis=0)
+        # reseed empty lists with random points
+        sums[empty] = vecs[rng.choice(len(vecs), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+@dataclass
+class LocalStore:
+    """``VectorStore`` on local files (see the module docstring for the layout).
+
+    Cosine distance, like ``QdrantStore``: vectors are normalized on upsert and hits
+    are scored by dot product. ``dtype="float16"`` halves the vectors file.
+    ``search`` takes ``hnsw_ef`` for compatibility and ignores it; ``exact=True``
+    scans every row instead of the IVF lists. Payload filters are not supported.
+    Writes are applied synchronously, so ``upsert(wait=False)`` and ``flush`` only
+    differ in when compaction and IVF training run. One lock serializes all
+    operations; searches are short numpy scans.
+    """
+
+    path: Path
+    dtype: str = "float32"
+    index: str = "ivf"
+    # below this many vectors the exact scan is as fast as the IVF lists
+    ivf_min_points: int = 20000
+    # number of lists; None picks 2 x sqrt(number of vectors)
+    ivf_lists: int | None = None
+    nprobe: int = 16
+    # compact once this share of the rows are dead (replaced or deleted)
+    compact_ratio: float = 0.25
+    upsert_batch_size: int = 1024
+    stats: UpsertStats = field(default_factory=UpsertStats)
+    dim: int | None = field(default=None, init=False)
+    _db: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+    _vectors_name: str | None = field(default=None, init=False, repr=False)
+    _mapped: np.ndarray | None = field(default=None, init=False, repr=False)
+    _rows: int = field(default=0, init=False, repr=False)
+    _row_of: dict = field(default_factory=dict, init=False, repr=False)
+    _alive: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool), init=False, repr=False)
+    _centroids: np.ndarray | None = field(default=None, init=False, repr=False)
+    # IVF list of the first len(_assign) rows (later rows join on the next search);
+    # _lists holds the rows sorted by list and the list offsets
+    _assign: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32), init=False, repr=False)
+    _trained_rows: int = field(default=0, init=False, repr=False)
+    _lists: tuple[np.ndarray, np.ndarray] | None = field(default=None, init=False, repr=False)
+    _ivf_dirty: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @classmethod
+    def open(cls, root: Path, collection: str, **options) -> "LocalStore":
+        """The store of ``collection`` under ``root`` (e.g. ``data_dir/vectors``);
+        ``options`` are the dtype, index and upsert fields."""
+        return cls(path=Path(root) / collection, **options)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+        if self.dtype not in _DTYPES:
+            raise ValueError(f"Unknown vector dtype {self.dtype!r} (expected one of {_DTYPES})")
+        if self.index not in INDEXES:
+            raise ValueError(f"Unknown local index {self.index!r} (expected one of {INDEXES})")
+        if (self.path / "meta.json").exists():
+            self._load()
+
+    # -- files -------------------------------------------------------------
+
+    def _meta(self, dim: int) -> dict:
+        return {"version": FORMAT_VERSION, "dim": int(dim), "dtype": self.dtype, "distance": "cosine"}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path / "points.sqlite", check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            # no type affinity on id: integer and UUID-string ids both keep their type
+            db.execute("CREATE TABLE IF NOT EXISTS points (id PRIMARY KEY, row INTEGER NOT NULL, payload TEXT)")
+            db.execute("CREATE UNIQUE INDEX IF NOT EXISTS points_row ON points(row)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _state(self, key: str, default: Any = None) -> Any:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+
+    def _set_state(self, key: str, value: Any) -> None:
+        self._conn().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * np.dtype(self.dtype).itemsize
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / self._vectors_name
+
+    def _load(self) -> None:
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        expected = self._meta(meta.get("dim", 0))
+        if meta != expected:
+            raise ValueError(f"Local collection {self.path} was written as {meta}, not {expected}")
+        self.dim = int(meta["dim"])
+        db = self._conn()
+        self._vectors_name = self._state("vectors", "vectors-0.bin")
+        self._rows = int(self._state("rows", 0))
+        # cut a torn tail, and drop files of an interrupted compaction
+        vectors = self._vectors_path
+        size = self._rows * self._row_bytes
+        if vectors.exists() and vectors.stat().st_size != size:
+            with vectors.open("r+b") as fh:
+                fh.truncate(size)
+        for p in self.path.glob("vectors-*.bin*"):
+            if p.name != self._vectors_name:
+                p.unlink()
+        self._row_of = dict(db.execute("SELECT id, row FROM points"))
+        self._alive = np.zeros(self._rows, dtype=bool)
+        self._alive[list(self._row_of.values())] = True
+        self._load_ivf()
+
+    def _load_ivf(self) -> None:
+        if self.index != "ivf":
+            return
+        try:
+            with np.load(self.path / "ivf.npz") as f:
+                if str(f["vectors"]) != self._vectors_name or f["centroids"].shape[1] != self.dim:
+                    return
+                self._centroids = f["centroids"]
+                self._assign = f["assign"][: self._rows].astype(np.int32)
+                self._trained_rows = int(f["trained_rows"])
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return
+
+    def _save_ivf(self) -> None:
+        if not self._ivf_dirty or self._centroids is None:
+            return
+        tmp = self.path / "ivf.tmp.npz"
+        np.savez(
+            tmp,
+            centroids=self._centroids,
+            assign=self._assign[: self._rows],
+            trained_rows=self._trained_rows,
+            vectors=self._vectors_name,
+        )
+        os.replace(tmp, self.path / "ivf.npz")
+        self._ivf_dirty = False
+
+    def _vectors(self) -> np.ndarray:
+        # caller holds the lock; remap after appends and compaction
+        if self._rows == 0:
+            return np.zeros((0, self.dim), dtype=self.dtype)
+        if self._mapped is None or self._mapped.shape[0] != self._rows:
+            self._mapped = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self.dim))
+        return self._mapped
+
+    # -- VectorStore -------------------------------------------------------
+
+    def ensure_collection(self, vector_size: int) -> None:
+        """Create the collection directory unless it exists; a different ``vector_size`` is an error."""
+        with self._lock:
+            if self.dim is not None:
+                if self.dim != int(vector_size):
+                    raise ValueError(f"Local collection {self.path} holds {self.dim}-d vectors, not {vector_size}-d")
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            (self.path / "meta.json").write_text(json.dumps(self._meta(vector_size)), encoding="utf-8")
+            self._load()
+
+    def upsert(self, points: Iterable[PointStruct], *, wait: bool = True) -> None:
+        """Write ``points`` in batches of ``upsert_batch_size``; with ``wait`` run ``flush`` afterwards."""
+        if self.dim is None:
+            raise ValueError(f"Local collection {self.path} does not exist; call ensure_collection first")
+        t = time.perf_counter()
+        batch: list[PointStruct] = []
+        for p in points:
+            batch.append(p)
+            if len(batch) >= max(1, self.upsert_batch_size):
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+        self.stats.seconds += time.perf_counter() - t
+        if wait:
+            self.flush()
+
+    def _write(self, batch: list[PointStruct]) -> None:
+        # the last write of an id within the batch wins
+        latest = {_point_id(p.id): p for p in batch}
+        ids = list(latest)
+        vecs = np.asarray([latest[i].vector for i in ids], dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got shape {vecs.shape}")
+        block = np.ascontiguousarray(_normalize(vecs), dtype=self.dtype)
+        # encode before touching any file, so a bad payload fails the batch cleanly
+        payloads = [json.dumps(latest[i].payload or {}, ensure_ascii=False) for i in ids]
+        with self._lock:
+            first = self._rows
+            rows = range(first, first + len(ids))
+            # write at the committed row count, not the file end: a failed batch's rows
+            # are overwritten (or cut below) instead of shifting every later row
+            end = first * self._row_bytes
+            with self._vectors_path.open("r+b" if self._vectors_path.exists() else "wb") as fh:
+                fh.seek(end)
+                fh.truncate()
+                fh.write(block.tobytes())
+            db = self._conn()
+            try:
+                with db:
+                    db.executemany("DELETE FROM points WHERE id = ?", [(i,) for i in ids if i in self._row_of])
+                    db.executemany(
+                        "INSERT INTO points (id, row, payload) VALUES (?, ?, ?)", list(zip(ids, rows, payloads))
+                    )
+                    self._set_state("rows", first + len(ids))
+            except BaseException:
+                with self._vectors_path.open("r+b") as fh:
+                    fh.truncate(end)
+                raise
+            self._rows = first + len(ids)
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            for i, r in zip(ids, rows):
+                old = self._row_of.get(i)
+                if old is not None:
+                    self._alive[old] = False
+                self._row_of[i] = r
+            self._lists = None
+            self.stats.points += len(ids)
+            self.stats.batches += 1
+
+    def flush(self, *, barrier: bool = True) -> None:
+        """Compact the vectors file and (re)train the IVF lists when due.
+
+        Writes are durable when ``upsert`` returns, so ``barrier`` has nothing to wait for.
+        """
+        with self._lock:
+            if self.dim is None:
+                return
+            dead = self._rows - len(self._row_of)
+            if dead and dead >= self.compact_ratio * self._rows:
+                self._compact()
+            live = len(self._row_of)
+            if self.index == "ivf" and live >= self.ivf_min_points and (
+                self._centroids is None or live >= 2 * self._trained_rows
+            ):
+                self._train()
+            self._save_ivf()
+
+    def close(self) -> None:
+        """Save the IVF lists and close the SQLite connection (reopened on the next call)."""
+        with self._lock:
+            self._save_ivf()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._mapped = None
+
+    def delete(self, point_ids: Iterable) -> None:
+        with self._lock:
+            ids = [i for i in map(_point_id, point_ids) if i in self._row_of]
+            if not ids:
+                return
+            db = self._conn()
+            with db:
+                db.executemany("DELETE FROM points WHERE id = ?", [(i,) for i in ids])
+            for i in ids:
+                row = self._row_of.pop(i, None)
+                if row is not None:
+                    self._alive[row] = False
+
+    def tune_collection(self) -> None:
+        """Compact the vectors file and retrain the IVF lists now."""
+        with self._lock:
+            if self.dim is None:
+                return
+            if self._rows > len(self._row_of):
+                self._compact()
+            if self.index == "ivf" and self._row_of:
+                self._train()
+            self._save_ivf()
+
+    def search(
+        self,
+        query_vector,
+        limit: int = 8,
+        *,
+        hnsw_ef: int | None = None,
+        exact: bool | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[ScoredPoint]:
+        """Nearest chunks by cosine similarity; ``exact`` scans every row instead of the IVF lists.
+
+        ``fields`` limits the payload of each hit to those keys (all of them for ``None``).
+        """
+        if self.dim is None or limit <= 0:
+            return []
+        q = _normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            if not self._row_of:
+                return []
+            if not exact and self._centroids is not None:
+                scores, rows = self._search_ivf(q, limit)
+            else:
+                scores, rows = self._search_flat(q, limit)
+            payloads = self._payloads_by_row(rows.tolist())
+        hits = []
+        for s, r in zip(scores.tolist(), rows.tolist()):
+            pid, payload = payloads[r]
+            hits.append(ScoredPoint(id=pid, version=0, score=s, payload=_project(payload, fields)))
+        return hits
+
+    def _search_flat(self, q: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        vectors = self._vectors()
+        best_s, best_r = np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        for start in range(0, self._rows, _BLOCK):
+            block = np.asarray(vectors[start : start + _BLOCK], dtype=np.float32)
+            s = block @ q
+            alive = self._alive[start : start + len(block)]
+            rows = np.flatnonzero(alive)
+            s, rows = _top(s[rows], rows + start, k)
+            best_s, best_r = _top(np.concatenate([best_s, s]), np.concatenate([best_r, rows]), k)
+        return best_s, best_r
+
+    def _search_ivf(self, q: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        order, offsets = self._ivf_lists()
+        nprobe = min(max(1, self.nprobe), len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+        rows = np.concatenate([order[offsets[c] : offsets[c + 1]] for c in probes])
+        rows = np.sort(rows[self._alive[rows]])
+        if len(rows) < k:
+            # too few candidates in the probed lists
+            return self._search_flat(q, k)
+        s = np.asarray(self._vectors()[rows], dtype=np.float32) @ q
+        return _top(s, rows, k)
+
+    def _ivf_lists(self) -> tuple[np.ndarray, np.ndarray]:
+        # rows added since the last assignment join their nearest list
+        done = len(self._assign)
+        if done < self._rows:
+            new = np.asarray(self._vectors()[done:], dtype=np.float32)
+            assign = np.argmax(new @ self._centroids.T, axis=1).astype(np.int32)
+            self._assign = np.concatenate([self._assign, assign])
+            self._ivf_dirty = True
+            self._lists = None
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable")
+            offsets = np.searchsorted(self._assign[order], np.arange(len(self._centroids) + 1))
+            self._lists = (order, offsets)
+        return self._lists
+
+    def _train(self) -> None:
+        live = np.flatnonzero(self._alive)
+        lists = self.ivf_lists or max(1, int(2 * np.sqrt(len(live))))
+        # k-means on a sample: 64 points per list are plenty
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(live, min(len(live), lists * 64), replace=False))
+        self._centroids = train_ivf(np.asarray(self._vectors()[sample], dtype=np.float32), lists)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = len(live)
+        self._lists = None
+        self._ivf_lists()
+
+    def _compact(self) -> None:
+        """Rewrite the live rows into the next vectors file; the SQLite commit switches to it."""
+        live = np.flatnonzero(self._alive)
+        vectors = self._vectors()
+        generation = int(self._vectors_name.split("-")[1].split(".")[0]) + 1
+        name = f"vectors-{generation}.bin"
+        with (self.path / name).open("wb") as fh:
+            for start in range(0, len(live), _BLOCK):
+                fh.write(np.ascontiguousarray(vectors[live[start : start + _BLOCK]]).tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        new_row = np.full(self._rows, -1, dtype=np.int64)
+        new_row[live] = np.arange(len(live))
+        # ascending old rows map to smaller or equal new rows, so the unique index never collides
+        moves = sorted(((int(new_row[r]), i) for i, r in self._row_of.items() if new_row[r] != r), key=lambda m: m[0])
+        db = self._conn()
+        with db:
+            db.executemany("UPDATE points SET row = ? WHERE id = ?", moves)
+            self._set_state("vectors", name)
+            self._set_state("rows", len(live))
+        old = self._vectors_path
+        self._mapped = None
+        self._vectors_name = name
+        old.unlink(missing_ok=True)
+        self._row_of = {i: int(new_row[r]) for i, r in self._row_of.items()}
+        if self._centroids is not None:
+            self._assign = self._assign[live[live < len(self._assign)]]
+            self._ivf_dirty = True
+        self._rows = len(live)
+        self._alive = np.ones(self._rows, dtype=bool)
+        self._lists = None
+
+    def _payloads_by_row(self, rows: list[int]) -> dict[int, tuple[Any, dict]]:
+        out = {}
+        db = self._conn()
+        for start in range(0, len(rows), _IN_CHUNK):
+            part = rows[start : start + _IN_CHUNK]
+            marks = ",".join("?" * len(part))
+            for pid, row, payload in db.execute(f"SELECT id, row, payload FROM points WHERE row IN ({marks})", part):
+                out[row] = (pid, json.loads(payload))
+        return out
+
+    def retrieve(self, point_ids: Iterable, fields: Sequence[str] | None = None) -> list[Record]:
+        """Points by id, with their payload (only ``fields`` if given) and no vectors."""
+        ids = [_point_id(i) for i in point_ids]
+        records = []
+        with self._lock:
+            if self.dim is None:
+                return []
+            db = self._conn()
+            for start in range(0, len(ids), _IN_CHUNK):
+                part = ids[start : start + _IN_CHUNK]
+                marks = ",".join("?" * len(part))
+                for pid, payload in db.execute(f"SELECT id, payload FROM points WHERE id IN ({marks})", part):
+                    records.append(Record(id=pid, payload=_project(json.loads(payload), fields)))
+        return records
+
+    def fetch_all_chunks(
+        self, fields: Sequence[str] | None = ("text", "chunk_id"), page_size: int = 1000
+    ) -> Iterator[dict]:
+        """Stream all points as dicts with 'id' and 'payload', ``page_size`` rows per query."""
+        after = -1
+        while True:
+            with self._lock:
+                if self.dim is None:
+                    return
+                page = self._conn().execute(
+                    "SELECT id, row, payload FROM points WHERE row > ? ORDER BY row LIMIT ?", (after, page_size)
+                ).fetchall()
+            for pid, row, payload in page:
+                yield {"id": pid, "payload": _project(json.loads(payload), fields)}
+            if len(page) < page_size:
+                break
+            after = page[-1][1]
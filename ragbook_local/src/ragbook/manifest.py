@@ -0,0 +1,105 @@
+"""Ingest manifest: what was indexed from which PDF, so re-runs only touch changes.
+
+The manifest is a JSON file in ``data_dir`` with one entry per indexed PDF
+(resolved path, size, mtime, sha256 of the content, doc id, chunk ids) plus the
+embedding model and chunking parameters it was indexed with. A file whose size
+and mtime are unchanged is skipped without reading it; otherwise its content
+hash decides, so touching a file doesn't re-index it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import os
+
+MANIFEST = "ingest_manifest.json"
+FORMAT_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    doc_id: str
+    chunk_ids: list[str]
+    model: str
+    chunking: dict = field(default_factory=dict)
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, path: Path, entries: dict[str, ManifestEntry] | None = None):
+        self.path = Path(path)
+        self.entries: dict[str, ManifestEntry] = entries or {}
+
+    @staticmethod
+    def key(pdf: Path) -> str:
+        return str(Path(pdf).resolve())
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestManifest":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != FORMAT_VERSION:
+            # unknown layout: start over, which re-indexes everything once
+            return cls(path)
+        return cls(path, {k: ManifestEntry(**e) for k, e in data.get("files", {}).items()})
+
+    def save(self) -> None:
+        """Write atomically (temp file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": FORMAT_VERSION, "files": {k: asdict(e) for k, e in self.entries.items()}}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def unchanged(self, pdf: Path, *, model: str, chunking: dict) -> bool:
+        """True if ``pdf`` was indexed with the same content, model and chunking."""
+        entry = self.entries.get(self.key(pdf))
+        if entry is None or entry.model != model or entry.chunking != chunking:
+            return False
+        st = Path(pdf).stat()
+        if (st.st_size, st.st_mtime_ns) == (entry.size, entry.mtime_ns):
+            return True
+        if st.st_size != entry.size or file_sha256(pdf) != entry.sha256:
+            return False
+        # same bytes, new mtime (copied or touched): remember the new stat
+        entry.mtime_ns = st.st_mtime_ns
+        return True
+
+    def record(self, pdf: Path, *, doc_id: str, chunk_ids: list[str], model: str, chunking: dict) -> None:
+        st = Path(pdf).stat()
+        self.entries[self.key(pdf)] = ManifestEntry(
+            path=self.key(pdf),
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            sha256=file_sha256(pdf),
+            doc_id=doc_id,
+            chunk_ids=list(chunk_ids),
+            model=model,
+            chunking=dict(chunking),
+        )
+
+    def missing_under(self, root: Path, present: set[str]) -> list[ManifestEntry]:
+        """Entries below ``root`` (a folder or a single file) that are not in ``present``."""
+        root = Path(root).resolve()
+        out = []
+        for key, entry in self.entries.items():
+            p = Path(key)
+            if key not in present and (p == root or root in p.parents):
+                out.append(entry)
+        return out
@@ -0,0 +1,163 @@
+"""ONNX Runtime backend for the embedding and re-ranking models.
+
+On CPU-only hosts the sentence-transformers models run faster on ONNX Runtime,
+and faster again with dynamically quantized int8 weights. ``load_model`` exports a
+model to ONNX and quantizes it the first time it is used. The files are kept under
+``export_dir``, so later starts load them directly. Needs ``onnxruntime`` and
+``optimum`` (``pip install "sentence-transformers[onnx]"``).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import json
+import os
+import re
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx")
+# instruction sets of the dynamic int8 quantization presets; None keeps fp32 weights
+QUANTIZATIONS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+# the export check compares int8 vectors to PyTorch on these
+PROBE_TEXTS = (
+    "What torque does the M8 bolt need?",
+    "Welches Anzugsdrehmoment braucht die M8-Schraube?",
+    "Bearing clearance is measured with a feeler gauge after the housing has cooled down.",
+    "Die Kette ist nachzuspannen, sobald der Durchhang 20 mm überschreitet.",
+    "Table 4: gear ratios 3.45, 1.94, 1.29, 0.97",
+    "Replace the seal if oil is visible on the shaft.",
+)
+MIN_AGREEMENT = 0.98
+# ONNX support: SentenceTransformer since 3.2, CrossEncoder since 4.1
+MIN_VERSION = {"SentenceTransformer": (3, 2), "CrossEncoder": (4, 1)}
+DEFAULT_EXPORT_DIR = Path("~/.cache/ragbook/onnx").expanduser()
+
+
+def session_options(intra_op_threads: int = 0, inter_op_threads: int = 1) -> Any:
+    """ONNX Runtime session options; 0 threads leaves the count to ONNX Runtime (one per core)."""
+    import onnxruntime as ort
+
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads:
+        so.intra_op_num_threads = intra_op_threads
+    if inter_op_threads:
+        so.inter_op_num_threads = inter_op_threads
+    so.execution_mode = ort.ExecutionMode.ORT_PARALLEL if inter_op_threads > 1 else ort.ExecutionMode.ORT_SEQUENTIAL
+    return so
+
+
+def check_version(model_class: str, version: str | None = None) -> None:
+    """Raise if the installed sentence-transformers cannot run ``model_class`` on ONNX."""
+    if version is None:
+        import sentence_transformers
+
+        version = sentence_transformers.__version__
+    minimum = MIN_VERSION.get(model_class, (0,))
+    found = tuple(int(p) for p in re.findall(r"\d+", version)[:2])
+    if found < minimum:
+        need = ".".join(map(str, minimum))
+        raise RuntimeError(
+            f"The onnx backend for {model_class} needs sentence-transformers>={need} (found {version}); "
+            'install it with pip install -e ".[onnx]" or use backend: torch.'
+        )
+
+
+def onnx_file(quantization: str | None) -> str:
+    return f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+
+
+def check_file(quantization: str | None) -> str:
+    return f"ragbook_onnx_check_{quantization}.json"
+
+
+def export_path(export_dir: Path, model_name_or_path: str) -> Path:
+    return Path(export_dir) / re.sub(r"[^\w.-]+", "--", str(model_name_or_path).strip("/\\"))
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of two sets of embeddings of the same texts."""
+    a = np.asarray(reference, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    return (a * b).sum(axis=1) / np.maximum(norms, 1e-12)
+
+
+def load_model(
+    cls,
+    model_name_or_path: str,
+    *,
+    export_dir: Path | None = None,
+    quantization: str | None = "avx2",
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 1,
+    **kwargs,
+):
+    """Load ``cls`` (``SentenceTransformer`` or ``CrossEncoder``) on ONNX Runtime.
+
+    ``quantization`` picks the int8 preset for the host's instruction set (see
+    ``QUANTIZATIONS``). Pass ``None`` for the plain fp32 export. Exports go to
+    ``export_dir`` (default ``~/.cache/ragbook/onnx``).
+    """
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization} (expected one of {', '.join(QUANTIZATIONS)})")
+    check_version(getattr(cls, "__name__", ""))
+    target = export_path(export_dir or DEFAULT_EXPORT_DIR, model_name_or_path)
+    file_name = onnx_file(quantization)
+    if not (target / file_name).exists():
+        _export(cls, model_name_or_path, target, quantization, **kwargs)
+    return cls(
+        str(target),
+        backend="onnx",
+        model_kwargs={
+            "file_name": file_name,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options(intra_op_threads, inter_op_threads),
+        },
+        **kwargs,
+    )
+
+
+def _export(cls, model_name_or_path: str, target: Path, quantization: str | None, **kwargs) -> None:
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # export next to the target and move it into place, so a crash or a concurrent
+    # start never leaves a half-written model behind
+    tmp = Path(tempfile.mkdtemp(prefix=f".{target.name}.", dir=target.parent))
+    try:
+        model = cls(model_name_or_path, backend="onnx", **kwargs)
+        model.save_pretrained(str(tmp))
+        if quantization:
+            export_dynamic_quantized_onnx_model(model, quantization, str(tmp))
+            if hasattr(model, "encode"):
+                _check_agreement(cls, model_name_or_path, tmp, quantization, **kwargs)
+        if not target.exists():
+            os.replace(tmp, target)
+        else:  # another quantization of the model is already there
+            (target / "onnx").mkdir(exist_ok=True)
+            for name in (onnx_file(quantization), check_file(quantization)):
+                if (tmp / name).exists():
+                    os.replace(tmp / name, target / name)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _check_agreement(cls, model_name_or_path: str, exported: Path, quantization: str, **kwargs) -> None:
+    """Compare the quantized embeddings with PyTorch on ``PROBE_TEXTS`` and record the result."""
+    reference = cls(model_name_or_path, **kwargs).encode(list(PROBE_TEXTS), normalize_embeddings=True)
+    quantized = cls(str(exported), backend="onnx", model_kwargs={"file_name": onnx_file(quantization)}, **kwargs)
+    cos = cosine_agreement(reference, quantized.encode(list(PROBE_TEXTS), normalize_embeddings=True))
+    report = {"quantization": quantization, "min_cosine": float(cos.min()), "mean_cosine": float(cos.mean())}
+    (exported / check_file(quantization)).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if cos.min() < MIN_AGREEMENT:
+        warnings.warn(
+            f"int8 {model_name_or_path} agrees with PyTorch only down to cosine {cos.min():.3f}; "
+            "consider quantization: null (fp32 ONNX)."
+        )
@@ -0,0 +1,110 @@
+"""Cross-encoder re-ranking of retrieval candidates."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+import hashlib
+import threading
+import zlib
+
+import numpy as np
+
+
+@dataclass
+class CrossEncoderReranker:
+    """Score ``(question, passage)`` pairs with a sentence-transformers ``CrossEncoder``.
+
+    Pairs are scored in batches of ``batch_size``; each pair is truncated to
+    ``max_length`` tokens by the tokenizer, and passages are cut to a generous
+    character budget first so long chunks are not tokenized in full just to be
+    truncated. Scores are cached per (question, chunk) in an LRU of ``cache_size``
+    entries, so a repeated or refined question only scores new candidates. The model
+    loads on first use or in ``warm_up``.
+    """
+
+    model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    batch_size: int = 16
+    max_length: int = 512
+    cache_size: int = 4096
+    device: str | None = None
+    # "onnx" runs the model on ONNX Runtime (see ``ragbook.onnx_backend``)
+    backend: str = "torch"
+    onnx_dir: Path | None = None
+    quantization: str | None = "avx2"
+    intra_op_threads: int = 0
+    inter_op_threads: int = 1
+    hits: int = 0
+    misses: int = 0
+    _model: Any = None
+    _cache: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    # prose averages about four characters per token; cut well past that
+    chars_per_token = 8
+
+    def __post_init__(self) -> None:
+        if self.backend == "onnx":
+            from .onnx_backend import check_version
+
+            # fail at startup; a failing load() only turns re-ranking off with a warning
+            check_version("CrossEncoder")
+
+    def load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                if self.backend == "onnx":
+                    from .onnx_backend import load_model
+
+                    self._model = load_model(
+                        CrossEncoder,
+                        self.model_name,
+                        export_dir=self.onnx_dir,
+                        quantization=self.quantization,
+                        intra_op_threads=self.intra_op_threads,
+                        inter_op_threads=self.inter_op_threads,
+                        device=self.device,
+                        max_length=self.max_length,
+                    )
+                else:
+                    self._model = CrossEncoder(self.model_name, device=self.device, max_length=self.max_length)
+            return self._model
+
+    def warm_up(self) -> None:
+        """Load the model and run one batch, so the first question does not pay for it."""
+        model = self.load()
+        model.predict([("warm up", "warm up")] * min(self.batch_size, 2), batch_size=self.batch_size)
+
+    def _key(self, qkey: bytes, chunk_id: str, text: str) -> tuple:
+        # the text checksum keeps a re-ingested chunk with the same id from hitting
+        return (qkey, chunk_id, zlib.crc32(text.encode("utf-8")))
+
+    def score(self, question: str, passages: Sequence[tuple[str, str]]) -> list[float]:
+        """Relevance scores for ``(chunk_id, text)`` passages, in input order."""
+        qkey = hashlib.sha256(question.strip().encode("utf-8")).digest()[:16]
+        keys = [self._key(qkey, cid, text) for cid, text in passages]
+        scores: list[float | None] = [None] * len(keys)
+        with self._lock:
+            for i, k in enumerate(keys):
+                s = self._cache.get(k)
+                if s is not None:
+                    self._cache.move_to_end(k)
+                    scores[i] = s
+            todo = [i for i, s in enumerate(scores) if s is None]
+            self.hits += len(keys) - len(todo)
+            self.misses += len(todo)
+        if todo:
+            limit = self.max_length * self.chars_per_token
+            pairs = [(question, passages[i][1][:limit]) for i in todo]
+            out = np.asarray(self.load().predict(pairs, batch_size=self.batch_size), dtype=np.float64)
+            with self._lock:
+                for i, s in zip(todo, out.reshape(len(todo), -1)[:, 0]):
+                    scores[i] = float(s)
+                    self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
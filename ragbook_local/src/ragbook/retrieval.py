@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Sequence
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
+import math
 import pickle
 import re
+import threading
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+
+from .bm25_format import (
+    append_delta,
+    delta_path,
+    is_bm25_file,
+    read_bm25_file,
+    read_delta,
+    write_bm25_file,
+    write_delta,
+)
+from .inverted_index import InvertedIndex, MemorySegment, StringTable, accumulate, rank
 
 
 @dataclass
@@ -16,10 +30,95 @@ class BM25Result:
     text: str
 
 
+class _Rows(Sequence[str]):
+    """Base rows followed by the rows added since the base index was built."""
+
+    def __init__(self, base: Sequence[str], added: list[str]):
+        self._base = base
+        self._added = added
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        nb = len(self._base)
+        return self._base[i] if i < nb else self._added[i - nb]
+
+
 class BM25Index:
+    """BM25 over chunk texts: an immutable base index plus incremental changes.
+
+    ``add``/``remove`` put new chunks into an in-memory segment and tombstone
+    replaced or deleted rows; searches then use corpus statistics of the live rows,
+    so results match a full rebuild (up to rounding of the IDF floor). When the
+    index is attached to a file, every change is appended to a change log next to
+    it and ``compact`` folds the log into a new base file.
+    """
+
+    # compact once the changes since the last full build exceed this share of the
+    # base rows; the geometric growth keeps amortized ingest cost proportional to the
+    # new data rather than to the corpus
+    compact_ratio = 0.25
+    compact_min_rows = 1000
+
     def __init__(self, docs: Iterable[str], ids: Iterable[str], language: str | None = None):
-        self.docs = list(docs)
-        self.ids = list(ids)
+        self._init_tokenizer(language)
+        self._lock = threading.RLock()
+        self._path: Path | None = None
+        self._build(zip(docs, ids))
+
+    def _build(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Index ``(text, chunk_id)`` rows, tokenizing them one at a time as they arrive."""
+        docs: list[str] = []
+        ids: list[str] = []
+        n_tokens = 0
+
+        def tokenized():
+            nonlocal n_tokens
+            for doc, chunk_id in rows:
+                docs.append(doc)
+                ids.append(chunk_id)
+                tokens = self._tokenize(doc)
+                n_tokens += len(tokens)
+                yield tokens
+
+        bm25 = InvertedIndex.build(tokenized())
+        self._reset(docs, ids, bm25 if n_tokens else None)
+
+    def _reset(self, docs: Sequence[str], ids: Sequence[str], bm25: InvertedIndex | None) -> None:
+        """Install a base index and drop all incremental state."""
+        self._base_docs = docs
+        self._base_ids = ids
+        self.bm25 = bm25
+        self._base_rows: dict[str, int] | None = None
+        self._base_dead = np.zeros(len(ids), dtype=bool)
+        self._added = MemorySegment()
+        self._added_docs: list[str] = []
+        self._added_ids: list[str] = []
+        self._added_rows: dict[str, int] = {}
+        self._added_dead: set[int] = set()
+        self._n_dead = 0
+        # document-frequency and total-length corrections of the live rows vs. the base
+        self._df_adjust: Counter[str] = Counter()
+        self._len_adjust = 0
+        self._log: list[dict] = []
+        self._stats: tuple[int, int, float] | None = None
+
+    @property
+    def docs(self) -> Sequence[str]:
+        """Texts by row (tombstoned rows included)."""
+        return _Rows(self._base_docs, self._added_docs) if self._added_docs else self._base_docs
+
+    @property
+    def ids(self) -> Sequence[str]:
+        """Chunk ids by row (tombstoned rows included)."""
+        return _Rows(self._base_ids, self._added_ids) if self._added_ids else self._base_ids
+
+    def _init_tokenizer(self, language: str | None) -> None:
         # language hint (e.g., 'de' for German, 'en' for English, or 'auto')
         self.language = (language or "auto").lower()
 
@@ -34,27 +133,30 @@ class BM25Index:
                 # if nltk not available, fall back to no stemming
                 self._stemmer = None
 
-        self.tokenized = [self._tokenize(d) for d in self.docs]
-        if any(self.tokenized):
-            self.bm25 = BM25Okapi(self.tokenized)
-        else:
-            self.bm25 = None
-
     @classmethod
     def from_store(cls, store, language: str | None = None) -> "BM25Index":
-        pts = store.fetch_all_chunks()
-        docs = []
-        ids = []
-        for p in pts:
-            payload = p.get("payload") if isinstance(p, dict) else None
-            if not payload:
-                continue
-            text = payload.get("text")
-            chunk_id = payload.get("chunk_id")
-            if text and chunk_id:
-                docs.append(text)
-                ids.append(chunk_id)
-        return cls(docs=docs, ids=ids, language=language)
+        """Build the index from the chunks in ``store``.
+
+        ``store.fetch_all_chunks`` is consumed page by page and each chunk is tokenized
+        as it arrives, so besides the index itself only one page is held at a time.
+        """
+
+        def rows():
+            for p in store.fetch_all_chunks():
+                payload = p.get("payload") if isinstance(p, dict) else None
+                if not payload:
+                    continue
+                text = payload.get("text")
+                chunk_id = payload.get("chunk_id")
+                if text and chunk_id:
+                    yield text, chunk_id
+
+        idx = cls.__new__(cls)
+        idx._init_tokenizer(language)
+        idx._lock = threading.RLock()
+        idx._path = None
+        idx._build(rows())
+        return idx
 
     def _tokenize(self, text: str) -> list[str]:
         # simple unicode-aware word tokenizer
@@ -66,24 +168,251 @@ class BM25Index:
                 pass
         return tokens
 
+    def row_of(self, chunk_id: str) -> int | None:
+        """Row of the live chunk ``chunk_id`` or ``None``."""
+        row = self._added_rows.get(chunk_id)
+        if row is not None:
+            return None if row in self._added_dead else row
+        if isinstance(self._base_ids, StringTable) and self._base_ids.order is not None:
+            row = self._base_ids.get(chunk_id)
+        else:
+            if self._base_rows is None:
+                self._base_rows = {cid: i for i, cid in enumerate(self._base_ids)}
+            row = self._base_rows.get(chunk_id)
+        if row is None or self._base_dead[row]:
+            return None
+        return row
+
+    def text_of(self, chunk_id: str) -> str | None:
+        row = self.row_of(chunk_id)
+        return None if row is None else self.docs[row]
+
+    def _is_clean(self) -> bool:
+        return not self._added_ids and self._n_dead == 0
+
+    def _is_dead(self, row: int) -> bool:
+        nb = len(self._base_ids)
+        return bool(self._base_dead[row]) if row < nb else row in self._added_dead
+
     def search(self, query: str, top_k: int = 8) -> list[BM25Result]:
-        if not self.bm25:
-            return []
         tokens = self._tokenize(query)
-        scores = self.bm25.get_scores(tokens)
-        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
-        return [BM25Result(chunk_id=self.ids[i], score=float(scores[i]), text=self.docs[i]) for i in ranked]
+        if self._is_clean():
+            if not self.bm25:
+                return []
+            ranked = self.bm25.top_k(tokens, top_k)
+            ids, docs = self._base_ids, self._base_docs
+        else:
+            with self._lock:
+                ranked = self._search_live(tokens, top_k)
+                ids, docs = self.ids, self.docs
+        return [BM25Result(chunk_id=ids[i], score=score, text=docs[i]) for i, score in ranked]
+
+    def _live_stats(self) -> tuple[int, int, float]:
+        """(live doc count, live token count, average raw IDF over the live vocabulary)."""
+        if self._stats is None:
+            base = self.bm25
+            n_docs = len(self._base_ids) + len(self._added_ids) - self._n_dead
+            total_len = (int(base.doc_len.sum()) if base is not None else 0) + self._len_adjust
+            df = np.diff(base.offsets).astype(np.float64) if base is not None else np.empty(0)
+            extra = []
+            for term, delta in self._df_adjust.items():
+                tid = base.vocab.get(term) if base is not None else None
+                if tid is None:
+                    extra.append(delta)
+                else:
+                    df[tid] += delta
+            df = np.concatenate([df, np.asarray(extra, dtype=np.float64)])
+            df = df[df > 0]
+            avg_idf = float(np.mean(np.log(n_docs - df + 0.5) - np.log(df + 0.5))) if df.size else 0.0
+            self._stats = (n_docs, total_len, avg_idf)
+        return self._stats
+
+    def _search_live(self, tokens: list[str], top_k: int) -> list[tuple[int, float]]:
+        n_docs, total_len, avg_idf = self._live_stats()
+        if top_k <= 0 or n_docs == 0 or total_len == 0:
+            return []
+        base = self.bm25
+        k1, b, epsilon = (base.k1, base.b, base.epsilon) if base is not None else (1.5, 0.75, 0.25)
+        avgdl = total_len / n_docs
+        nb = len(self._base_ids)
+        added_len = np.asarray(self._added.doc_len, dtype=np.float64)
+
+        doc_parts = []
+        score_parts = []
+        for tok in tokens:
+            base_p = base.postings(tok) if base is not None else None
+            added_p = self._added.get(tok)
+            df = (base_p[0].shape[0] if base_p is not None else 0) + self._df_adjust.get(tok, 0)
+            if df <= 0:
+                continue
+            idf = math.log(n_docs - df + 0.5) - math.log(df + 0.5)
+            if idf < 0:
+                idf = epsilon * avg_idf
+
+            segments = []
+            if base_p is not None:
+                docs, tf = base_p
+                live = ~self._base_dead[docs]
+                segments.append((docs[live].astype(np.int64), tf[live], base.doc_len[docs[live]]))
+            if added_p is not None:
+                rows, tf = added_p
+                live = np.array([r + nb not in self._added_dead for r in rows], dtype=bool)
+                segments.append((rows[live] + nb, tf[live], added_len[rows[live]]))
+            for docs, tf, dl in segments:
+                tf = tf.astype(np.float64)
+                doc_parts.append(docs)
+                score_parts.append(idf * (tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))))
+
+        cand, scores = accumulate(doc_parts, score_parts)
+        return rank(cand, scores, top_k, nb + len(self._added_ids), is_dead=self._is_dead)
+
+    def add(self, chunk_ids: Iterable[str], texts: Iterable[str]) -> None:
+        """Index chunks; a chunk id that is already indexed is replaced (its old row tombstoned)."""
+        records = [
+            {"op": "add", "chunk_id": cid, "text": text} for cid, text in zip(chunk_ids, texts) if cid and text
+        ]
+        self._commit(records)
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Tombstone chunks (unknown ids are ignored)."""
+        self._commit([{"op": "del", "chunk_id": cid} for cid in chunk_ids])
+
+    def _commit(self, records: list[dict]) -> None:
+        with self._lock:
+            for r in records:
+                self._apply(r)
+            self._log.extend(records)
+            if self._path is not None:
+                append_delta(self._path, records)
+
+    def _apply(self, record: dict) -> None:
+        cid = record["chunk_id"]
+        self._tombstone(cid)
+        if record["op"] != "add":
+            return
+        text = record["text"]
+        tokens = self._tokenize(text)
+        row = len(self._base_ids) + self._added.add(tokens)
+        self._added_docs.append(text)
+        self._added_ids.append(cid)
+        self._added_rows[cid] = row
+        self._df_adjust.update(set(tokens))
+        self._len_adjust += len(tokens)
+        self._stats = None
+
+    def _tombstone(self, chunk_id: str) -> None:
+        row = self.row_of(chunk_id)
+        if row is None:
+            return
+        # re-tokenize the old text to retract its document frequencies and length
+        tokens = self._tokenize(self.docs[row])
+        if row < len(self._base_ids):
+            self._base_dead[row] = True
+        else:
+            self._added_dead.add(row)
+        self._n_dead += 1
+        self._df_adjust.subtract(set(tokens))
+        self._len_adjust -= len(tokens)
+        self._stats = None
+
+    def _live_rows(self) -> tuple[list[str], list[str]]:
+        docs, ids = self.docs, self.ids
+        rows = [r for r in range(len(ids)) if not self._is_dead(r)]
+        return [docs[r] for r in rows], [ids[r] for r in rows]
+
+    def needs_compaction(self) -> bool:
+        return len(self._log) >= max(self.compact_min_rows, self.compact_ratio * len(self._base_ids))
+
+    def compact(self) -> None:
+        """Rebuild the base index from the live rows and clear the change log.
+
+        Changes committed while the rebuild runs are re-applied on top of the new
+        base. If the index is attached to a file, the new base replaces it atomically;
+        replaying a change log against an already compacted base is harmless.
+        """
+        with self._lock:
+            seen = len(self._log)
+            docs, ids = self._live_rows()
+        fresh = BM25Index(docs, ids, language=self.language)
+
+        if self._path is not None:
+            write_bm25_file(self._path, index=fresh.bm25, ids=ids, docs=docs, language=self.language)
+            f = read_bm25_file(self._path)
+            base = (f.docs, f.ids, f.index)
+        else:
+            base = (docs, ids, fresh.bm25)
+
+        with self._lock:
+            later = self._log[seen:]
+            self._reset(*base)
+            for r in later:
+                self._apply(r)
+            self._log = later
+            if self._path is not None:
+                write_delta(self._path, later)
+
+    def compact_in_background(self) -> threading.Thread:
+        t = threading.Thread(target=self.compact, name="bm25-compact")
+        t.start()
+        return t
 
     def save(self, path: Path) -> None:
-        """Persist the BM25 index (docs + ids) to disk using pickle."""
-        path.parent.mkdir(parents=True, exist_ok=True)
-        data = {"docs": self.docs, "ids": self.ids, "language": self.language}
-        with path.open("wb") as fh:
-            pickle.dump(data, fh)
+        """Persist the live index to disk in the binary format of ``ragbook.bm25_format``.
+
+        A change log left next to ``path`` is removed, since the file now contains it.
+        """
+        path = Path(path)
+        with self._lock:
+            if self._is_clean():
+                write_bm25_file(path, index=self.bm25, ids=self._base_ids, docs=self._base_docs, language=self.language)
+            else:
+                docs, ids = self._live_rows()
+                fresh = BM25Index(docs, ids, language=self.language)
+                write_bm25_file(path, index=fresh.bm25, ids=ids, docs=docs, language=self.language)
+            write_delta(path, [])
 
     @classmethod
     def load(cls, path: Path) -> "BM25Index":
-        """Load a persisted BM25 index from disk."""
-        with path.open("rb") as fh:
-            data = pickle.load(fh)
-        return cls(docs=data.get("docs", []), ids=data.get("ids", []), language=data.get("language", None))
\ No newline at end of file
+        """Load a persisted BM25 index from disk.
+
+        Binary index files are memory-mapped and used as-is (no re-tokenization);
+        ``docs`` and ``ids`` become lazily decoded views into the file. Legacy pickle
+        files (docs + ids) are still accepted and rebuilt. Changes logged next to the
+        file since its last compaction are replayed on top.
+        """
+        path = Path(path)
+        if not is_bm25_file(path):
+            with path.open("rb") as fh:
+                data = pickle.load(fh)
+            idx = cls(docs=data.get("docs", []), ids=data.get("ids", []), language=data.get("language", None))
+        else:
+            f = read_bm25_file(path)
+            idx = cls.__new__(cls)
+            idx._init_tokenizer(f.language)
+            idx._lock = threading.RLock()
+            idx._reset(f.docs, f.ids, f.index)
+        idx._attach(path)
+        return idx
+
+    @classmethod
+    def open(cls, path: Path, language: str | None = None) -> "BM25Index":
+        """Load the index at ``path`` for incremental updates, or start an empty one there."""
+        path = Path(path)
+        if path.exists():
+            return cls.load(path)
+        idx = cls(docs=[], ids=[], language=language)
+        idx._attach(path)
+        return idx
+
+    def _attach(self, path: Path) -> None:
+        """Replay the change log of ``path`` and append future changes to it."""
+        self._path = path
+        with self._lock:
+            for r in read_delta(path):
+                self._apply(r)
+                self._log.append(r)
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        """Whether an index file or a change log exists at ``path``."""
+        return Path(path).exists() or delta_path(path).exists()
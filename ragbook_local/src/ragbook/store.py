@@ -1,28 +1,234 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Iterable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Protocol, Sequence
+import itertools
+import threading
+import time
 
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams, Distance, PointStruct, PayloadSchemaType
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+    VectorParamsDiff,
+)
+
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def client_options(
+    *,
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334,
+    timeout: int | None = None,
+    pool_size: int | None = None,
+    grpc_compression: str | None = None,
+) -> dict:
+    """Keyword arguments for ``QdrantClient`` / ``AsyncQdrantClient``.
+
+    ``pool_size`` sets the number of gRPC channels and the REST keep-alive pool;
+    without it the REST client opens a new connection per request.
+    """
+    opts: dict[str, Any] = {"prefer_grpc": prefer_grpc, "grpc_port": grpc_port}
+    if timeout is not None:
+        opts["timeout"] = int(timeout)
+    if pool_size is not None:
+        opts["pool_size"] = int(pool_size)
+    if prefer_grpc and grpc_compression:
+        from grpc import Compression
+
+        opts["grpc_compression"] = {"gzip": Compression.Gzip, "deflate": Compression.Deflate}[grpc_compression]
+    return opts
+
+
+QUANTIZATIONS = ("scalar", "binary")
+
+
+def collection_options(
+    *,
+    quantization: str | None = None,
+    quantization_always_ram: bool = True,
+    scalar_quantile: float = 0.99,
+    on_disk_vectors: bool = False,
+    on_disk_payload: bool = False,
+    hnsw_m: int | None = None,
+    hnsw_ef_construct: int | None = None,
+) -> dict:
+    """Storage and index settings of the collection, as ``create_collection`` arguments
+    (without ``vectors_config``; ``on_disk_vectors`` goes into its ``VectorParams``).
+
+    ``quantization`` keeps a compressed copy of the vectors for the HNSW search:
+    ``scalar`` (int8, 4x smaller) or ``binary`` (1 bit per dimension, 32x smaller, for
+    embeddings of a few hundred dimensions and more, best with rescoring). With
+    ``quantization_always_ram`` the compressed copy stays in RAM while the original
+    vectors can move to disk with ``on_disk_vectors``.
+    """
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization} (expected one of {', '.join(QUANTIZATIONS)})")
+    opts: dict[str, Any] = {"on_disk_vectors": on_disk_vectors, "on_disk_payload": on_disk_payload}
+    if quantization == "scalar":
+        opts["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8, quantile=scalar_quantile, always_ram=quantization_always_ram
+            )
+        )
+    elif quantization == "binary":
+        opts["quantization_config"] = BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=quantization_always_ram)
+        )
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        opts["hnsw_config"] = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+    return opts
+
+
+def search_params(
+    *,
+    hnsw_ef: int | None = None,
+    exact: bool = False,
+    rescore: bool | None = None,
+    oversampling: float | None = None,
+) -> SearchParams | None:
+    """Per-query search settings; ``None`` when everything is left to Qdrant's defaults.
+
+    ``hnsw_ef`` is the size of the HNSW candidate list (higher is slower and more
+    accurate), ``exact`` skips the index. On quantized collections ``rescore``
+    re-scores the candidates with the original vectors, after fetching
+    ``oversampling`` times ``limit`` of them.
+    """
+    quantization = None
+    if rescore is not None or oversampling is not None:
+        quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and not exact and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+
+def _search_params(options: dict, hnsw_ef: int | None, exact: bool | None) -> SearchParams | None:
+    overrides = {k: v for k, v in (("hnsw_ef", hnsw_ef), ("exact", exact)) if v is not None}
+    return search_params(**{**options, **overrides})
+
+
+def _transient(e: Exception) -> bool:
+    if isinstance(e, UnexpectedResponse):
+        return e.status_code in _RETRY_STATUS
+    # connection errors and timeouts surface as ResponseHandlingException
+    return isinstance(e, (ResponseHandlingException, ConnectionError, TimeoutError))
+
+
+@dataclass
+class UpsertStats:
+    points: int = 0
+    batches: int = 0
+    retries: int = 0
+    # wall time with upserts in flight
+    seconds: float = 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.seconds if self.seconds else 0.0
+
+
+class VectorStore(Protocol):
+    """What ingest (``index_pdfs``), ``BM25Index.from_store`` and ``ChatEngine`` use.
+
+    Implemented by ``QdrantStore`` and by the embedded ``ragbook.local_store.LocalStore``.
+    Points go in as ``PointStruct``; hits come back with ``id``, ``score`` and
+    ``payload``, records with ``id`` and ``payload``. Payload filters (``filter_``)
+    are specific to the Qdrant stores.
+    """
+
+    stats: UpsertStats
+
+    def ensure_collection(self, vector_size: int) -> None: ...
+
+    def upsert(self, points: Iterable[PointStruct], *, wait: bool = True) -> None: ...
+
+    def flush(self, *, barrier: bool = True) -> None: ...
+
+    def delete(self, point_ids: Iterable) -> None: ...
+
+    def search(
+        self,
+        query_vector,
+        limit: int = 8,
+        *,
+        hnsw_ef: int | None = None,
+        exact: bool | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list: ...
+
+    def retrieve(self, point_ids: Iterable, fields: Sequence[str] | None = None) -> list: ...
+
+    def fetch_all_chunks(
+        self, fields: Sequence[str] | None = ("text", "chunk_id"), page_size: int = 1000
+    ) -> Iterator[dict]: ...
+
+    def tune_collection(self) -> None: ...
+
+    def close(self) -> None: ...
 
 
 @dataclass
 class QdrantStore:
+    """Blocking Qdrant access used by ingest and ``ChatEngine.ask``.
+
+    ``upsert`` streams points in batches of ``upsert_batch_size``, with up to
+    ``upsert_parallel`` requests in flight (sent with ``wait=False``) and retries
+    with exponential backoff on connection errors and 429/5xx responses. It only
+    holds the in-flight batches in memory, so any iterable of points works.
+    """
+
     client: QdrantClient
     collection: str
+    upsert_batch_size: int = 256
+    upsert_parallel: int = 2
+    upsert_retries: int = 3
+    upsert_backoff: float = 0.5
+    # ``collection_options`` arguments for new collections
+    index_options: dict = field(default_factory=dict)
+    # ``search_params`` arguments applied to every search
+    search_options: dict = field(default_factory=dict)
+    stats: UpsertStats = field(default_factory=UpsertStats)
+    _executor: ThreadPoolExecutor | None = field(default=None, repr=False)
+    _inflight: deque = field(default_factory=deque, repr=False)
+    _last_batch: list | None = field(default=None, repr=False)
+    _busy_since: float | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
     @classmethod
-    def connect(cls, url: str, collection: str) -> "QdrantStore":
-        client = QdrantClient(url=url)
-        return cls(client=client, collection=collection)
+    def connect(
+        cls, url: str, collection: str, *, transport: dict | None = None, **options
+    ) -> "QdrantStore":
+        """``transport`` holds ``client_options`` arguments (gRPC, timeout, pool size);
+        ``options`` are the upsert, ``index_options`` and ``search_options`` fields."""
+        client = QdrantClient(url=url, **client_options(**(transport or {})))
+        return cls(client=client, collection=collection, **options)
 
     def ensure_collection(self, vector_size: int) -> None:
+        """Create the collection with ``index_options`` unless it exists (see ``tune_collection``)."""
         if self.client.collection_exists(self.collection):
             return
+        opts = collection_options(**self.index_options)
+        on_disk = opts.pop("on_disk_vectors")
         self.client.create_collection(
             collection_name=self.collection,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=on_disk or None),
+            **opts,
         )
         self.client.create_payload_index(
             collection_name=self.collection,
@@ -30,35 +236,199 @@ class QdrantStore:
             field_schema=PayloadSchemaType.KEYWORD,
         )
 
-    def upsert(self, points: Iterable[PointStruct]) -> None:
-        self.client.upsert(collection_name=self.collection, points=list(points))
+    def upsert(self, points: Iterable[PointStruct], *, wait: bool = True) -> None:
+        """Write ``points`` in batches.
 
-    def search(self, query_vector, limit: int = 8, filter_: Any | None = None):
-        return self.client.search(
+        With ``wait=False`` the last batches may still be in flight on return;
+        call ``flush`` to wait for them (later calls keep the pipeline full).
+        """
+        it = iter(points)
+        while batch := list(itertools.islice(it, max(1, self.upsert_batch_size))):
+            self._submit(batch)
+        if wait:
+            self.flush()
+
+    def _submit(self, batch: list[PointStruct]) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, self.upsert_parallel), thread_name_prefix="ragbook-upsert"
+            )
+        # backpressure: at most upsert_parallel batches in flight
+        while len(self._inflight) >= max(1, self.upsert_parallel):
+            self._inflight.popleft().result()
+        if self._busy_since is None:
+            self._busy_since = time.perf_counter()
+        self._inflight.append(self._executor.submit(self._send, batch, False))
+        self._last_batch = batch
+
+    def _send(self, batch: list[PointStruct], wait: bool) -> None:
+        for attempt in range(self.upsert_retries + 1):
+            try:
+                self.client.upsert(collection_name=self.collection, points=batch, wait=wait)
+                break
+            except Exception as e:
+                if attempt >= self.upsert_retries or not _transient(e):
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+                time.sleep(self.upsert_backoff * 2**attempt)
+        with self._lock:
+            self.stats.points += len(batch)
+            self.stats.batches += 1
+
+    def flush(self, *, barrier: bool = True) -> None:
+        """Wait for in-flight upserts and raise the first error.
+
+        With ``barrier``, the last batch is sent once more with ``wait=True``;
+        Qdrant applies updates in order, so once it returns every earlier
+        ``wait=False`` write is applied and searchable.
+        """
+        error = None
+        while self._inflight:
+            try:
+                self._inflight.popleft().result()
+            except Exception as e:
+                error = error or e
+        if error is None and barrier and self._last_batch is not None:
+            try:
+                self.client.upsert(collection_name=self.collection, points=self._last_batch, wait=True)
+            except Exception as e:
+                error = e
+            self._last_batch = None
+        if self._busy_since is not None:
+            self.stats.seconds += time.perf_counter() - self._busy_since
+            self._busy_since = None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def delete(self, point_ids: Iterable) -> None:
+        self.client.delete(collection_name=self.collection, points_selector=PointIdsList(points=list(point_ids)))
+
+    def tune_collection(self) -> None:
+        """Apply ``index_options`` to an existing collection.
+
+        Qdrant rebuilds the quantized vectors and the HNSW graph in the background;
+        searches keep working meanwhile. ``on_disk_payload`` only applies to new
+        collections.
+        """
+        opts = collection_options(**self.index_options)
+        on_disk = opts.pop("on_disk_vectors")
+        opts.pop("on_disk_payload")
+        self.client.update_collection(
             collection_name=self.collection,
-            query_vector=query_vector,
+            vectors_config={"": VectorParamsDiff(on_disk=on_disk)},
+            **opts,
+        )
+
+    def search(
+        self,
+        query_vector,
+        limit: int = 8,
+        filter_: Any | None = None,
+        *,
+        hnsw_ef: int | None = None,
+        exact: bool | None = None,
+        fields: Sequence[str] | None = None,
+    ):
+        """Nearest chunks; ``hnsw_ef`` / ``exact`` override ``search_options`` for this query.
+
+        ``fields`` limits the payload of each hit to those keys (all of them for
+        ``None``); ``retrieve`` fetches the rest for the hits that are kept.
+        """
+        res = self.client.query_points(
+            collection_name=self.collection,
+            query=query_vector,
             limit=limit,
             query_filter=filter_,
+            search_params=_search_params(self.search_options, hnsw_ef, exact),
+            with_payload=list(fields) if fields is not None else True,
+        )
+        return res.points
+
+    def retrieve(self, point_ids: Iterable, fields: Sequence[str] | None = None) -> list:
+        """Points by id in one request, with their payload (only ``fields`` if given) and no vectors."""
+        return self.client.retrieve(
+            collection_name=self.collection,
+            ids=list(point_ids),
+            with_payload=list(fields) if fields is not None else True,
+            with_vectors=False,
         )
 
-    def fetch_all_chunks(self) -> list[dict]:
-        """Fetch all points (with payload) from the collection and return a list of dicts with 'id' and 'payload'.
+    def fetch_all_chunks(
+        self, fields: Sequence[str] | None = ("text", "chunk_id"), page_size: int = 1000
+    ) -> Iterator[dict]:
+        """Stream all points of the collection as dicts with 'id' and 'payload'.
 
-        Uses the Qdrant scroll API to page through results. This is used to build an offline BM25 index.
+        Follows the scroll cursor (``next_page_offset``) one page at a time, fetching
+        only the payload ``fields`` (all of them for ``None``) and no vectors. This is
+        used to build the BM25 index without holding the collection in memory.
         """
-        points: list[dict] = []
-        offset = 0
-        limit = 1000
+        offset = None
         while True:
-            res = self.client.scroll(collection_name=self.collection, limit=limit, offset=offset, with_payload=True)
-            if not res:
-                break
-            for p in res:
-                # p might be a PointStruct-like object or a dict, handle both
-                pid = getattr(p, "id", None) or (p.get("id") if isinstance(p, dict) else None)
-                payload = getattr(p, "payload", None) or (p.get("payload") if isinstance(p, dict) else None)
-                points.append({"id": pid, "payload": payload})
-            if len(res) < limit:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=page_size,
+                offset=offset,
+                with_payload=list(fields) if fields is not None else True,
+                with_vectors=False,
+            )
+            for p in points:
+                yield {"id": p.id, "payload": p.payload}
+            if offset is None:
                 break
-            offset += len(res)
-        return points
+
+
+@dataclass
+class AsyncQdrantStore:
+    """Query-side counterpart of ``QdrantStore`` on ``AsyncQdrantClient``, used by
+    ``ChatEngine.aask``. Ingest stays on the blocking ``QdrantStore``."""
+
+    client: AsyncQdrantClient
+    collection: str
+    search_options: dict = field(default_factory=dict)
+
+    @classmethod
+    def connect(
+        cls, url: str, collection: str, *, transport: dict | None = None, search_options: dict | None = None
+    ) -> "AsyncQdrantStore":
+        return cls(
+            client=AsyncQdrantClient(url=url, **client_options(**(transport or {}))),
+            collection=collection,
+            search_options=search_options or {},
+        )
+
+    async def search(
+        self,
+        query_vector,
+        limit: int = 8,
+        filter_: Any | None = None,
+        *,
+        hnsw_ef: int | None = None,
+        exact: bool | None = None,
+        fields: Sequence[str] | None = None,
+    ):
+        res = await self.client.query_points(
+            collection_name=self.collection,
+            query=query_vector,
+            limit=limit,
+            query_filter=filter_,
+            search_params=_search_params(self.search_options, hnsw_ef, exact),
+            with_payload=list(fields) if fields is not None else True,
+        )
+        return res.points
+
+    async def retrieve(self, point_ids: Iterable, fields: Sequence[str] | None = None) -> list:
+        return await self.client.retrieve(
+            collection_name=self.collection,
+            ids=list(point_ids),
+            with_payload=list(fields) if fields is not None else True,
+            with_vectors=False,
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -35,6 +35,30 @@ def _format_passages(passages: list[dict]) -> str:
     return "\n\n---\n\n".join(lines) if lines else "_No passages._"
 
 
+def _format_meta(r: dict) -> str:
+    # metadata: rerank + claim-check
+    meta_lines = []
+    if r.get("reranked"):
+        meta_lines.append("**Re-ranked:** ✅")
+    else:
+        meta_lines.append("**Re-ranked:** ❌")
+    if r.get("cached"):
+        meta_lines.append("**Cached answer:** ✅")
+
+    cc = r.get("claim_check") or {}
+    if cc:
+        unsup = cc.get("unsupported") or []
+        meta_lines.append(f"**Claim-check:** mode={cc.get('mode')}  — unsupported sentences={len(unsup)}")
+        if unsup:
+            meta_lines.append("\n**Unsupported:**\n" + "\n".join([f"- {s}" for s in unsup]))
+
+    timings = r.get("timings") or {}
+    if timings:
+        meta_lines.append("**Timings (ms):** " + ", ".join(f"{k}={v:.0f}" for k, v in timings.items()))
+
+    return "\n\n".join(meta_lines)
+
+
 def launch_ui(engine: ChatEngine, host: str = "127.0.0.1", port: int = 7860):
     with gr.Blocks(title="ragbook_local") as demo:
         gr.Markdown("# ragbook_local — Local RAG (with citations)")
@@ -49,37 +73,36 @@ def launch_ui(engine: ChatEngine, host: str = "127.0.0.1", port: int = 7860):
         probes = gr.Markdown(label="Probing questions (if needed)")
         passages = gr.Markdown(label="Source passages (full)")
 
-        def _ask(question: str):
+        # async generator: the answer renders token by token, and concurrent questions
+        # share the event loop instead of each holding a Gradio worker thread
+        async def _ask(question: str):
             if not question or not question.strip():
-                return "", "", "", "", ""
-            r = engine.ask(question.strip())
-            probes_md = ""
-            if r.get("probing_questions"):
-                probes_md = "\n".join([f"- {x}" for x in r["probing_questions"]])
-
-            # metadata: rerank + claim-check
-            meta_lines = []
-            if r.get("reranked"):
-                meta_lines.append("**Re-ranked:** ✅")
-            else:
-                meta_lines.append("**Re-ranked:** ❌")
-
-            cc = r.get("claim_check") or {}
-            if cc:
-                unsup = cc.get("unsupported") or []
-                meta_lines.append(f"**Claim-check:** mode={cc.get('mode')}  — unsupported sentences={len(unsup)}")
-                if unsup:
-                    meta_lines.append("\n**Unsupported:**\n" + "\n".join([f"- {s}" for s in unsup]))
-
-            meta_md = "\n\n".join(meta_lines)
-
-            return (
-                r.get("answer", ""),
-                f"**Reason:** {r.get('reason','')}",
-                meta_md,
-                probes_md,
-                _format_passages(r.get("passages", [])),
-            )
+                yield "", "", "", "", ""
+                return
+            passages_md = reason_md = ""
+            answer = ""
+            async for ev in engine.aask_stream(question.strip()):
+                kind = ev["event"]
+                if kind == "retrieval":
+                    passages_md = _format_passages(ev["passages"])
+                    reason_md = f"**Reason:** {ev['reason']}"
+                    if ev["should_answer"]:
+                        yield "_…_", reason_md, "", "", passages_md
+                elif kind == "token":
+                    answer += ev["text"]
+                    yield answer, reason_md, "_Generating…_", "", passages_md
+                elif kind == "done":
+                    r = ev["result"]
+                    probes_md = ""
+                    if r.get("probing_questions"):
+                        probes_md = "\n".join([f"- {x}" for x in r["probing_questions"]])
+                    yield (
+                        r.get("answer", ""),
+                        f"**Reason:** {r.get('reason','')}",
+                        _format_meta(r),
+                        probes_md,
+                        _format_passages(r.get("passages", [])),
+                    )
 
         ask_btn.click(_ask, inputs=[q], outputs=[ans, reason, meta, probes, passages])
         clear_btn.click(lambda: ("", "", "", "", ""), outputs=[q, ans, reason, meta, probes, passages])
@@ -0,0 +1,99 @@
+import numpy as np
+
+from ragbook.answer_cache import AnswerCache, bump_ingest_stamp
+from ragbook.chat_engine import ChatEngine
+
+VALUE = {"answer": "Gears transmit torque.", "reason": "ok", "claim_check": {"mode": "refuse", "unsupported": []}, "reranked": False}
+
+
+def test_exact_and_normalised_question_hits():
+    cache = AnswerCache()
+    cache.put("How do gears work?", ["c1", "c2"], VALUE)
+    assert cache.get("  how do GEARS work ", ["c1", "c2"]) == VALUE
+    # different evidence (or order) is a different answer
+    assert cache.get("How do gears work?", ["c2", "c1"]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_near_duplicate_needs_same_evidence_and_close_embedding():
+    cache = AnswerCache(similarity=0.95)
+    cache.put("How do gears work?", ["c1"], VALUE, qvec=[1.0, 0.0])
+    assert cache.get("What do gears do?", ["c1"], qvec=[0.99, 0.05]) == VALUE
+    assert cache.near_hits == 1
+    assert cache.get("What do gears do?", ["c1"], qvec=[0.5, 0.5]) is None
+    assert cache.get("What do gears do?", ["c9"], qvec=[1.0, 0.0]) is None
+
+
+def test_ttl_lru_and_memory_budget(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("ragbook.answer_cache.time.time", lambda: now[0])
+
+    cache = AnswerCache(ttl=10, max_entries=2)
+    cache.put("q1", ["c"], VALUE)
+    cache.put("q2", ["c"], VALUE)
+    cache.get("q1", ["c"])  # q1 becomes most recent
+    cache.put("q3", ["c"], VALUE)
+    assert cache.get("q2", ["c"]) is None
+    assert cache.get("q1", ["c"]) is not None
+    now[0] += 11
+    assert cache.get("q1", ["c"]) is None
+
+    small = AnswerCache(max_bytes=1500)
+    for i in range(10):
+        small.put(f"q{i}", ["c"], VALUE, qvec=np.ones(64))
+    assert 0 < len(small) < 10
+    assert small.get("q9", ["c"]) is not None
+
+
+def test_sqlite_tier_and_ingest_invalidation(tmp_path):
+    db = tmp_path / "answers.sqlite"
+    stamp = tmp_path / "ingest.stamp"
+    bump_ingest_stamp(stamp)
+
+    AnswerCache(sqlite_path=db, stamp_path=stamp).put("How do gears work?", ["c1"], VALUE, qvec=[1.0, 0.0])
+    other = AnswerCache(sqlite_path=db, stamp_path=stamp)
+    assert other.get("How do gears work?", ["c1"]) == VALUE
+    assert other.get("What do gears do?", ["c1"], qvec=[1.0, 0.01]) == VALUE
+
+    bump_ingest_stamp(stamp)
+    assert other.get("How do gears work?", ["c1"]) is None
+    assert AnswerCache(sqlite_path=db, stamp_path=stamp).get("How do gears work?", ["c1"]) is None
+
+
+def test_engine_skips_llm_on_cache_hit():
+    class Hit:
+        def __init__(self, cid, score, text, doc):
+            self.payload = {"chunk_id": cid, "text": text, "doc_title": doc}
+            self.score = score
+
+    class Store:
+        def search(self, query_vector, limit=8, filter_=None):
+            return [Hit("c1", 0.9, "Gears transmit torque.", "a"), Hit("c2", 0.1, "Bearings.", "b")]
+
+    class Embedder:
+        def embed(self, texts):
+            return [[1.0, 0.0] for _ in texts]
+
+    class LLM:
+        calls = 0
+
+        def generate(self, prompt):
+            LLM.calls += 1
+            return "[]" if "ANSWER:" in prompt else "Gears transmit torque."
+
+    engine = ChatEngine(
+        store=Store(), embedder=Embedder(), llm=LLM(), top_k=5, min_score=0.0, max_passages=2,
+        alpha=1.0, answer_cache=AnswerCache(),
+    )
+    first = engine.ask("How do gears work?")
+    assert LLM.calls == 2 and first["cached"] is False
+
+    second = engine.ask("how do gears work")
+    assert LLM.calls == 2
+    assert second["cached"] is True
+    assert second["answer"] == first["answer"]
+    assert second["passages"] == first["passages"]
+
+    events = list(engine.ask_stream("How do gears work?"))
+    assert [e["event"] for e in events] == ["retrieval", "token", "claim_check", "done"]
+    assert LLM.calls == 2
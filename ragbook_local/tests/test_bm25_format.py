@@ -0,0 +1,60 @@
+import pickle
+
+import pytest
+
+from ragbook.bm25_format import is_bm25_file
+from ragbook.inverted_index import StringTable
+from ragbook.retrieval import BM25Index
+
+
+def test_save_load_roundtrip_is_memory_mapped(tmp_path):
+    docs = ["Das Auto fährt sehr schnell.", "Dieses Dokument handelt von Elektrik.", "Autos und Motoren"]
+    ids = ["d1", "d2", "d3"]
+    idx = BM25Index(docs=docs, ids=ids, language="de")
+    out = tmp_path / "bm25.idx"
+    idx.save(out)
+
+    assert is_bm25_file(out)
+    loaded = BM25Index.load(out)
+
+    assert isinstance(loaded.ids, StringTable)
+    assert list(loaded.ids) == ids
+    assert list(loaded.docs) == docs
+    assert loaded.language == "de"
+    for q in ("Autos fahren schnell", "Elektrik", "nichts"):
+        assert loaded.search(q, top_k=3) == idx.search(q, top_k=3)
+
+
+def test_empty_index_roundtrip(tmp_path):
+    out = tmp_path / "bm25.idx"
+    BM25Index(docs=[], ids=[]).save(out)
+    loaded = BM25Index.load(out)
+    assert len(loaded.ids) == 0
+    assert loaded.search("anything") == []
+
+
+def test_legacy_pickle_still_loads(tmp_path):
+    out = tmp_path / "bm25.pkl"
+    with out.open("wb") as fh:
+        pickle.dump({"docs": ["hello world"], "ids": ["c1"], "language": "en"}, fh)
+
+    loaded = BM25Index.load(out)
+    assert loaded.search("hello", top_k=1)[0].chunk_id == "c1"
+
+
+def test_unsupported_version_is_rejected(tmp_path):
+    out = tmp_path / "bm25.idx"
+    BM25Index(docs=["a b"], ids=["c1"]).save(out)
+    raw = bytearray(out.read_bytes())
+    raw[8] = 99  # version field follows the 8-byte magic
+    out.write_bytes(bytes(raw))
+
+    with pytest.raises(ValueError, match="version"):
+        BM25Index.load(out)
+
+
+def test_sorted_string_table_lookup():
+    table = StringTable.from_strings(sorted(["zeta", "alpha", "über", "mitte"]), is_sorted=True)
+    assert table.get("über") == 3
+    assert table.get("alpha") == 0
+    assert table.get("missing") is None
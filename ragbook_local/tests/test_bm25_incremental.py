@@ -0,0 +1,122 @@
+import random
+
+import numpy as np
+import pytest
+
+from ragbook import indexer
+from ragbook.bm25_format import delta_path
+from ragbook.ingest.pdf_text import PageText
+from ragbook.retrieval import BM25Index
+
+
+def _assert_same_results(idx, ref, queries, k=10):
+    for q in queries:
+        got = idx.search(q, top_k=k)
+        want = ref.search(q, top_k=k)
+        assert [r.chunk_id for r in got] == [r.chunk_id for r in want], q
+        assert [r.text for r in got] == [r.text for r in want], q
+        assert [r.score for r in got] == pytest.approx([r.score for r in want]), q
+
+
+def _random_corpus(rng, n, prefix):
+    words = [f"w{i}" for i in range(30)]
+    return {f"{prefix}{i}": " ".join(rng.choice(words) for _ in range(rng.randint(1, 20))) for i in range(n)}
+
+
+def test_add_and_remove_match_full_rebuild():
+    rng = random.Random(1)
+    live = _random_corpus(rng, 60, "base")
+    idx = BM25Index(docs=list(live.values()), ids=list(live.keys()))
+
+    added = _random_corpus(rng, 15, "new")
+    replaced = {cid: "w1 w2 w3 replaced text" for cid in list(live)[:5]}
+    idx.add(list(added) + list(replaced), list(added.values()) + list(replaced.values()))
+    removed = list(live)[10:15] + ["new3", "does-not-exist"]
+    idx.remove(removed)
+
+    # a replaced chunk becomes a new row after the existing ones
+    for cid in replaced:
+        live.pop(cid)
+    live.update(added)
+    live.update(replaced)
+    for cid in removed:
+        live.pop(cid, None)
+    ref = BM25Index(docs=list(live.values()), ids=list(live.keys()))
+
+    queries = ["w1", "w2 w3", "replaced", "w5 w5 w7", "unknown"]
+    _assert_same_results(idx, ref, queries)
+    assert idx.text_of("base0") == "w1 w2 w3 replaced text"
+    assert idx.row_of("base10") is None
+
+    idx.compact()
+    _assert_same_results(idx, ref, queries)
+    assert list(idx.ids) == list(live.keys())
+
+
+def test_changes_are_logged_replayed_and_compacted(tmp_path):
+    path = tmp_path / "bm25.idx"
+    BM25Index(docs=["apple banana", "banana orange"], ids=["c1", "c2"]).save(path)
+
+    idx = BM25Index.open(path)
+    idx.add(["c3", "c1"], ["apple grape", "cherry"])
+    assert delta_path(path).exists()
+
+    reloaded = BM25Index.load(path)
+    ref = BM25Index(docs=["banana orange", "apple grape", "cherry"], ids=["c2", "c3", "c1"])
+    assert reloaded.text_of("c1") == "cherry"
+    assert [r.chunk_id for r in reloaded.search("apple", top_k=1)] == ["c3"]
+
+    idx.compact()
+    assert not delta_path(path).exists()
+    compacted = BM25Index.load(path)
+    assert list(compacted.ids) == ["c2", "c3", "c1"]
+    _assert_same_results(compacted, ref, ["apple", "cherry", "banana"])
+
+
+def test_index_pdfs_updates_persisted_bm25(tmp_path, monkeypatch):
+    class FakeStore:
+        def __init__(self):
+            self.points = []
+
+        def ensure_collection(self, vector_size):
+            pass
+
+        def flush(self, barrier=True):
+            pass
+
+        def upsert(self, points, wait=True):
+            self.points.extend(points)
+
+        def fetch_all_chunks(self):
+            return []
+
+    class FakeEmbedder:
+        dimension = 2
+
+        def embed(self, texts, cache=True, batch_size=None):
+            return np.zeros((len(list(texts)), 2), dtype=np.float32)
+
+    pages = {
+        "a.pdf": [PageText(page=1, text="Gear ratios and torque.")],
+        "b.pdf": [PageText(page=1, text="Bearing lubrication basics.")],
+        "c.pdf": [PageText(page=1, text="Shaft design under torsion.")],
+    }
+    monkeypatch.setattr(indexer, "extract_pages_text", lambda p: pages[p.name])
+    monkeypatch.setattr(BM25Index, "compact_min_rows", 1)
+    monkeypatch.setattr(BM25Index, "compact_ratio", 0.0)
+
+    bm25_path = tmp_path / "bm25.idx"
+    res = indexer.index_pdfs(
+        [tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"],
+        store=FakeStore(),
+        embedder=FakeEmbedder(),
+        max_chars=2500,
+        overlap_chars=0,
+        ocr_out_dir=None,
+        bm25_path=bm25_path,
+    )
+    assert res.chunks_indexed == 3
+
+    idx = BM25Index.load(bm25_path)
+    assert idx.search("lubrication", top_k=1)[0].text == "Bearing lubrication basics."
+    assert len(idx.ids) == 3
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.llm import LLM
+from ragbook.retrieval import BM25Index
+
+
+class Hit:
+    def __init__(self, cid, score, text, doc):
+        self.payload = {"chunk_id": cid, "text": text, "doc_title": doc}
+        self.score = score
+
+
+class FakeEmbedder:
+    def embed(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class SyncStore:
+    def search(self, query_vector, limit=8, filter_=None):
+        return [Hit("c1", 0.9, "Gears transmit torque between shafts.", "a"), Hit("c2", 0.2, "Bearings.", "b")]
+
+
+class AsyncStore:
+    def __init__(self):
+        self.calls = 0
+
+    async def search(self, query_vector, limit=8, filter_=None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return SyncStore().search(query_vector, limit)
+
+
+class SlowAsyncLLM:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def generate(self, prompt):
+        raise AssertionError("aask must not block on generate")
+
+    async def agenerate(self, prompt):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.2)
+        self.in_flight -= 1
+        return "Gears transmit torque between shafts."
+
+
+def _engine(**kw):
+    return ChatEngine(
+        embedder=FakeEmbedder(),
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        bm25_index=BM25Index(docs=["Gears transmit torque between shafts.", "Bearings."], ids=["c1", "c2"]),
+        **kw,
+    )
+
+
+def test_aask_matches_ask():
+    class SyncLLM:
+        def generate(self, prompt):
+            return "Gears transmit torque between shafts."
+
+    engine = _engine(store=SyncStore(), llm=SyncLLM())
+    sync = engine.ask("How is torque transmitted?")
+    # without astore / agenerate the async path falls back to worker threads
+    res = asyncio.run(engine.aask("How is torque transmitted?"))
+    engine.close()
+
+    for key in ("answer", "reason", "passages", "probing_questions", "claim_check", "reranked"):
+        assert res[key] == sync[key], key
+    assert set(res["timings"]) == set(sync["timings"])
+
+
+def test_concurrent_aask_share_one_event_loop():
+    astore = AsyncStore()
+    llm = SlowAsyncLLM()
+    engine = _engine(store=SyncStore(), llm=llm, astore=astore)
+
+    async def main():
+        return await asyncio.gather(*(engine.aask("How is torque transmitted?") for _ in range(20)))
+
+    t = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - t
+    engine.close()
+
+    assert astore.calls == 20
+    assert all(r["answer"] == "Gears transmit torque between shafts." for r in results)
+    # 20 questions x 2 LLM calls x 0.2 s run overlapped, not one after another
+    assert llm.peak > 1
+    assert elapsed < 2.0
+
+
+def test_llm_agenerate_ollama():
+    def handler(request):
+        assert request.url.path == "/api/generate"
+        return httpx.Response(200, json={"response": " hi "})
+
+    llm = LLM(backend="ollama", ollama_url="http://ollama")
+    llm._max_tokens, llm._temperature = 16, 0.0
+    llm._aclient = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def main():
+        try:
+            return await llm.agenerate("hello")
+        finally:
+            await llm.aclose()
+
+    assert asyncio.run(main()) == "hi"
+    assert llm._aclient is None
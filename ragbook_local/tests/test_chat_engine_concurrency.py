@@ -0,0 +1,85 @@
+import threading
+import time
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.retrieval import BM25Result
+
+
+class Hit:
+    def __init__(self, cid, score, text):
+        self.payload = {"chunk_id": cid, "text": text, "source_file": "book.pdf", "page_start": 1, "page_end": 1}
+        self.score = score
+
+
+class SlowEmbedder:
+    def embed(self, texts):
+        time.sleep(0.15)
+        return [[0.0] for _ in texts]
+
+
+class SlowStore:
+    def search(self, query_vector, limit=8, filter_=None):
+        time.sleep(0.15)
+        return [Hit("c1", 0.9, "Gears transmit torque.")]
+
+
+class SlowBM25:
+    def __init__(self):
+        self.thread = None
+
+    def search(self, query, top_k=8):
+        self.thread = threading.current_thread()
+        time.sleep(0.3)
+        return [BM25Result(chunk_id="c2", score=2.0, text="Torque on shafts.")]
+
+
+class FakeLLM:
+    def generate(self, prompt):
+        return "Gears transmit torque."
+
+
+def test_bm25_runs_concurrently_with_vector_retrieval():
+    bm25 = SlowBM25()
+    engine = ChatEngine(
+        store=SlowStore(),
+        embedder=SlowEmbedder(),
+        llm=FakeLLM(),
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        alpha=0.7,
+        bm25_index=bm25,
+    )
+
+    r = engine.ask("torque")
+    engine.close()
+
+    assert bm25.thread is not threading.current_thread()
+    assert {p["payload"]["chunk_id"] for p in r["passages"]} == {"c1", "c2"}
+    t = r["timings"]
+    for stage in ("embed", "vector_search", "bm25", "retrieval", "fusion", "generate", "claim_check", "total"):
+        assert stage in t
+    # the critical path is max(embed + vector search, bm25), not their sum
+    assert t["retrieval"] < t["embed"] + t["vector_search"] + t["bm25"] - 100
+
+
+def test_bm25_errors_propagate():
+    class BrokenBM25:
+        def search(self, query, top_k=8):
+            raise RuntimeError("index corrupted")
+
+    engine = ChatEngine(
+        store=SlowStore(),
+        embedder=SlowEmbedder(),
+        llm=FakeLLM(),
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        bm25_index=BrokenBM25(),
+    )
+    try:
+        engine.ask("torque")
+    except RuntimeError as e:
+        assert "corrupted" in str(e)
+    else:
+        raise AssertionError("expected the BM25 error to propagate")
@@ -0,0 +1,93 @@
+import asyncio
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.retrieval import BM25Index
+
+
+class Hit:
+    def __init__(self, cid, score, text, doc):
+        self.payload = {"chunk_id": cid, "text": text, "doc_title": doc}
+        self.score = score
+
+
+class FakeEmbedder:
+    def embed(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class FakeStore:
+    def search(self, query_vector, limit=8, filter_=None):
+        return [Hit("c1", 0.9, "Gears transmit torque between shafts.", "a"), Hit("c2", 0.2, "Bearings.", "b")]
+
+
+class StreamingLLM:
+    tokens = ["Gears ", "transmit ", "torque ", "between shafts."]
+
+    def generate(self, prompt):
+        if "unsupported" in prompt.lower() or "json" in prompt.lower():
+            return "[]"
+        return "".join(self.tokens)
+
+    def stream(self, prompt):
+        yield from self.tokens
+
+    async def agenerate(self, prompt):
+        return self.generate(prompt)
+
+    async def astream(self, prompt):
+        for t in self.tokens:
+            await asyncio.sleep(0)
+            yield t
+
+
+def _engine(llm):
+    return ChatEngine(
+        store=FakeStore(),
+        embedder=FakeEmbedder(),
+        llm=llm,
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        bm25_index=BM25Index(docs=["Gears transmit torque between shafts.", "Bearings."], ids=["c1", "c2"]),
+    )
+
+
+def test_ask_stream_event_order_and_result():
+    engine = _engine(StreamingLLM())
+    events = list(engine.ask_stream("How is torque transmitted?"))
+
+    kinds = [e["event"] for e in events]
+    assert kinds == ["retrieval", "token", "token", "token", "token", "claim_check", "done"]
+    assert events[0]["passages"][0]["payload"]["chunk_id"] == "c1"
+    result = events[-1]["result"]
+    assert result["answer"] == "Gears transmit torque between shafts."
+    assert "first_token" in result["timings"]
+
+    sync = engine.ask("How is torque transmitted?")
+    for key in ("answer", "reason", "passages", "claim_check", "reranked"):
+        assert result[key] == sync[key], key
+
+
+def test_aask_stream_matches_and_refusal_skips_tokens():
+    engine = _engine(StreamingLLM())
+
+    async def collect(q):
+        return [e async for e in engine.aask_stream(q)]
+
+    events = asyncio.run(collect("How is torque transmitted?"))
+    assert "".join(e["text"] for e in events if e["event"] == "token") == "Gears transmit torque between shafts."
+    assert events[-1]["result"]["answer"] == "Gears transmit torque between shafts."
+
+    engine.min_score = 2.0
+    events = asyncio.run(collect("How is torque transmitted?"))
+    assert [e["event"] for e in events] == ["retrieval", "done"]
+    assert events[0]["should_answer"] is False
+
+
+def test_llm_without_stream_falls_back_to_generate():
+    class PlainLLM:
+        def generate(self, prompt):
+            return "[]" if "JSON" in prompt else "Gears transmit torque between shafts."
+
+    events = list(_engine(PlainLLM()).ask_stream("How is torque transmitted?"))
+    assert [e["text"] for e in events if e["event"] == "token"] == ["Gears transmit torque between shafts."]
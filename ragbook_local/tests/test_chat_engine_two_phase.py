@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from ragbook.chat_engine import RANKING_FIELDS, ChatEngine
+from ragbook.retrieval import BM25Index
+
+CHUNKS = {
+    f"c{i}": {
+        "chunk_id": f"c{i}",
+        "doc_id": f"d{i % 3}",
+        "doc_title": f"Book {i % 3}",
+        "text": f"torque settings for bolt size M{i}",
+        "pre_context": "before " * 50,
+        "post_context": "after " * 50,
+        "source_path": f"/books/b{i % 3}.pdf",
+        "page_start": i,
+        "page_end": i,
+    }
+    for i in range(10)
+}
+
+
+class Store:
+    def __init__(self):
+        self.searches = []
+        self.retrieved = []
+
+    def _hits(self, limit, fields):
+        self.searches.append(fields)
+        hits = []
+        for i, (cid, payload) in enumerate(list(CHUNKS.items())[:limit]):
+            shown = {k: v for k, v in payload.items() if fields is None or k in fields}
+            hits.append(SimpleNamespace(id=cid, score=1.0 if i == 0 else 0.5 - i * 0.01, payload=shown))
+        return hits
+
+    def search(self, query_vector, limit=8, filter_=None, fields=None):
+        return self._hits(limit, fields)
+
+    def retrieve(self, point_ids, fields=None):
+        self.retrieved.append(list(point_ids))
+        return [SimpleNamespace(id=i, payload=dict(CHUNKS[i])) for i in point_ids]
+
+    def fetch_all_chunks(self):
+        return iter(())
+
+
+class AsyncStore(Store):
+    async def search(self, query_vector, limit=8, filter_=None, fields=None):
+        return self._hits(limit, fields)
+
+
+class Embedder:
+    def embed(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class LLM:
+    def generate(self, prompt):
+        return "Use 25 Nm."
+
+
+def engine(store, two_phase, **kw):
+    return ChatEngine(store=store, embedder=Embedder(), llm=LLM(), top_k=8, min_score=0.0, max_passages=3,
+                      claim_check_mode="off", two_phase=two_phase, **kw)
+
+
+def test_two_phase_fetches_full_payloads_for_final_passages_only():
+    store = Store()
+    res = engine(store, True).ask("torque settings for bolt M0")
+    assert store.searches == [RANKING_FIELDS]
+    # the final passages (including the top text the guardrails read) come in one call
+    assert store.retrieved == [["c0", "c1", "c2"]]
+    assert [p["payload"] for p in res["passages"]] == [CHUNKS["c0"], CHUNKS["c1"], CHUNKS["c2"]]
+
+    full = Store()
+    ref = engine(full, False).ask("torque settings for bolt M0")
+    assert full.searches == [None] and full.retrieved == []
+    assert [p["payload"] for p in ref["passages"]] == [p["payload"] for p in res["passages"]]
+    assert res["answer"] == ref["answer"] == "Use 25 Nm."
+
+
+def test_rerank_texts_come_from_the_bm25_index():
+    class Reranker:
+        def load(self):
+            return self
+
+        def score(self, question, passages):
+            self.texts = [t for _, t in passages]
+            # reverse the order
+            return [float(i) for i in range(len(passages))]
+
+    store = Store()
+    bm25 = BM25Index([p["text"] for p in CHUNKS.values()], list(CHUNKS))
+    rr = Reranker()
+    res = engine(store, True, bm25_index=bm25, rerank_enabled=True, reranker=rr, rerank_candidates=6).ask(
+        "torque settings for bolt M0"
+    )
+    assert rr.texts == [CHUNKS[f"c{i}"]["text"] for i in range(6)]
+    # BM25 supplied the texts; only the final passages were retrieved
+    assert store.retrieved == [["c5", "c4", "c3"]]
+    assert [p["payload"] for p in res["passages"]] == [CHUNKS["c5"], CHUNKS["c4"], CHUNKS["c3"]]
+
+
+def test_async_two_phase():
+    store = AsyncStore()
+    eng = engine(store, True, astore=store)
+    res = asyncio.run(eng.aask("torque settings for bolt M0"))
+    assert store.searches == [RANKING_FIELDS]
+    assert res["passages"][0]["payload"] == CHUNKS["c0"]
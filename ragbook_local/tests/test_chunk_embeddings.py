@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from ragbook import indexer
+from ragbook.chunk_embeddings import ChunkEmbeddingCache
+from ragbook.ingest.pdf_text import PageText
+
+
+class CountingEncoder:
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            out[i] = [len(t), t.count("a"), t.count("e"), 1.0]
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def test_only_new_text_is_encoded(tmp_path):
+    enc = CountingEncoder()
+    cache = ChunkEmbeddingCache(tmp_path, "model-a", dim=4)
+    first = cache.embed(["gear ratios", "bearing", "gear ratios"], enc)
+    assert enc.calls == [["gear ratios", "bearing"]]
+    np.testing.assert_array_equal(first[0], first[2])
+
+    second = cache.embed(["bearing", "shaft", "gear ratios"], enc)
+    assert enc.calls[-1] == ["shaft"]
+    np.testing.assert_array_equal(second[0], first[1])
+    np.testing.assert_array_equal(second[2], first[0])
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert len(cache) == 3
+
+
+def test_persists_across_opens_per_model_and_dtype(tmp_path):
+    enc = CountingEncoder()
+    ref = ChunkEmbeddingCache(tmp_path, "model-a", dim=4).embed(["gear ratios", "bearing"], enc)
+
+    again = CountingEncoder()
+    reopened = ChunkEmbeddingCache(tmp_path, "model-a", dim=4)
+    np.testing.assert_array_equal(reopened.embed(["bearing", "gear ratios"], again), ref[::-1])
+    assert again.calls == []
+
+    # another model or dtype has its own store
+    other = CountingEncoder()
+    ChunkEmbeddingCache(tmp_path, "model-b", dim=4).embed(["bearing"], other)
+    assert other.calls == [["bearing"]]
+
+    half = ChunkEmbeddingCache(tmp_path, "model-a", dim=4, dtype="float16")
+    half.embed(["bearing"], CountingEncoder())
+    np.testing.assert_allclose(half.embed(["bearing"], CountingEncoder()), ref[1:], atol=1e-3)
+    assert (half.path / "vectors.bin").stat().st_size == 4 * 2
+
+
+def test_torn_append_is_dropped_on_open(tmp_path):
+    cache = ChunkEmbeddingCache(tmp_path, "model-a", dim=4)
+    cache.embed(["gear ratios", "bearing"], CountingEncoder())
+    # simulate a crash after the vector was written but before its key
+    with (cache.path / "vectors.bin").open("ab") as fh:
+        fh.write(np.ones(4, dtype=np.float32).tobytes())
+
+    reopened = ChunkEmbeddingCache(tmp_path, "model-a", dim=4)
+    assert len(reopened) == 2
+    enc = CountingEncoder()
+    reopened.embed(["shaft", "bearing"], enc)
+    assert enc.calls == [["shaft"]]
+    assert len(ChunkEmbeddingCache(tmp_path, "model-a", dim=4)) == 3
+
+
+def test_mismatched_meta_raises(tmp_path):
+    ChunkEmbeddingCache(tmp_path, "model-a", dim=4)
+    with pytest.raises(ValueError):
+        ChunkEmbeddingCache(tmp_path, "model-a", dim=8)
+
+
+def test_reingest_reuses_vectors(tmp_path, monkeypatch):
+    class FakeStore:
+        def ensure_collection(self, vector_size):
+            pass
+
+        def flush(self, barrier=True):
+            pass
+
+        def upsert(self, points, wait=True):
+            pass
+
+    class FakeEmbedder:
+        dimension = 4
+
+        def __init__(self):
+            self.encode = CountingEncoder()
+
+        def embed(self, texts, cache=True, batch_size=None):
+            return self.encode(list(texts))
+
+    pages = {
+        "a.pdf": [PageText(page=1, text="Gear ratios and torque.")],
+        "b.pdf": [PageText(page=1, text="Bearing lubrication basics.")],
+    }
+    monkeypatch.setattr(indexer, "extract_pages_text", lambda p: pages[p.name])
+    pdfs = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    emb = FakeEmbedder()
+
+    def run():
+        cache = ChunkEmbeddingCache(tmp_path / "emb", "fake", dim=4)
+        return indexer.index_pdfs(
+            pdfs, store=FakeStore(), embedder=emb, max_chars=2500, overlap_chars=0,
+            ocr_out_dir=None, embedding_cache=cache,
+        )
+
+    res = run()
+    assert (res.embeddings_reused, res.embeddings_computed) == (0, 2)
+
+    pages["b.pdf"] = [PageText(page=1, text="Bearing lubrication, revised.")]
+    res = run()
+    assert (res.embeddings_reused, res.embeddings_computed) == (1, 1)
+    assert res.embedding_hit_rate == 0.5
+    assert emb.encode.calls[-1] == ["Bearing lubrication, revised."]
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.claim_check import IncrementalClaimCheck, SentenceBuffer
+from ragbook.retrieval import BM25Index
+
+
+def test_sentence_buffer_emits_complete_sentences():
+    buf = SentenceBuffer()
+    assert buf.feed("Gears trans") == []
+    assert buf.feed("mit torque. Bear") == ["Gears transmit torque."]
+    assert buf.feed("ings carry loads! ") == ["Bearings carry loads!"]
+    assert buf.flush() == []
+    buf.feed("Tail without stop")
+    assert buf.flush() == ["Tail without stop"]
+
+
+def test_batches_while_a_check_is_in_flight():
+    from concurrent.futures import ThreadPoolExecutor
+
+    gate = threading.Event()
+    batches = []
+
+    def verify(batch):
+        batches.append(batch)
+        gate.wait(5)
+        return [s for s in batch if "moon" in s]
+
+    with ThreadPoolExecutor(2) as pool:
+        check = IncrementalClaimCheck(lambda b: pool.submit(verify, b))
+        check.feed("First claim. ")
+        check.feed("Gears are made of moon rock. ")
+        check.feed("Third claim. Last")
+        gate.set()
+        unsupported = check.finish()
+
+    # sentences completed while the first check ran were batched together
+    assert batches[0] == ["First claim."]
+    assert batches[1][:2] == ["Gears are made of moon rock.", "Third claim."]
+    assert sum(batches, []) == ["First claim.", "Gears are made of moon rock.", "Third claim.", "Last"]
+    assert unsupported == ["Gears are made of moon rock."]
+
+
+class Hit:
+    def __init__(self, cid, score, text, doc):
+        self.payload = {"chunk_id": cid, "text": text, "doc_title": doc}
+        self.score = score
+
+
+class FakeEmbedder:
+    def embed(self, texts):
+        return [[0.0] for _ in texts]
+
+
+class FakeStore:
+    def search(self, query_vector, limit=8, filter_=None):
+        return [Hit("c1", 0.9, "Gears transmit torque between shafts.", "a"), Hit("c2", 0.2, "Bearings.", "b")]
+
+
+class SlowLLM:
+    """Streams one sentence per 0.1 s; a claim-check takes 0.1 s per sentence checked."""
+
+    sentences = ["Gears transmit torque. ", "They are made of moon rock. ", "Shafts carry them."]
+
+    def __init__(self):
+        self.checked = []
+
+    def stream(self, prompt):
+        for s in self.sentences:
+            time.sleep(0.1)
+            yield s
+
+    def generate(self, prompt):
+        if "ANSWER:" in prompt:
+            answer = prompt.split("ANSWER:\n", 1)[1].split("\n\nPASSAGES:", 1)[0]
+            time.sleep(0.1 * answer.count("."))
+            self.checked.append(answer)
+            return '["They are made of moon rock."]' if "moon" in answer else "[]"
+        time.sleep(0.3)
+        return "".join(self.sentences).strip()
+
+
+def _engine(**kw):
+    return ChatEngine(
+        store=FakeStore(),
+        embedder=FakeEmbedder(),
+        llm=SlowLLM(),
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        claim_check_mode="strip",
+        bm25_index=BM25Index(docs=["Gears transmit torque between shafts.", "Bearings."], ids=["c1", "c2"]),
+        **kw,
+    )
+
+
+def test_incremental_matches_one_shot_verdict():
+    one_shot = _engine().ask("How is torque transmitted?")
+    engine = _engine(claim_check_incremental=True)
+    res = engine.ask("How is torque transmitted?")
+    engine.close()
+
+    assert res["claim_check"]["unsupported"] == one_shot["claim_check"]["unsupported"]
+    assert res["answer"] == one_shot["answer"] == "Gears transmit torque. Shafts carry them."
+    # sentences were checked in several smaller requests
+    assert len(engine.llm.checked) > 1
+    # only the tail check remains after the last token
+    assert res["timings"]["claim_check"] < one_shot["timings"]["claim_check"] - 100
+
+
+def test_incremental_async():
+    engine = _engine(claim_check_incremental=True)
+    res = asyncio.run(engine.aask("How is torque transmitted?"))
+    engine.close()
+    assert res["claim_check"]["unsupported"] == ["They are made of moon rock."]
+    assert res["answer"] == "Gears transmit torque. Shafts carry them."
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.claim_check import NLIClaimVerifier
+from ragbook.prompting import strip_unsubstantiated
+
+PASSAGES = [
+    {"payload": {"chunk_id": "c1", "text": "Gears transmit torque between parallel shafts."}},
+    {"payload": {"chunk_id": "c2", "text": "Rolling bearings support radial loads."}},
+]
+
+
+class FakeNLI:
+    """Labels (contradiction, entailment, neutral); entails when the hypothesis mentions 'load'."""
+
+    config = type("Cfg", (), {"id2label": {0: "contradiction", 1: "entailment", 2: "neutral"}})()
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(list(pairs))
+        return np.array([[0.0, 4.0, 0.0] if "load" in h else [0.0, -4.0, 2.0] for _, h in pairs])
+
+
+def _verifier():
+    v = NLIClaimVerifier()
+    v._model = FakeNLI()
+    return v
+
+
+def test_overlap_fast_path_skips_the_model():
+    v = _verifier()
+    assert v.verify(["Gears transmit torque between parallel shafts."], PASSAGES) == []
+    assert v._model.calls == []
+
+
+def test_model_scores_remaining_sentences_in_one_batch():
+    v = _verifier()
+    answer = "Gears transmit torque between shafts. Bearings carry the radial load well. Gears are forged from titanium."
+    unsupported = v.verify([answer], PASSAGES)
+
+    assert unsupported == ["Gears are forged from titanium."]
+    # one batched call over (passage, sentence) pairs for the two non-verbatim sentences
+    assert len(v._model.calls) == 1
+    assert len(v._model.calls[0]) == 2 * len(PASSAGES)
+    assert strip_unsubstantiated(answer, unsupported) == "Gears transmit torque between shafts. Bearings carry the radial load well."
+
+
+def test_missing_model_fails_open(monkeypatch):
+    import sentence_transformers
+
+    def broken(*a, **kw):
+        raise OSError("no model")
+
+    monkeypatch.setattr(sentence_transformers, "CrossEncoder", broken)
+    with pytest.warns(UserWarning, match="NLI"):
+        assert NLIClaimVerifier().verify(["Gears are forged from titanium."], PASSAGES) == []
+
+
+def test_engine_uses_nli_without_second_llm_call():
+    class Hit:
+        def __init__(self, p, score):
+            self.payload = dict(p["payload"], doc_title=p["payload"]["chunk_id"])
+            self.score = score
+
+    class Store:
+        def search(self, query_vector, limit=8, filter_=None):
+            return [Hit(PASSAGES[0], 0.9), Hit(PASSAGES[1], 0.3)]
+
+    class Embedder:
+        def embed(self, texts):
+            return [[0.0] for _ in texts]
+
+    class LLM:
+        calls = 0
+
+        def generate(self, prompt):
+            LLM.calls += 1
+            return "Gears transmit torque between parallel shafts. Gears are forged from titanium."
+
+    engine = ChatEngine(
+        store=Store(),
+        embedder=Embedder(),
+        llm=LLM(),
+        top_k=5,
+        min_score=0.0,
+        max_passages=2,
+        alpha=1.0,
+        claim_check_mode="strip",
+        claim_check_verifier="nli",
+    )
+    engine._verifier()._model = FakeNLI()
+    res = engine.ask("How do gears work?")
+
+    assert LLM.calls == 1
+    assert res["claim_check"]["unsupported"] == ["Gears are forged from titanium."]
+    assert res["answer"] == "Gears transmit torque between parallel shafts."
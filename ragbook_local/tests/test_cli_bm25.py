@@ -28,7 +28,7 @@ def test_bm25_rebuild_creates_file(tmp_path, monkeypatch):
                 {"id": 2, "payload": {"chunk_id": "doc::p1::c2", "text": "another text"}},
             ]
 
-    monkeypatch.setattr(QdrantStore, "connect", lambda url, collection: FakeStore())
+    monkeypatch.setattr(QdrantStore, "connect", lambda url, collection, **kw: FakeStore())
 
     runner = CliRunner()
     out_path = data_dir / "bm25_test.pkl"
@@ -27,7 +27,7 @@ def test_bm25_rebuild_force_overwrites(tmp_path, monkeypatch):
     cfg_file = tmp_path / "config.yaml"
     cfg_file.write_text(yaml.safe_dump(config))
 
-    monkeypatch.setattr(QdrantStore, "connect", lambda url, collection: FakeStore())
+    monkeypatch.setattr(QdrantStore, "connect", lambda url, collection, **kw: FakeStore())
 
     runner = CliRunner()
     out_path = data_dir / "bm25_test.pkl"
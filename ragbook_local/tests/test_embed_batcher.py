@@ -0,0 +1,38 @@
+import numpy as np
+
+from ragbook.embed_batcher import EmbeddingBatcher
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        self.calls.append((list(texts), batch_size))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_batches_are_length_sorted_and_bounded():
+    rec = Recorder()
+    b = EmbeddingBatcher(rec, max_batch_size=3, max_batch_tokens=400, max_seq_length=128, chars_per_token=1.0)
+    texts = ["x" * n for n in [5, 300, 20, 120, 7, 90, 60, 10]]
+    vecs = b.embed(texts)
+
+    # vectors come back in input order
+    np.testing.assert_array_equal(vecs[:, 0], [len(t) for t in texts])
+    for batch, batch_size in rec.calls:
+        lengths = [b.token_estimate(t) for t in batch]
+        assert lengths == sorted(lengths, reverse=True)
+        assert len(batch) <= 3 and batch_size == len(batch)
+        assert len(batch) * lengths[0] <= 400 or len(batch) == 1
+    # long texts are capped at the model's sequence length, so 300 and 120 chars pack together
+    assert [len(t) for t in rec.calls[0][0]] == [300, 120, 90]
+    assert (b.texts, b.batches) == (8, len(rec.calls))
+    assert b.chunks_per_second > 0
+
+
+def test_empty_and_single_oversized_text():
+    rec = Recorder()
+    b = EmbeddingBatcher(rec, max_batch_size=8, max_batch_tokens=10, chars_per_token=1.0)
+    assert b.embed([]).shape[0] == 0
+    assert b.plan(["x" * 100, "y" * 100]) == [[0], [1]]
@@ -0,0 +1,105 @@
+import numpy as np
+
+from ragbook import indexer
+from ragbook.embeddings import Embedder
+from ragbook.ingest.pdf_text import PageText
+
+
+class FakeModel:
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, normalize_embeddings=True, show_progress_bar=False, batch_size=32):
+        self.encoded.append(list(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            out[i, len(t) % self.dim] = 1.0
+            out[i, 0] += len(t)
+        return out
+
+
+def test_repeated_queries_skip_the_model():
+    model = FakeModel()
+    emb = Embedder(model=model, model_name="fake")
+
+    first = emb.embed(["what is torque?"])
+    again = emb.embed(["what is torque?"])
+    np.testing.assert_array_equal(first, again)
+    assert model.encoded == [["what is torque?"]]
+    assert (emb.hits, emb.misses) == (1, 1)
+
+    # only the unseen text is encoded, results keep the input order
+    mixed = emb.embed(["gears", "what is torque?", "gears"])
+    assert model.encoded[-1] == ["gears"]
+    np.testing.assert_array_equal(mixed[1], first[0])
+    np.testing.assert_array_equal(mixed[0], mixed[2])
+
+    # returned arrays are copies; mutating them doesn't corrupt the cache
+    again[0, :] = 0
+    np.testing.assert_array_equal(emb.embed(["what is torque?"]), first)
+
+
+def test_lru_eviction_and_cache_off():
+    model = FakeModel()
+    emb = Embedder(model=model, model_name="fake", cache_size=2)
+    for q in ["a", "bb", "ccc"]:
+        emb.embed([q])
+    emb.embed(["ccc"])
+    assert len(model.encoded) == 3
+    emb.embed(["a"])  # evicted
+    assert len(model.encoded) == 4
+
+    emb.embed(["bulk chunk"], cache=False)
+    emb.embed(["bulk chunk"], cache=False)
+    assert model.encoded[-2:] == [["bulk chunk"], ["bulk chunk"]]
+
+
+def test_sqlite_tier_is_shared_and_keyed_by_model(tmp_path):
+    path = tmp_path / "emb.sqlite"
+    a = Embedder(model=FakeModel(), model_name="fake", cache_path=path)
+    vec = a.embed(["shaft design"])
+    a.close()
+
+    model = FakeModel()
+    b = Embedder(model=model, model_name="fake", cache_path=path)
+    np.testing.assert_array_equal(b.embed(["shaft design"]), vec)
+    assert model.encoded == [] and b.hits == 1
+    b.close()
+
+    other = FakeModel()
+    c = Embedder(model=other, model_name="other-model", cache_path=path)
+    c.embed(["shaft design"])
+    assert other.encoded == [["shaft design"]]
+    c.close()
+
+
+def test_dimension_comes_from_metadata_and_index_pdfs_skips_the_probe(tmp_path, monkeypatch):
+    model = FakeModel(dim=3)
+    emb = Embedder(model=model, model_name="fake")
+    assert emb.dimension == 3
+    assert model.encoded == []
+
+    class FakeStore:
+        vector_size = None
+
+        def ensure_collection(self, vector_size):
+            self.vector_size = vector_size
+
+        def flush(self, barrier=True):
+            pass
+
+        def upsert(self, points, wait=True):
+            pass
+
+    monkeypatch.setattr(indexer, "extract_pages_text", lambda p: [PageText(page=1, text="Gear ratios.")])
+    store = FakeStore()
+    indexer.index_pdfs(
+        [tmp_path / "a.pdf"], store=store, embedder=emb, max_chars=2500, overlap_chars=0, ocr_out_dir=None
+    )
+    assert store.vector_size == 3
+    assert model.encoded == [["Gear ratios."]]
+    assert len(emb._cache) == 0  # chunk embeddings bypass the query cache
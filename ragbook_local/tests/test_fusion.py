@@ -0,0 +1,73 @@
+import pytest
+
+from ragbook.fusion import HybridFusion, make_fusion
+from ragbook.retrieval import BM25Result
+
+
+class FakeHit:
+    def __init__(self, score, payload):
+        self.score = score
+        self.payload = payload
+
+
+def test_fuse_min_max_and_payloads():
+    hits = [FakeHit(0.9, {"chunk_id": "c2", "text": "v2"}), FakeHit(0.5, {"chunk_id": "c3", "text": "v3"})]
+    bm25 = [BM25Result("c1", 4.0, "b1"), BM25Result("c3", 2.0, "b3")]
+
+    fused = HybridFusion(alpha=0.6).fuse(hits, bm25)
+
+    by_id = {f["payload"]["chunk_id"]: f for f in fused}
+    # vector norm: c2=1, c3=0.5/0.9..., computed over the union (c1 has vector score 0)
+    assert by_id["c2"]["fused_score"] == 0.6 * 1.0 + 0.4 * 0.0
+    assert by_id["c1"]["fused_score"] == 0.6 * 0.0 + 0.4 * 1.0
+    assert by_id["c3"]["fused_score"] == 0.6 * (0.5 / 0.9) + 0.4 * 0.5
+    # vector payload wins; BM25-only hits carry the BM25 text
+    assert by_id["c3"]["payload"]["text"] == "v3"
+    assert by_id["c1"]["payload"] == {"chunk_id": "c1", "text": "b1"}
+    assert [f["fused_score"] for f in fused] == sorted((f["fused_score"] for f in fused), reverse=True)
+
+
+def test_fuse_empty_inputs():
+    assert HybridFusion().fuse([], []) == []
+
+
+def test_rrf_uses_ranks_and_is_normalised():
+    fusion = HybridFusion(strategy=make_fusion("rrf", rrf_k=60), weights={"vector": 1.0, "bm25": 1.0})
+    hits = [FakeHit(0.9, {"chunk_id": "a"}), FakeHit(0.1, {"chunk_id": "b"})]
+    bm25 = [BM25Result("a", 1.0, ""), BM25Result("c", 0.5, "")]
+
+    fused = fusion.fuse(hits, bm25)
+
+    assert [f["payload"]["chunk_id"] for f in fused] == ["a", "b", "c"]
+    assert fused[0]["fused_score"] == pytest.approx(1.0)
+    assert fused[1]["fused_score"] == pytest.approx((1 / 62) / (2 / 61))
+
+
+def test_zscore_and_weighted_strategies():
+    results = {
+        "vector": [("a", 0.9, None), ("b", 0.7, None), ("c", 0.5, None)],
+        "bm25": [("c", 12.0, None), ("a", 3.0, None)],
+    }
+    z = HybridFusion(strategy=make_fusion("zscore"), weights={"vector": 1.0, "bm25": 1.0}).fuse_many(results)
+    z_vec = 0.2 / (0.08 / 3) ** 0.5
+    # "b" is missing from bm25 and gets bm25's lowest z-score (-1, that of "a")
+    assert [f["fused_score"] for f in z] == pytest.approx([z_vec - 1.0, -z_vec + 1.0, -1.0])
+
+    w = HybridFusion(strategy=make_fusion("weighted"), weights={"vector": 2.0, "bm25": 0.5}).fuse_many(results)
+    assert [f["fused_score"] for f in w] == pytest.approx([2 * 0.5 + 0.5 * 12.0, 2 * 0.9 + 0.5 * 3.0, 2 * 0.7])
+
+
+def test_more_than_two_retrievers():
+    results = {
+        "vector": [("a", 0.9, {"chunk_id": "a"})],
+        "bm25": [("b", 5.0, {"chunk_id": "b"})],
+        "title": [("b", 1.0, {"chunk_id": "b"}), ("c", 0.2, {"chunk_id": "c"})],
+    }
+    fused = HybridFusion(strategy=make_fusion("rrf")).fuse_many(results)
+    assert fused[0]["payload"]["chunk_id"] == "b"
+    assert {f["payload"]["chunk_id"] for f in fused} == {"a", "b", "c"}
+
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError):
+        make_fusion("borda")
@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+
+from ragbook import indexer
+from ragbook.ingest.pdf_text import PageText
+from ragbook.manifest import IngestManifest
+from ragbook.retrieval import BM25Index
+
+
+class FakeStore:
+    def __init__(self):
+        self.points = {}
+        self.deleted = []
+
+    def ensure_collection(self, vector_size):
+        pass
+
+    def flush(self, barrier=True):
+        pass
+
+    def upsert(self, points, wait=True):
+        for p in points:
+            self.points[p.id] = p
+
+    def delete(self, point_ids):
+        self.deleted.extend(point_ids)
+        for pid in point_ids:
+            self.points.pop(pid, None)
+
+    def fetch_all_chunks(self):
+        return []
+
+
+class FakeEmbedder:
+    dimension = 2
+    model_name = "fake"
+
+    def embed(self, texts, cache=True, batch_size=None):
+        return np.zeros((len(list(texts)), 2), dtype=np.float32)
+
+
+def _write(path, content):
+    path.write_bytes(content.encode())
+    return path
+
+
+def test_reruns_skip_unchanged_reindex_changed_and_purge_removed(tmp_path, monkeypatch):
+    books = tmp_path / "books"
+    books.mkdir()
+    a = _write(books / "a.pdf", "A1")
+    b = _write(books / "b.pdf", "B1")
+    pages = {
+        "A1": [PageText(page=1, text="Gear ratios."), PageText(page=2, text="Torque curves.")],
+        "A2": [PageText(page=1, text="Gear ratios, revised.")],
+        "B1": [PageText(page=1, text="Bearing lubrication.")],
+    }
+    extracted = []
+
+    def extract(p):
+        extracted.append(p.name)
+        return pages[p.read_text()]
+
+    monkeypatch.setattr(indexer, "extract_pages_text", extract)
+    store = FakeStore()
+    bm25_path = tmp_path / "bm25.idx"
+    manifest_path = tmp_path / "data" / "manifest.json"
+
+    def run(**kw):
+        return indexer.index_pdfs(
+            sorted(books.rglob("*.pdf")), store=store, embedder=FakeEmbedder(), max_chars=2500,
+            overlap_chars=0, ocr_out_dir=None, bm25_path=bm25_path,
+            manifest=IngestManifest.load(manifest_path), prune_root=books, **kw,
+        )
+
+    res = run()
+    assert (res.docs_indexed, res.docs_skipped) == (2, 0)
+    assert len(store.points) == 3
+
+    # nothing changed: no extraction at all
+    extracted.clear()
+    res = run()
+    assert (res.docs_indexed, res.docs_skipped, res.chunks_removed) == (0, 2, 0)
+    assert extracted == []
+
+    # touched but identical content: still skipped (content hash), mtime refreshed
+    os.utime(a, ns=(1, 1))
+    assert run().docs_skipped == 2 and extracted == []
+    assert IngestManifest.load(manifest_path).entries[IngestManifest.key(a)].mtime_ns == 1
+
+    # edited: re-indexed, the chunk that disappeared is deleted from Qdrant and BM25
+    _write(a, "A2")
+    res = run()
+    assert (res.docs_indexed, res.docs_skipped, res.chunks_removed) == (1, 1, 1)
+    assert extracted == ["a.pdf"]
+    assert not any("Torque" in p.payload["text"] for p in store.points.values())
+    assert all("Torque" not in r.text for r in BM25Index.open(bm25_path).search("torque", top_k=5))
+
+    # removed: purged
+    b.unlink()
+    res = run()
+    assert (res.docs_removed, res.chunks_removed) == (1, 1)
+    assert len(store.points) == 1
+    assert IngestManifest.key(b) not in IngestManifest.load(manifest_path).entries
+
+    # force re-indexes unchanged files
+    assert run(force=True).docs_indexed == 1
+
+
+def test_changed_chunking_or_model_reindexes(tmp_path, monkeypatch):
+    pdf = _write(tmp_path / "a.pdf", "A")
+    monkeypatch.setattr(indexer, "extract_pages_text", lambda p: [PageText(page=1, text="Gear ratios.")])
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    kw = dict(store=FakeStore(), ocr_out_dir=None, manifest=manifest, overlap_chars=0)
+
+    assert indexer.index_pdfs([pdf], embedder=FakeEmbedder(), max_chars=2500, **kw).docs_indexed == 1
+    assert indexer.index_pdfs([pdf], embedder=FakeEmbedder(), max_chars=2500, **kw).docs_skipped == 1
+    assert indexer.index_pdfs([pdf], embedder=FakeEmbedder(), max_chars=1000, **kw).docs_indexed == 1
+
+    other = FakeEmbedder()
+    other.model_name = "other"
+    assert indexer.index_pdfs([pdf], embedder=other, max_chars=1000, **kw).docs_indexed == 1
+
+
+def test_prune_only_below_root(tmp_path):
+    manifest = IngestManifest(tmp_path / "m.json")
+    for rel in ["books/a.pdf", "books/sub/b.pdf", "other/c.pdf"]:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        _write(p, rel)
+        manifest.record(p, doc_id=rel, chunk_ids=[rel], model="m", chunking={})
+    present = {IngestManifest.key(tmp_path / "books/a.pdf")}
+    missing = manifest.missing_under(tmp_path / "books", present)
+    assert [e.doc_id for e in missing] == ["books/sub/b.pdf"]
@@ -0,0 +1,99 @@
+import threading
+
+import fitz
+import numpy as np
+import pytest
+
+from ragbook import indexer
+from ragbook.manifest import IngestManifest
+
+
+def _make_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class FakeStore:
+    def __init__(self, fail_after=None):
+        self.points = {}
+        self.upserts = 0
+        self.fail_after = fail_after
+        self.threads = set()
+
+    def ensure_collection(self, vector_size):
+        pass
+
+    def flush(self, barrier=True):
+        pass
+
+    def upsert(self, points, wait=True):
+        self.threads.add(threading.current_thread().name)
+        if self.fail_after is not None and self.upserts >= self.fail_after:
+            raise RuntimeError("qdrant down")
+        self.upserts += 1
+        for p in points:
+            self.points[p.id] = (p.vector, p.payload)
+
+    def delete(self, point_ids):
+        for pid in point_ids:
+            self.points.pop(pid, None)
+
+    def fetch_all_chunks(self):
+        return []
+
+
+class FakeEmbedder:
+    dimension = 3
+    model_name = "fake"
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts, cache=True, batch_size=None):
+        texts = list(texts)
+        self.batches.append(len(texts))
+        return np.array([[len(t), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def library(tmp_path):
+    books = tmp_path / "books"
+    books.mkdir()
+    for i in range(6):
+        _make_pdf(books / f"book{i}.pdf", [f"Chapter {i}.{p}: gears and bearings page {p}." for p in range(3)])
+    return sorted(books.glob("*.pdf"))
+
+
+def _run(pdfs, tmp_path, name, **kw):
+    store, emb = FakeStore(), FakeEmbedder()
+    res = indexer.index_pdfs(
+        pdfs, store=store, embedder=emb, max_chars=2500, overlap_chars=0, ocr_out_dir=None,
+        bm25_path=tmp_path / f"{name}.idx", manifest=IngestManifest(tmp_path / f"{name}.json"), **kw,
+    )
+    return res, store, emb
+
+
+def test_parallel_pipeline_matches_serial(library, tmp_path):
+    res_s, serial, _ = _run(library, tmp_path, "serial")
+    res_p, parallel, emb = _run(library, tmp_path, "parallel", workers=2, embed_window=7, embed_batch_size=4, queue_size=2)
+
+    assert (res_p.docs_indexed, res_p.chunks_indexed) == (res_s.docs_indexed, res_s.chunks_indexed) == (6, 18)
+    assert parallel.points == serial.points
+    assert parallel.threads == {"ragbook-upsert"}
+    # chunks of several PDFs (3 each) share a model call
+    assert max(emb.batches) == 4 and sum(emb.batches) == 18
+    m = IngestManifest.load(tmp_path / "parallel.json")
+    assert len(m.entries) == 6
+
+
+def test_upsert_errors_reach_the_caller(library, tmp_path):
+    store = FakeStore(fail_after=1)
+    with pytest.raises(RuntimeError, match="qdrant down"):
+        indexer.index_pdfs(
+            library, store=store, embedder=FakeEmbedder(), max_chars=2500, overlap_chars=0,
+            ocr_out_dir=None, workers=2, embed_window=1, queue_size=1,
+        )
+    assert store.upserts == 1
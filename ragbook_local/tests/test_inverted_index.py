@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from ragbook.inverted_index import InvertedIndex
+from ragbook.retrieval import BM25Index
+
+
+def _full_scan_top_k(bm25, tokens, k):
+    scores = bm25.get_scores(tokens)
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+    return [(i, float(scores[i])) for i in ranked]
+
+
+def test_matches_bm25okapi_scores_and_ranking():
+    rank_bm25 = pytest.importorskip("rank_bm25")
+
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(40)]
+    corpus = [[rng.choice(words) for _ in range(rng.randint(0, 30))] for _ in range(200)]
+    ref = rank_bm25.BM25Okapi(corpus)
+    idx = InvertedIndex.build(corpus)
+
+    for _ in range(50):
+        query = [rng.choice(words + ["unknown"]) for _ in range(rng.randint(1, 4))]
+        for k in (1, 5, 50, 250):
+            assert idx.top_k(query, k) == _full_scan_top_k(ref, query, k)
+
+
+def test_zero_and_negative_scores_keep_full_scan_order():
+    rank_bm25 = pytest.importorskip("rank_bm25")
+
+    # "common" appears in most docs -> negative raw IDF, floored by epsilon
+    corpus = [["common", "a"], ["common"], ["b"], ["common", "c"], []]
+    ref = rank_bm25.BM25Okapi(corpus)
+    idx = InvertedIndex.build(corpus)
+
+    for query in (["common"], ["a"], ["zzz"], ["common", "b"]):
+        assert idx.top_k(query, 5) == _full_scan_top_k(ref, query, 5)
+
+
+def test_bm25index_search_only_returns_requested_k():
+    idx = BM25Index(docs=["apple banana", "banana orange", "apple grape"], ids=["c1", "c2", "c3"])
+    res = idx.search("grape", top_k=2)
+    assert [r.chunk_id for r in res] == ["c3", "c1"]
+    assert res[0].text == "apple grape"
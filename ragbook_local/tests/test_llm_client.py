@@ -0,0 +1,87 @@
+import json
+
+import httpx
+import pytest
+
+from ragbook.llm import LLM
+
+
+def _llm(handler, **kw):
+    llm = LLM.from_config(
+        "ollama",
+        model_path="",
+        n_ctx=0,
+        temperature=0.0,
+        max_tokens=16,
+        ollama_url="http://ollama",
+        ollama_model="m",
+        retry_backoff=0.0,
+        **kw,
+    )
+    llm._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return llm
+
+
+def test_client_is_reused_across_calls():
+    llm = LLM(backend="ollama", http2=False)
+    first = llm.client
+    assert llm.client is first
+    llm.close()
+    assert llm._client is None
+    llm.close()  # idempotent
+
+
+def test_retries_transient_failures():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if len(calls) == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"response": " ok "})
+
+    llm = _llm(handler, retries=2)
+    assert llm.generate("hi") == "ok"
+    assert len(calls) == 3
+    assert calls[-1].url == "http://ollama/api/generate"
+
+
+def test_gives_up_after_retries_and_does_not_retry_client_errors():
+    calls = []
+
+    def unavailable(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _llm(unavailable, retries=1).generate("hi")
+    assert len(calls) == 2
+
+    calls.clear()
+
+    def bad_request(request):
+        calls.append(request)
+        return httpx.Response(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _llm(bad_request, retries=3).generate("hi")
+    assert len(calls) == 1
+
+
+def test_stream_yields_ollama_chunks():
+    lines = [
+        {"response": "Gears ", "done": False},
+        {"response": "transmit ", "done": False},
+        {"response": "torque.", "done": False},
+        {"response": "", "done": True},
+    ]
+
+    def handler(request):
+        assert b'"stream": true' in request.content or b'"stream":true' in request.content
+        body = "".join(json.dumps(x) + "\n" for x in lines)
+        return httpx.Response(200, content=body.encode())
+
+    llm = _llm(handler)
+    assert list(llm.stream("hi")) == ["Gears ", "transmit ", "torque."]
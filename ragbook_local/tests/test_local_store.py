@@ -0,0 +1,156 @@
+import fitz
+import numpy as np
+import pytest
+from qdrant_client.http.models import PointStruct
+
+from ragbook import indexer
+from ragbook.chat_engine import RANKING_FIELDS, ChatEngine
+from ragbook.local_store import LocalStore
+from ragbook.retrieval import BM25Index
+
+
+def _points(vecs, start=0, text="chunk"):
+    return [
+        PointStruct(id=i, vector=v.tolist(), payload={"chunk_id": f"c{i}", "doc_title": "t", "text": f"{text} {i}"})
+        for i, v in enumerate(vecs, start=start)
+    ]
+
+
+def _clustered(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dim))
+    return (centers[rng.integers(0, 20, n)] + rng.normal(0, 0.3, (n, dim))).astype(np.float32)
+
+
+def test_search_retrieve_and_projection(tmp_path):
+    vecs = _clustered(50)
+    store = LocalStore.open(tmp_path, "books")
+    store.ensure_collection(vector_size=16)
+    store.upsert(_points(vecs))
+
+    hits = store.search(vecs[7], limit=3)
+    assert hits[0].id == 7 and hits[0].score == pytest.approx(1.0, abs=1e-5)
+    assert hits[0].payload["text"] == "chunk 7"
+    assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+    projected = store.search(vecs[7], limit=3, fields=RANKING_FIELDS)
+    assert projected[0].payload == {"chunk_id": "c7", "doc_title": "t"}
+    assert {r.id: r.payload["text"] for r in store.retrieve([3, 4, 99])} == {3: "chunk 3", 4: "chunk 4"}
+    assert [p["payload"]["chunk_id"] for p in store.fetch_all_chunks(page_size=7)] == [f"c{i}" for i in range(50)]
+
+
+def test_replace_delete_and_reopen(tmp_path):
+    vecs = _clustered(40)
+    store = LocalStore.open(tmp_path, "books", compact_ratio=0.5)
+    store.ensure_collection(vector_size=16)
+    store.upsert(_points(vecs))
+    store.upsert(_points(vecs[:10], text="edited"))
+    store.delete([10, 11])
+    assert store.search(vecs[11], limit=40, exact=True)[0].id != 11
+    store.close()
+
+    again = LocalStore.open(tmp_path, "books")
+    assert again.retrieve([0])[0].payload["text"] == "edited 0"
+    assert len(list(again.fetch_all_chunks())) == 38
+    # dead rows: 10 replaced + 2 deleted out of 50; tune_collection compacts now
+    assert again._rows == 50
+    again.tune_collection()
+    assert again._rows == 38 and again.search(vecs[5], limit=1)[0].id == 5
+    again.close()
+    assert sorted(p.name for p in (tmp_path / "books").glob("vectors-*")) == ["vectors-1.bin"]
+
+    with pytest.raises(ValueError):
+        LocalStore.open(tmp_path, "books").ensure_collection(vector_size=8)
+
+
+def test_torn_tail_is_cut_on_open(tmp_path):
+    store = LocalStore.open(tmp_path, "books")
+    store.ensure_collection(vector_size=16)
+    store.upsert(_points(_clustered(10)))
+    store.close()
+    vectors = tmp_path / "books" / "vectors-0.bin"
+    with vectors.open("ab") as fh:
+        fh.write(b"\0" * 100)  # an interrupted append
+    again = LocalStore.open(tmp_path, "books")
+    assert vectors.stat().st_size == 10 * 16 * 4
+    again.upsert(_points(_clustered(5, seed=1), start=10))
+    assert again.search(_clustered(5, seed=1)[2], limit=1)[0].id == 12
+
+
+def test_failed_upsert_does_not_shift_later_rows(tmp_path):
+    store = LocalStore.open(tmp_path, "books")
+    store.ensure_collection(vector_size=3)
+    store.upsert([PointStruct(id=1, vector=[1.0, 0.0, 0.0], payload={"chunk_id": "c1"})])
+    with pytest.raises(TypeError):
+        store.upsert([PointStruct(id=2, vector=[0.0, 1.0, 0.0], payload={"bad": object()})])
+    store.upsert([PointStruct(id=3, vector=[0.0, 0.0, 1.0], payload={"chunk_id": "c3"})])
+    hit = store.search([0.0, 0.0, 1.0], limit=1)[0]
+    assert hit.id == 3 and hit.score == pytest.approx(1.0)
+    assert store.retrieve([2]) == []
+    store.close()
+    assert (tmp_path / "books" / "vectors-0.bin").stat().st_size == 2 * 3 * 4
+    assert LocalStore.open(tmp_path, "books").search([0.0, 0.0, 1.0], limit=1)[0].id == 3
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_ivf_recall_matches_exact(tmp_path, dtype):
+    vecs = _clustered(3000)
+    store = LocalStore.open(tmp_path, "books", dtype=dtype, ivf_min_points=1000, nprobe=8)
+    store.ensure_collection(vector_size=16)
+    store.upsert(_points(vecs[:2000]))
+    assert store._centroids is not None
+    # later points join their nearest list without retraining
+    store.upsert(_points(vecs[2000:], start=2000), wait=False)
+    rng = np.random.default_rng(1)
+    queries = vecs[rng.integers(0, 3000, 50)] + rng.normal(0, 0.1, (50, 16)).astype(np.float32)
+    recall = []
+    for q in queries:
+        exact = {h.id for h in store.search(q, limit=8, exact=True)}
+        recall.append(len(exact & {h.id for h in store.search(q, limit=8)}) / 8)
+    assert np.mean(recall) >= 0.9
+    store.close()
+    # the lists are saved with the store
+    assert LocalStore.open(tmp_path, "books", dtype=dtype)._centroids is not None
+
+
+class FakeEmbedder:
+    dimension = 3
+    model_name = "fake"
+
+    def embed(self, texts, cache=True, batch_size=None):
+        return np.array([[len(t), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+
+
+class FakeLLM:
+    def generate(self, prompt):
+        return "Use 25 Nm [1]."
+
+
+def test_ingest_bm25_and_chat_engine_on_local_store(tmp_path):
+    pdf = tmp_path / "manual.pdf"
+    doc = fitz.open()
+    for text in ("Gearbox: tighten the M8 bolt to 25 Nm.", "Bearings need grease every 500 hours."):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(pdf))
+    doc.close()
+
+    store = LocalStore.open(tmp_path / "vectors", "books")
+    res = indexer.index_pdfs(
+        [pdf], store=store, embedder=FakeEmbedder(), max_chars=2500, overlap_chars=0, ocr_out_dir=None
+    )
+    assert res.chunks_indexed == len(list(store.fetch_all_chunks())) > 0
+
+    bm25 = BM25Index.from_store(store)
+    engine = ChatEngine(
+        store=store,
+        embedder=FakeEmbedder(),
+        llm=FakeLLM(),
+        top_k=4,
+        min_score=0.0,
+        max_passages=2,
+        bm25_index=bm25,
+        two_phase=True,
+    )
+    out = engine.ask("What torque for the M8 bolt?")
+    assert any("25 Nm" in p["payload"]["text"] for p in out["passages"])
+    assert all("source_path" in p["payload"] for p in out["passages"])
@@ -0,0 +1,104 @@
+import json
+import warnings
+
+import numpy as np
+import pytest
+import sentence_transformers
+
+from ragbook import onnx_backend
+from ragbook.embeddings import Embedder
+from ragbook.onnx_backend import check_file, check_version, cosine_agreement, load_model, onnx_file
+from ragbook.rerank import CrossEncoderReranker
+
+
+class FakeModel:
+    created = []
+    noise = 0.0
+
+    def __init__(self, name, backend="torch", model_kwargs=None, **kwargs):
+        FakeModel.created.append((str(name), backend, (model_kwargs or {}).get("file_name")))
+        self.file_name = (model_kwargs or {}).get("file_name") or ""
+
+    def save_pretrained(self, path):
+        (onnx_backend.Path(path) / "onnx").mkdir(parents=True, exist_ok=True)
+        (onnx_backend.Path(path) / "onnx" / "model.onnx").write_bytes(b"fp32")
+
+    def encode(self, texts, normalize_embeddings=True):
+        vecs = np.tile([1.0, 0.5, 0.25, 0.0], (len(texts), 1))
+        if "qint8" in self.file_name:
+            vecs[:, 3] += self.noise
+        return vecs
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    FakeModel.created = []
+    FakeModel.noise = 0.01
+
+    def quantize(model, config, path):
+        (onnx_backend.Path(path) / onnx_file(config)).write_bytes(b"int8")
+
+    monkeypatch.setattr(sentence_transformers, "export_dynamic_quantized_onnx_model", quantize)
+    monkeypatch.setattr(onnx_backend, "session_options", lambda intra, inter: ("threads", intra, inter))
+    return FakeModel
+
+
+def test_cosine_agreement():
+    a = np.array([[1.0, 0.0], [0.0, 2.0]])
+    np.testing.assert_allclose(cosine_agreement(a, np.array([[2.0, 0.0], [1.0, 1.0]])), [1.0, 2**-0.5])
+
+
+def test_exports_once_and_records_agreement(tmp_path, fake):
+    model = load_model(fake, "org/mini-lm", export_dir=tmp_path, quantization="avx2", intra_op_threads=4)
+    target = tmp_path / "org--mini-lm"
+    assert model.file_name == "onnx/model_qint8_avx2.onnx"
+    assert (target / "onnx" / "model_qint8_avx2.onnx").read_bytes() == b"int8"
+    report = json.loads((target / check_file("avx2")).read_text())
+    assert report["min_cosine"] > 0.99
+    assert not list(tmp_path.glob(".*"))  # the staging directory is gone
+
+    fake.created = []
+    load_model(fake, "org/mini-lm", export_dir=tmp_path, quantization="avx2")
+    assert fake.created == [(str(target), "onnx", "onnx/model_qint8_avx2.onnx")]
+
+    # another preset is added next to the first one
+    load_model(fake, "org/mini-lm", export_dir=tmp_path, quantization="avx512_vnni")
+    assert (target / "onnx" / "model_qint8_avx2.onnx").exists()
+    assert (target / "onnx" / "model_qint8_avx512_vnni.onnx").exists()
+
+
+def test_poor_agreement_warns(tmp_path, fake):
+    fake.noise = 1.0
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        load_model(fake, "m", export_dir=tmp_path, quantization="arm64")
+    assert any("agrees with PyTorch" in str(x.message) for x in w)
+
+
+def test_unknown_quantization(tmp_path, fake):
+    with pytest.raises(ValueError):
+        load_model(fake, "m", export_dir=tmp_path, quantization="int4")
+
+
+def test_embedder_onnx_backend_keys_caches_apart(tmp_path, fake, monkeypatch):
+    monkeypatch.setattr("ragbook.embeddings.SentenceTransformer", fake)
+    onnx = Embedder.from_model("org/mini-lm", backend="onnx", onnx_dir=tmp_path, quantization="avx2")
+    fp32 = Embedder.from_model("org/mini-lm", backend="onnx", onnx_dir=tmp_path, quantization=None)
+    torch = Embedder.from_model("org/mini-lm")
+    assert onnx.model_name == "org/mini-lm#onnx-avx2"
+    assert fp32.model_name == "org/mini-lm#onnx-fp32" and fp32.model.file_name == "onnx/model.onnx"
+    assert torch.model_name == "org/mini-lm"
+    with pytest.raises(ValueError):
+        Embedder.from_model("org/mini-lm", backend="tensorrt")
+
+
+def test_cross_encoder_onnx_needs_sentence_transformers_4_1(monkeypatch):
+    check_version("SentenceTransformer", "3.2.1")
+    with pytest.raises(RuntimeError, match=r"sentence-transformers>=4\.1"):
+        check_version("CrossEncoder", "4.0.2")
+    check_version("CrossEncoder", "4.1.0")
+
+    monkeypatch.setattr(sentence_transformers, "__version__", "3.4.1")
+    with pytest.raises(RuntimeError):
+        CrossEncoderReranker(backend="onnx")
+    CrossEncoderReranker(backend="torch")
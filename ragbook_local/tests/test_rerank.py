@@ -0,0 +1,80 @@
+import warnings
+
+import pytest
+
+from ragbook.chat_engine import ChatEngine
+from ragbook.rerank import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append((list(pairs), batch_size))
+        # longer passages score higher
+        return [float(len(p)) for _, p in pairs]
+
+
+def make(**kwargs):
+    model = FakeCrossEncoder()
+    return CrossEncoderReranker(_model=model, **kwargs), model
+
+
+def test_scores_pairs_and_truncates():
+    rr, model = make(batch_size=4, max_length=4)
+    long = "x" * 100
+    scores = rr.score("what is torque?", [("c1", "short"), ("c2", long)])
+    pairs, batch_size = model.calls[0]
+    assert batch_size == 4
+    assert pairs[0] == ("what is torque?", "short")
+    assert pairs[1][1] == long[: 4 * rr.chars_per_token]
+    assert scores == [5.0, 4.0 * rr.chars_per_token]
+
+
+def test_cache_scores_only_new_candidates():
+    rr, model = make(cache_size=3)
+    rr.score("q", [("c1", "a"), ("c2", "bb")])
+    rr.score("q ", [("c2", "bb"), ("c3", "ccc")])
+    assert [p for _, p in model.calls[-1][0]] == ["ccc"]
+    assert (rr.hits, rr.misses) == (1, 3)
+
+    # another question, or the same chunk id with new text, is scored again
+    rr.score("other", [("c2", "bb")])
+    rr.score("q", [("c2", "changed")])
+    assert len(model.calls) == 4
+    # LRU bound: c1 for "q" was evicted
+    rr.score("q", [("c1", "a")])
+    assert len(model.calls) == 5
+    assert len(rr._cache) == 3
+
+
+def test_warm_up_and_engine_fallback(monkeypatch):
+    rr, model = make(batch_size=8)
+    engine = ChatEngine(store=None, embedder=None, llm=None, top_k=2, min_score=0.0, max_passages=2,
+                        rerank_enabled=True, reranker=rr)
+    engine.warm_up()
+    assert len(model.calls) == 1
+
+    def boom(*a, **kw):
+        raise RuntimeError("oom")
+
+    monkeypatch.setattr(model, "predict", boom)
+    fused = [{"fused_score": 0.9, "payload": {"chunk_id": "c1", "text": "x"}}]
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        out, applied = engine._rerank("q", fused)
+    assert not applied and out == fused
+    assert any("prediction failed" in str(x.message) for x in w)
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_warm_up_without_model_warns_only_when_enabled(monkeypatch, enabled):
+    rr = CrossEncoderReranker()
+    monkeypatch.setattr(rr, "load", lambda: (_ for _ in ()).throw(ImportError("no model")))
+    engine = ChatEngine(store=None, embedder=None, llm=None, top_k=2, min_score=0.0, max_passages=2,
+                        rerank_enabled=enabled, reranker=rr)
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        engine.warm_up()
+    assert any("Reranker" in str(x.message) for x in w) == enabled
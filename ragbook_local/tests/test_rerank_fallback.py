@@ -53,10 +53,10 @@ def test_rerank_disabled_when_model_missing(monkeypatch):
 def test_rerank_reorders_candidates(monkeypatch):
     # Provide a fake CrossEncoder that scores second passage higher
     class FakeCrossEncoder:
-        def __init__(self, model):
+        def __init__(self, model, **kwargs):
             self.model = model
 
-        def predict(self, texts):
+        def predict(self, texts, batch_size=32):
             # return scores inversely proportional to index (so second gets higher)
             return [0.1 if i == 0 else 0.9 for i in range(len(texts))]
 
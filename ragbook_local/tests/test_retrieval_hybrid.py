@@ -67,3 +67,14 @@ def test_fusion_and_sorting():
     # check that BM25-only item (c1) can appear even if not in vector hits
     ids = [p["payload"]["chunk_id"] for p in passages]
     assert "c1" in ids
+
+
+def test_fusion_is_built_once():
+    store = FakeStore(vector_hits=[("c1", 0.9)], bm25_docs=[("c1", "apple banana")])
+    engine = ChatEngine(
+        store=store, embedder=DummyEmbedder(), llm=DummyLLM(), top_k=3, min_score=0.0, max_passages=3
+    )
+    engine.ask("apple")
+    fusion = engine._fusion
+    engine.ask("banana")
+    assert fusion is not None and engine._fusion is fusion
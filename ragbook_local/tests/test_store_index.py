@@ -0,0 +1,109 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import BinaryQuantization, PointStruct, ScalarQuantization, ScalarType
+
+from ragbook.store import AsyncQdrantStore, QdrantStore, collection_options, search_params
+
+
+class Recorder:
+    def __init__(self, exists=False):
+        self.exists = exists
+        self.calls = {}
+
+    def collection_exists(self, name):
+        return self.exists
+
+    def __getattr__(self, name):
+        def record(**kwargs):
+            self.calls[name] = kwargs
+
+            class Res:
+                points = []
+
+            return Res()
+
+        return record
+
+
+def test_collection_options():
+    assert collection_options() == {"on_disk_vectors": False, "on_disk_payload": False}
+
+    scalar = collection_options(quantization="scalar", hnsw_m=32, hnsw_ef_construct=200)
+    q = scalar["quantization_config"]
+    assert isinstance(q, ScalarQuantization) and q.scalar.type == ScalarType.INT8 and q.scalar.always_ram
+    assert (scalar["hnsw_config"].m, scalar["hnsw_config"].ef_construct) == (32, 200)
+
+    binary = collection_options(quantization="binary", quantization_always_ram=False)
+    assert isinstance(binary["quantization_config"], BinaryQuantization)
+    assert binary["quantization_config"].binary.always_ram is False
+
+    with pytest.raises(ValueError):
+        collection_options(quantization="product")
+
+
+def test_search_params():
+    assert search_params() is None
+    p = search_params(hnsw_ef=128, rescore=True, oversampling=2.0)
+    assert p.hnsw_ef == 128 and not p.exact
+    assert (p.quantization.rescore, p.quantization.oversampling) == (True, 2.0)
+    assert search_params(exact=True).exact
+
+
+def test_ensure_collection_applies_index_options():
+    client = Recorder()
+    store = QdrantStore(client, "books", index_options={"quantization": "binary", "on_disk_vectors": True,
+                                                        "on_disk_payload": True, "hnsw_m": 8})
+    store.ensure_collection(vector_size=384)
+    created = client.calls["create_collection"]
+    assert created["vectors_config"].on_disk is True and created["vectors_config"].size == 384
+    assert created["on_disk_payload"] is True
+    assert isinstance(created["quantization_config"], BinaryQuantization)
+    assert created["hnsw_config"].m == 8
+
+    store.tune_collection()
+    updated = client.calls["update_collection"]
+    assert updated["vectors_config"][""].on_disk is True
+    assert "on_disk_payload" not in updated
+
+
+def test_search_uses_store_options_with_per_query_overrides():
+    client = Recorder()
+    store = QdrantStore(client, "books", search_options={"hnsw_ef": 64, "rescore": True})
+    store.search([0.1, 0.2], limit=3)
+    p = client.calls["query_points"]["search_params"]
+    assert p.hnsw_ef == 64 and p.quantization.rescore
+
+    store.search([0.1, 0.2], limit=3, hnsw_ef=256, exact=True)
+    p = client.calls["query_points"]["search_params"]
+    assert (p.hnsw_ef, p.exact) == (256, True)
+
+    QdrantStore(client, "books").search([0.1, 0.2])
+    assert client.calls["query_points"]["search_params"] is None
+
+
+def test_async_search_passes_params():
+    import asyncio
+
+    class AsyncRecorder(Recorder):
+        def __getattr__(self, name):
+            sync = super().__getattr__(name)
+
+            async def record(**kwargs):
+                return sync(**kwargs)
+
+            return record
+
+    client = AsyncRecorder()
+    asyncio.run(AsyncQdrantStore(client, "books", search_options={"exact": True}).search([0.1], limit=2))
+    assert client.calls["query_points"]["search_params"].exact
+
+
+@pytest.mark.filterwarnings("ignore:Payload indexes", "ignore:Local mode")
+def test_quantized_collection_roundtrip_on_local_client():
+    store = QdrantStore(QdrantClient(location=":memory:"), "books", upsert_parallel=1,
+                        index_options={"quantization": "scalar", "hnsw_m": 16},
+                        search_options={"hnsw_ef": 32, "rescore": True, "oversampling": 2.0})
+    store.ensure_collection(vector_size=2)
+    store.upsert(PointStruct(id=i, vector=[1.0, i / 10], payload={"text": f"t{i}"}) for i in range(5))
+    assert [h.id for h in store.search([1.0, 0.4], limit=2, exact=True)][0] == 4
+    store.close()
@@ -0,0 +1,63 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from ragbook.retrieval import BM25Index
+from ragbook.store import QdrantStore
+
+
+pytestmark = pytest.mark.filterwarnings("ignore:Payload indexes")
+
+
+@pytest.fixture
+def store():
+    client = QdrantClient(location=":memory:")
+    s = QdrantStore(client, "books", upsert_parallel=1)  # local mode is not thread-safe
+    s.ensure_collection(vector_size=2)
+    s.upsert(
+        PointStruct(id=i, vector=[1.0, i / 100], payload={"chunk_id": f"doc::c{i}", "text": f"gear {i}", "page": i})
+        for i in range(25)
+    )
+    yield s
+    s.close()
+
+
+def test_scroll_follows_cursor_with_projected_payload(store):
+    calls = []
+    scroll = store.client.scroll
+
+    def spy(**kwargs):
+        calls.append(kwargs)
+        return scroll(**kwargs)
+
+    store.client.scroll = spy
+    it = store.fetch_all_chunks(page_size=10)
+    first = next(it)
+    assert len(calls) == 1  # pages are fetched lazily
+    rows = [first, *it]
+
+    assert [r["id"] for r in rows] == list(range(25))
+    assert rows[3]["payload"] == {"chunk_id": "doc::c3", "text": "gear 3"}
+    assert [c["offset"] for c in calls] == [None, 10, 20]
+    assert all(c["with_vectors"] is False for c in calls)
+
+    full = next(store.fetch_all_chunks(fields=None))
+    assert full["payload"]["page"] == 0
+
+
+def test_bm25_from_store_streams_pages(store):
+    idx = BM25Index.from_store(store)
+    ref = BM25Index([f"gear {i}" for i in range(25)], [f"doc::c{i}" for i in range(25)])
+    assert list(idx.ids) == list(ref.ids)
+    assert [(r.chunk_id, r.score) for r in idx.search("gear 7")] == [
+        (r.chunk_id, r.score) for r in ref.search("gear 7")
+    ]
+
+
+def test_bm25_from_empty_store():
+    class Empty:
+        def fetch_all_chunks(self):
+            return iter(())
+
+    idx = BM25Index.from_store(Empty())
+    assert idx.search("gear") == [] and len(idx.ids) == 0
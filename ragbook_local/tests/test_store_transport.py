@@ -0,0 +1,50 @@
+import pytest
+from grpc import Compression
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from ragbook import store as store_mod
+from ragbook.store import AsyncQdrantStore, QdrantStore, client_options
+
+
+def test_connect_passes_transport_options(monkeypatch):
+    seen = {}
+
+    class Recorder:
+        def __init__(self, **kwargs):
+            seen.update(kwargs)
+
+    monkeypatch.setattr(store_mod, "QdrantClient", Recorder)
+    monkeypatch.setattr(store_mod, "AsyncQdrantClient", Recorder)
+    transport = {"prefer_grpc": True, "grpc_port": 7334, "timeout": 30, "pool_size": 3, "grpc_compression": "gzip"}
+
+    s = QdrantStore.connect("http://qdrant:6333", "books", transport=transport, upsert_batch_size=64)
+    assert s.upsert_batch_size == 64
+    assert seen == {
+        "url": "http://qdrant:6333",
+        "prefer_grpc": True,
+        "grpc_port": 7334,
+        "timeout": 30,
+        "pool_size": 3,
+        "grpc_compression": Compression.Gzip,
+    }
+
+    seen.clear()
+    AsyncQdrantStore.connect("http://qdrant:6333", "books")
+    assert seen == {"url": "http://qdrant:6333", "prefer_grpc": False, "grpc_port": 6334}
+
+
+def test_compression_only_applies_to_grpc():
+    assert "grpc_compression" not in client_options(grpc_compression="gzip")
+
+
+@pytest.mark.filterwarnings("ignore:Payload indexes")
+def test_upsert_and_search_roundtrip_on_local_client():
+    client = QdrantClient(location=":memory:")
+    s = QdrantStore(client, "books", upsert_batch_size=2, upsert_parallel=1)  # local mode is not thread-safe
+    s.ensure_collection(vector_size=2)
+    s.upsert(PointStruct(id=i, vector=[1.0, i / 10], payload={"text": f"t{i}"}) for i in range(5))
+    hits = s.search([1.0, 0.4], limit=2)
+    assert hits[0].id == 4 and hits[0].payload["text"] == "t4"
+    assert s.stats.points == 5
+    s.close()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import httpx
+import pytest
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.http.models import PointStruct
+
+from ragbook.store import QdrantStore
+
+
+class FakeClient:
+    def __init__(self, fail=None, delay=0.0):
+        self.calls = []  # (ids, wait)
+        self.fail = list(fail or [])
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, collection_name, points, wait=True):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise self.fail.pop(0)
+            with self._lock:
+                self.calls.append(([p.id for p in points], wait))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _points(n):
+    for i in range(n):
+        yield PointStruct(id=i, vector=[0.0, 1.0], payload={"text": str(i)})
+
+
+def _unexpected(status):
+    return UnexpectedResponse(status, "err", b"", httpx.Headers())
+
+
+def test_batches_parallel_and_barrier():
+    client = FakeClient(delay=0.02)
+    store = QdrantStore(client, "c", upsert_batch_size=10, upsert_parallel=3, upsert_backoff=0)
+    store.upsert(_points(95))
+
+    batches = [c for c in client.calls if not c[1]]
+    assert sorted(len(ids) for ids, _ in batches) == [5] + [10] * 9
+    assert sorted(i for ids, _ in batches for i in ids) == list(range(95))
+    assert 1 < client.max_active <= 3
+    # the barrier resends the last batch with wait=True after everything else returned
+    assert client.calls[-1] == (list(range(90, 95)), True)
+    assert (store.stats.points, store.stats.batches) == (95, 10)
+    assert store.stats.points_per_second > 0
+    store.close()
+
+
+def test_wait_false_keeps_pipeline_until_flush():
+    client = FakeClient()
+    store = QdrantStore(client, "c", upsert_batch_size=4)
+    store.upsert(_points(8), wait=False)
+    store.upsert(_points(3), wait=False)
+    assert all(not w for _, w in client.calls)
+    store.flush()
+    assert client.calls[-1][1] is True
+    store.flush()  # nothing in flight: no second barrier
+    assert sum(1 for _, w in client.calls if w) == 1
+
+
+def test_retries_transient_errors_only():
+    client = FakeClient(fail=[ResponseHandlingException(ConnectionError("reset")), _unexpected(503)])
+    store = QdrantStore(client, "c", upsert_batch_size=100, upsert_backoff=0)
+    store.upsert(_points(5))
+    assert store.stats.retries == 2
+    assert store.stats.points == 5
+
+    client = FakeClient(fail=[_unexpected(400)])
+    store = QdrantStore(client, "c", upsert_batch_size=100, upsert_backoff=0)
+    with pytest.raises(UnexpectedResponse):
+        store.upsert(_points(5))
+    assert store.stats.retries == 0
+
+    client = FakeClient(fail=[_unexpected(503)] * 3)
+    store = QdrantStore(client, "c", upsert_batch_size=100, upsert_retries=2, upsert_backoff=0)
+    with pytest.raises(UnexpectedResponse):
+        store.upsert(_points(5))